@@ -1,41 +1,78 @@
 from . import import_override  # isort: skip
 
+import asyncio
 import concurrent.futures
+import functools
+import importlib
 import json
 import logging
 import logging.config
 import signal
 from contextlib import contextmanager
-from typing import Dict, Union
+from typing import TYPE_CHECKING, Dict, Union
 
 import typeguard
 
 from ._version import __version__
 from .action import Action
 from .config_manager import ConfigManager
-from .controller import Controller
 from .goal_metadata import GoalCategory, GoalMetadata
-from .history_writer import HistoryWriter
 from .logging_config import LoggingConfig
 from .material import Material
-from .object_metadata import ObjectMetadata
+from .object_metadata import ObjectList, ObjectMetadata
 from .return_status import ReturnStatus
-from .reward import Reward
+from .scene_cache import CachedScene, SceneCache, create_scene_pack
 from .scene_history import SceneHistory
-from .serializer import SerializerMsgPack
 from .step_metadata import StepMetadata
 from .stringifier import Stringifier
-from .subscriber import add_subscribers
-from .unity_executable_provider import UnityExecutableProvider
+
+if TYPE_CHECKING:
+    from .async_controller import AsyncController
+    from .controller import Controller
+
+# Names imported from their modules the first time they're used, since those
+# modules load heavy dependencies (ai2thor, opencv, shapely, msgpack,
+# requests) that many users of this package (for example, of its config or
+# serializers alone) never need.
+_LAZY_IMPORTS = {
+    'AsyncController': '.async_controller',
+    'Controller': '.controller',
+    'ControllerPool': '.controller_pool',
+    'FrameList': '.frame_list',
+    'HistoryWriter': '.history_writer',
+    'Reward': '.reward',
+    'SerializerMsgPack': '.serializer',
+    'SerializerMsgPackBinary': '.serializer',
+    'SharedMemoryStepConsumer': '.shared_memory_transport',
+    'SharedMemoryStepPublisher': '.shared_memory_transport',
+    'UnityExecutableProvider': '.unity_executable_provider',
+    'add_subscribers': '.subscriber'
+}
 
 logger = logging.getLogger(__name__)
 # Set default logging handler to avoid "No handler found" warnings
 logger.addHandler(logging.NullHandler())
 
 
+def __getattr__(name: str):
+    if name not in _LAZY_IMPORTS:
+        raise AttributeError(
+            f"module {__name__!r} has no attribute {name!r}")
+    module = importlib.import_module(_LAZY_IMPORTS[name], __name__)
+    value = getattr(module, name)
+    # Cache it, so this isn't called again for the same name.
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(list(globals()) + list(_LAZY_IMPORTS))
+
+
 def get_controller(unity_exec: str, config: ConfigManager):
     """Function to get the controller, pulled into its own
      function so we can time it.  """
+    from .controller import Controller
     controller = Controller(unity_exec, config)
     return controller
 
@@ -119,6 +156,8 @@ def create_controller(config_file_or_dict: Union[Dict, str] = None,
     Controller
         The MCS Controller object.
     """
+    from .subscriber import add_subscribers
+    from .unity_executable_provider import UnityExecutableProvider
     try:
         unity_exec = unity_app_file_path
         if (unity_exec is None):
@@ -137,8 +176,35 @@ def create_controller(config_file_or_dict: Union[Dict, str] = None,
         return None
 
 
-@typeguard.typechecked
-def change_config(controller: Controller,
+async def create_async_controller(
+        config_file_or_dict: Union[Dict, str] = None,
+        unity_app_file_path: str = None,
+        unity_cache_version: str = None) -> 'AsyncController':
+    """
+    Creates a new MCS Controller without blocking the event loop, and
+    returns it wrapped in an AsyncController.  See create_controller.
+
+    Returns
+    -------
+    AsyncController
+        The MCS AsyncController object, or None if the Controller failed to
+        initialize.
+    """
+    from .async_controller import AsyncController
+    loop = asyncio.get_running_loop()
+    controller = await loop.run_in_executor(
+        None,
+        functools.partial(
+            create_controller,
+            config_file_or_dict=config_file_or_dict,
+            unity_app_file_path=unity_app_file_path,
+            unity_cache_version=unity_cache_version
+        )
+    )
+    return AsyncController(controller) if controller else None
+
+
+def change_config(controller: 'Controller',
                   config_file_or_dict: Union[Dict, str] = None):
     """
     Creates and returns a new MCS Controller object.  Should only be called
@@ -155,6 +221,12 @@ def change_config(controller: Controller,
         not to save history files (default None)
 
     """
+    # Checked here, rather than with typeguard.typechecked, since the
+    # Controller type isn't imported until it's needed.
+    from .controller import Controller
+    from .subscriber import add_subscribers
+    typeguard.check_type(controller, Controller)
+    typeguard.check_type(config_file_or_dict, Union[Dict, str])
     config = ConfigManager(config_file_or_dict)
     controller._set_config(config)
     controller.remove_all_event_handlers()
@@ -856,6 +856,11 @@ class Action(Enum):
         return action, params
 
 
+# How far the player can reach.  I think this value needs to be bigger
+# than the MAX_MOVE_DISTANCE or else the player may not be able to move
+# into a position to reach some objects (it may be mathematically impossible).
+DEFAULT_MOVE = 0.1
+
 FORCE_ACTIONS = [
     Action.PUSH_OBJECT,
     Action.PULL_OBJECT,
@@ -0,0 +1,116 @@
+import asyncio
+import concurrent.futures
+import functools
+from typing import Callable, Dict, List, Optional, Tuple, Union
+
+from .config_manager import SceneConfiguration
+from .controller import Controller
+from .scene_cache import CachedScene
+from .step_metadata import StepMetadata
+
+
+class AsyncController():
+    '''
+    Asyncio front-end for an MCS Controller.  Each call runs the blocking
+    Controller call (and its AI2-THOR I/O) on a worker thread, so the event
+    loop is free to run other work (like the agent's own perception and
+    planning, or other AsyncControllers) while Unity simulates.
+
+    Calls on one AsyncController are run one at a time, in the order they
+    were made, on a single thread dedicated to its Controller. Use one
+    AsyncController per Controller to drive multiple simulators
+    concurrently, like with asyncio.gather.
+
+    Parameters
+    ----------
+    controller : Controller
+        The MCS Controller to wrap.
+    executor : concurrent.futures.Executor, optional
+        The executor used to run the Controller calls.  It must run its
+        calls one at a time and in order. (default a new single-thread
+        executor)
+    '''
+
+    def __init__(
+        self,
+        controller: Controller,
+        executor: concurrent.futures.Executor = None
+    ):
+        self._controller = controller
+        self._executor = executor or concurrent.futures.ThreadPoolExecutor(
+            max_workers=1,
+            thread_name_prefix='mcs-controller'
+        )
+
+    @property
+    def controller(self) -> Controller:
+        '''The wrapped MCS Controller.'''
+        return self._controller
+
+    async def _run(self, function: Callable, *args, **kwargs):
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(
+            self._executor,
+            functools.partial(function, *args, **kwargs)
+        )
+
+    async def start_scene(
+        self,
+        config_data: Union[SceneConfiguration, CachedScene, Dict]
+    ) -> StepMetadata:
+        '''See Controller.start_scene'''
+        return await self._run(self._controller.start_scene, config_data)
+
+    async def step(self, action: str, **kwargs) -> Optional[StepMetadata]:
+        '''See Controller.step'''
+        return await self._run(self._controller.step, action, **kwargs)
+
+    async def step_many(
+        self,
+        actions: List[Union[str, Tuple[str, Dict]]],
+        **kwargs
+    ) -> List[StepMetadata]:
+        '''See Controller.step_many'''
+        return await self._run(self._controller.step_many, actions, **kwargs)
+
+    async def step_until(
+        self,
+        action: str,
+        predicate: Callable[[StepMetadata], bool],
+        **kwargs
+    ) -> Optional[StepMetadata]:
+        '''See Controller.step_until.  The predicate is called on the
+        Controller's thread, not on the event loop.'''
+        return await self._run(
+            self._controller.step_until, action, predicate, **kwargs)
+
+    async def end_scene(
+        self,
+        rating: Optional[float] = None,
+        score: Optional[float] = None,
+        report: Dict[int, object] = None
+    ) -> None:
+        '''See Controller.end_scene'''
+        kwargs = {'rating': rating, 'score': score}
+        if report is not None:
+            kwargs['report'] = report
+        return await self._run(self._controller.end_scene, **kwargs)
+
+    async def retrieve_object_states(self, object_id: str) -> List:
+        '''See Controller.retrieve_object_states'''
+        return await self._run(
+            self._controller.retrieve_object_states, object_id)
+
+    async def stop_simulation(self) -> None:
+        '''Stop the 3D simulation environment and this AsyncController's
+        thread.  Neither will work any more.'''
+        try:
+            await self._run(self._controller.stop_simulation)
+        finally:
+            self._executor.shutdown(wait=False)
+
+    async def __aenter__(self) -> 'AsyncController':
+        return self
+
+    async def __aexit__(self, exc_type, exc_value, traceback) -> None:
+        await self.stop_simulation()
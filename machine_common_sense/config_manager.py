@@ -1,12 +1,15 @@
 import ast
 import configparser  # noqa: F401
+import dataclasses
 import logging
 import os
+from dataclasses import dataclass
 from enum import Enum, unique
-from typing import Dict, List, Optional, Tuple
+from typing import Any, Callable, Dict, List, Optional, Tuple
 
 import numpy as np
 from pydantic import BaseModel as PydanticBaseModel
+from pydantic import PrivateAttr
 
 from .action import Action
 from .goal_metadata import GoalCategory, GoalMetadata
@@ -315,20 +318,100 @@ class TerminalOutputMode(Enum):
     SCENE = 'scene'
 
 
+class _VersionedConfigParser(configparser.ConfigParser):
+    '''ConfigParser that counts its changes, so a ConfigManager knows when
+    its snapshot is out of date.'''
+
+    def __init__(self, *args, **kwargs):
+        self.version = 0
+        super().__init__(*args, **kwargs)
+
+    def read(self, *args, **kwargs):
+        self.version += 1
+        return super().read(*args, **kwargs)
+
+    def read_file(self, *args, **kwargs):
+        self.version += 1
+        return super().read_file(*args, **kwargs)
+
+    def read_dict(self, *args, **kwargs):
+        self.version += 1
+        return super().read_dict(*args, **kwargs)
+
+    def add_section(self, *args, **kwargs):
+        self.version += 1
+        return super().add_section(*args, **kwargs)
+
+    def set(self, *args, **kwargs):
+        self.version += 1
+        return super().set(*args, **kwargs)
+
+    def remove_option(self, *args, **kwargs):
+        self.version += 1
+        return super().remove_option(*args, **kwargs)
+
+    def remove_section(self, *args, **kwargs):
+        self.version += 1
+        return super().remove_section(*args, **kwargs)
+
+    def __setitem__(self, *args, **kwargs):
+        self.version += 1
+        return super().__setitem__(*args, **kwargs)
+
+
+@dataclass(frozen=True)
+class ConfigSnapshot:
+    '''The typed values of a ConfigManager's config options, with their
+    defaults applied.'''
+    async_subscribers: bool
+    async_subscriber_queue_size: int
+    controller_timeout: int
+    depth_maps_enabled: bool
+    evaluation_name: str
+    goal_reward: Optional[float]
+    history_enabled: bool
+    history_streaming: bool
+    lava_penalty: Optional[float]
+    metadata_tier: MetadataTier
+    noise_enabled: bool
+    object_masks_enabled: bool
+    only_return_goal_object: bool
+    position_disabled: bool
+    recorder_max_queue_size: int
+    recorder_queue_full_policy: str
+    save_debug_images: bool
+    save_debug_json: bool
+    size: int
+    step_penalty: Optional[float]
+    steps_allowed_in_lava: int
+    team: str
+    terminal_output_mode: Tuple[TerminalOutputMode, ...]
+    timeout: int
+    top_down_camera: bool
+    top_down_plotter: bool
+    validate_event_payloads: bool
+    video_enabled: bool
+
+
 class ConfigManager:
 
     DEFAULT_ROOM_DIMENSIONS = Vector3d(x=10, y=3, z=10)
     CONFIG_FILE_ENV_VAR = 'MCS_CONFIG_FILE_PATH'
     CONFIG_DEFAULT_SECTION = 'MCS'
+    CONFIG_ASYNC_SUBSCRIBERS = 'async_subscribers'
+    CONFIG_ASYNC_SUBSCRIBER_QUEUE_SIZE = 'async_subscriber_queue_size'
     CONFIG_DISABLE_DEPTH_MAPS = 'disable_depth_maps'
     CONFIG_DISABLE_OBJECT_MASKS = 'disable_object_masks'
     CONFIG_DISABLE_POSITION = 'disable_position'
     CONFIG_EVALUATION_NAME = 'evaluation_name'
     CONFIG_GOAL_REWARD = 'goal_reward'
     CONFIG_HISTORY_ENABLED = 'history_enabled'
+    CONFIG_HISTORY_STREAMING = 'history_streaming'
     CONFIG_LAVA_PENALTY = 'lava_penalty'
     CONFIG_METADATA_TIER = 'metadata'
     CONFIG_NOISE_ENABLED = 'noise_enabled'
+    CONFIG_RECORDER_MAX_QUEUE_SIZE = 'recorder_max_queue_size'
+    CONFIG_RECORDER_QUEUE_FULL_POLICY = 'recorder_queue_full_policy'
     CONFIG_ONLY_RETURN_GOAL_OBJECT = 'only_return_goal_object'
     CONFIG_SAVE_DEBUG_IMAGES = 'save_debug_images'
     CONFIG_SAVE_DEBUG_JSON = 'save_debug_json'
@@ -341,6 +424,7 @@ class ConfigManager:
     CONFIG_TOP_DOWN_PLOTTER = 'top_down_plotter'
     CONFIG_TOP_DOWN_CAMERA = 'top_down_camera'
     CONFIG_CONTROLLER_TIMEOUT = 'controller_timeout'
+    CONFIG_VALIDATE_EVENT_PAYLOADS = 'validate_event_payloads'
     CONFIG_VIDEO_ENABLED = 'video_enabled'
 
     # Please keep the aspect ratio as 3:2 because the IntPhys scenes are built
@@ -358,11 +442,26 @@ class ConfigManager:
     # Default time for initalizing a controller.
     CONTROLLER_TIMEOUT_DEFAULT = 600
 
+    # Default max events waiting for each asynchronous subscriber
+    ASYNC_SUBSCRIBER_QUEUE_SIZE_DEFAULT = 16
+
+    # Default max items (like video frames) waiting in each recorder queue
+    RECORDER_MAX_QUEUE_SIZE_DEFAULT = 128
+    RECORDER_QUEUE_FULL_POLICY_DEFAULT = 'block'
+    # The values of recorder.QueueFullPolicy
+    RECORDER_QUEUE_FULL_POLICIES = ('block', 'drop')
+
     def __init__(self, config_file_or_dict=None):
         '''
         Configuration preferences passed in by the user.
         '''
-        self._config = configparser.ConfigParser()
+        self._config = _VersionedConfigParser()
+        self._snapshot: Optional[ConfigSnapshot] = None
+        self._snapshot_version = None
+        # The field values read so far, by name, and the config version
+        # they're from.
+        self._values: Dict[str, Any] = {}
+        self._values_version = None
 
         # For config, look for environment variable first,
         # then look at config_file_or_dict from constructor
@@ -395,58 +494,140 @@ class ConfigManager:
             raise FileNotFoundError()
 
     def _validate_screen_size(self):
-        if (self.get_size() < self.SCREEN_WIDTH_MIN):
+        if (self._read_size() < self.SCREEN_WIDTH_MIN):
             self._config.set(
                 self.CONFIG_DEFAULT_SECTION,
                 self.CONFIG_SIZE,
                 str(self.SCREEN_WIDTH_DEFAULT)
             )
 
-    def is_file_writing_enabled(self):
-        return (
-            self.is_save_debug_images() or
-            self.is_save_debug_json() or
-            self.is_video_enabled()
-        )
-
-    def get_evaluation_name(self):
-        return self._config.get(
-            self.CONFIG_DEFAULT_SECTION,
-            self.CONFIG_EVALUATION_NAME,
-            fallback=''
-        )
-
-    def get_metadata_tier(self):
-        metadata = self._config.get(
-            self.CONFIG_DEFAULT_SECTION,
-            self.CONFIG_METADATA_TIER,
-            fallback='default'
-        )
-
-        return MetadataTier(metadata)
-
-    def set_metadata_tier(self, mode):
-        self._config.set(
+    @property
+    def snapshot(self) -> 'ConfigSnapshot':
+        '''All the config values, compiled into a ConfigSnapshot the first
+        time they're needed after any change.  Raises an error if any option
+        is malformed; the getters only read (and raise errors for) their own
+        options.'''
+        if (
+            self._snapshot is None or
+            self._snapshot_version != self._config.version
+        ):
+            self._snapshot_version = self._config.version
+            self._snapshot = ConfigSnapshot(**{
+                field.name: self._get_value(field.name)
+                for field in dataclasses.fields(ConfigSnapshot)
+            })
+        return self._snapshot
+
+    def invalidate(self) -> None:
+        '''Re-read the config values the next time they're needed.  Changes
+        made through the ConfigManager setters (or to its ConfigParser) do
+        this automatically.'''
+        self._snapshot = None
+        self._values_version = None
+
+    def _get_value(self, name: str) -> Any:
+        '''Return the value of the given ConfigSnapshot field, read the first
+        time it's needed after any change, so the getters don't re-parse
+        their options on each call.'''
+        if self._values_version != self._config.version:
+            self._values = {}
+            self._values_version = self._config.version
+        if name not in self._values:
+            self._values[name] = self._field_readers()[name]()
+        return self._values[name]
+
+    def _field_readers(self) -> Dict[str, Callable[[], Any]]:
+        # The functions that read each ConfigSnapshot field's value.
+        section = self.CONFIG_DEFAULT_SECTION
+        config = self._config
+        return {
+            'async_subscribers': lambda: config.getboolean(
+                section, self.CONFIG_ASYNC_SUBSCRIBERS, fallback=False),
+            'async_subscriber_queue_size': lambda: config.getint(
+                section,
+                self.CONFIG_ASYNC_SUBSCRIBER_QUEUE_SIZE,
+                fallback=self.ASYNC_SUBSCRIBER_QUEUE_SIZE_DEFAULT
+            ),
+            'controller_timeout': lambda: config.getint(
+                section,
+                self.CONFIG_CONTROLLER_TIMEOUT,
+                fallback=self.CONTROLLER_TIMEOUT_DEFAULT
+            ),
+            'depth_maps_enabled': lambda: not config.getboolean(
+                section, self.CONFIG_DISABLE_DEPTH_MAPS, fallback=False),
+            'evaluation_name': lambda: config.get(
+                section, self.CONFIG_EVALUATION_NAME, fallback=''),
+            'goal_reward': lambda: config.getfloat(
+                section, self.CONFIG_GOAL_REWARD, fallback=None),
+            'history_enabled': lambda: config.getboolean(
+                section, self.CONFIG_HISTORY_ENABLED, fallback=True),
+            'history_streaming': lambda: config.getboolean(
+                section, self.CONFIG_HISTORY_STREAMING, fallback=False),
+            'lava_penalty': lambda: config.getfloat(
+                section, self.CONFIG_LAVA_PENALTY, fallback=None),
+            'metadata_tier': lambda: MetadataTier(config.get(
+                section, self.CONFIG_METADATA_TIER, fallback='default')),
+            'noise_enabled': lambda: config.getboolean(
+                section, self.CONFIG_NOISE_ENABLED, fallback=False),
+            'object_masks_enabled': lambda: not config.getboolean(
+                section, self.CONFIG_DISABLE_OBJECT_MASKS, fallback=False),
+            'only_return_goal_object': lambda: config.getboolean(
+                section, self.CONFIG_ONLY_RETURN_GOAL_OBJECT, fallback=False),
+            'position_disabled': lambda: config.getboolean(
+                section, self.CONFIG_DISABLE_POSITION, fallback=False),
+            'recorder_max_queue_size': lambda: config.getint(
+                section,
+                self.CONFIG_RECORDER_MAX_QUEUE_SIZE,
+                fallback=self.RECORDER_MAX_QUEUE_SIZE_DEFAULT
+            ),
+            'recorder_queue_full_policy': self._read_queue_full_policy,
+            'save_debug_images': lambda: config.getboolean(
+                section, self.CONFIG_SAVE_DEBUG_IMAGES, fallback=False),
+            'save_debug_json': lambda: config.getboolean(
+                section, self.CONFIG_SAVE_DEBUG_JSON, fallback=False),
+            'size': self._read_size,
+            'step_penalty': lambda: config.getfloat(
+                section, self.CONFIG_STEP_PENALTY, fallback=None),
+            'steps_allowed_in_lava': lambda: config.getint(
+                section,
+                self.CONFIG_STEPS_ALLOWED_IN_LAVA,
+                fallback=self.STEPS_ALLOWED_IN_LAVA_DEFAULT
+            ),
+            'team': lambda: config.get(section, self.CONFIG_TEAM, fallback=''),
+            'terminal_output_mode': self._read_terminal_output_mode,
+            'timeout': lambda: config.getint(
+                section, self.CONFIG_TIMEOUT, fallback=self.TIMEOUT_DEFAULT),
+            'top_down_camera': lambda: config.getboolean(
+                section, self.CONFIG_TOP_DOWN_CAMERA, fallback=True),
+            'top_down_plotter': lambda: config.getboolean(
+                section, self.CONFIG_TOP_DOWN_PLOTTER, fallback=False),
+            'validate_event_payloads': lambda: config.getboolean(
+                section, self.CONFIG_VALIDATE_EVENT_PAYLOADS, fallback=False),
+            'video_enabled': lambda: config.getboolean(
+                section, self.CONFIG_VIDEO_ENABLED, fallback=False)
+        }
+
+    def _read_queue_full_policy(self) -> str:
+        policy = self._config.get(
             self.CONFIG_DEFAULT_SECTION,
-            self.CONFIG_METADATA_TIER,
-            mode
-        )
-
-    def get_size(self):
+            self.CONFIG_RECORDER_QUEUE_FULL_POLICY,
+            fallback=self.RECORDER_QUEUE_FULL_POLICY_DEFAULT
+        ).lower()
+        if policy not in self.RECORDER_QUEUE_FULL_POLICIES:
+            raise ValueError(
+                f'Invalid {self.CONFIG_RECORDER_QUEUE_FULL_POLICY} config '
+                f'option "{policy}": must be one of '
+                f'{", ".join(self.RECORDER_QUEUE_FULL_POLICIES)}')
+        return policy
+
+    def _read_size(self) -> int:
         return self._config.getint(
             self.CONFIG_DEFAULT_SECTION,
             self.CONFIG_SIZE,
             fallback=self.SCREEN_WIDTH_DEFAULT
         )
 
-    def get_team(self):
-        return self._config.get(
-            self.CONFIG_DEFAULT_SECTION,
-            self.CONFIG_TEAM,
-            fallback=''
-        )
-
-    def get_terminal_output_mode(self) -> List[TerminalOutputMode]:
+    def _read_terminal_output_mode(self) -> Tuple[TerminalOutputMode, ...]:
         try:
             # If mode is boolean, return all or nothing.
             terminal_output_mode = self._config.getboolean(
@@ -455,8 +636,8 @@ class ConfigManager:
                 fallback=True
             )
             if terminal_output_mode:
-                return [mode for mode in TerminalOutputMode]
-            return []
+                return tuple(TerminalOutputMode)
+            return ()
         except ValueError:
             # If mode is string, assume comma separated list.
             terminal_output_mode = self._config.get(
@@ -465,124 +646,111 @@ class ConfigManager:
                 fallback=True
             )
             if not terminal_output_mode:
-                return []
+                return ()
             inputs = terminal_output_mode.split(',')
             if 'all' in inputs or 'ALL' in inputs:
-                return [mode for mode in TerminalOutputMode]
-            return [
+                return tuple(TerminalOutputMode)
+            return tuple(
                 mode for mode in TerminalOutputMode
                 if mode.value in inputs or mode.value.upper() in inputs
-            ]
+            )
 
-    def is_history_enabled(self):
-        return self._config.getboolean(
-            self.CONFIG_DEFAULT_SECTION,
-            self.CONFIG_HISTORY_ENABLED,
-            fallback=True
+    def is_file_writing_enabled(self):
+        return (
+            self._get_value('save_debug_images') or
+            self._get_value('save_debug_json') or
+            self._get_value('video_enabled')
         )
 
-    def is_noise_enabled(self):
-        return self._config.getboolean(
+    def is_async_subscribers_enabled(self) -> bool:
+        return self._get_value('async_subscribers')
+
+    def get_async_subscriber_queue_size(self) -> int:
+        return self._get_value('async_subscriber_queue_size')
+
+    def get_evaluation_name(self):
+        return self._get_value('evaluation_name')
+
+    def get_metadata_tier(self):
+        return self._get_value('metadata_tier')
+
+    def set_metadata_tier(self, mode):
+        self._config.set(
             self.CONFIG_DEFAULT_SECTION,
-            self.CONFIG_NOISE_ENABLED,
-            fallback=False
+            self.CONFIG_METADATA_TIER,
+            mode
         )
 
+    def get_size(self):
+        return self._get_value('size')
+
+    def get_team(self):
+        return self._get_value('team')
+
+    def get_terminal_output_mode(self) -> List[TerminalOutputMode]:
+        return list(self._get_value('terminal_output_mode'))
+
+    def is_history_enabled(self):
+        return self._get_value('history_enabled')
+
+    def is_history_streaming_enabled(self):
+        return self._get_value('history_streaming')
+
+    def is_noise_enabled(self):
+        return self._get_value('noise_enabled')
+
+    def get_recorder_max_queue_size(self) -> int:
+        return self._get_value('recorder_max_queue_size')
+
+    def get_recorder_queue_full_policy(self) -> str:
+        return self._get_value('recorder_queue_full_policy')
+
     def is_save_debug_images(self):
-        return self._config.getboolean(
-            self.CONFIG_DEFAULT_SECTION,
-            self.CONFIG_SAVE_DEBUG_IMAGES,
-            fallback=False
-        )
+        return self._get_value('save_debug_images')
 
     def is_save_debug_json(self):
-        return self._config.getboolean(
-            self.CONFIG_DEFAULT_SECTION,
-            self.CONFIG_SAVE_DEBUG_JSON,
-            fallback=False
-        )
+        return self._get_value('save_debug_json')
 
     def is_video_enabled(self):
-        return self._config.getboolean(
-            self.CONFIG_DEFAULT_SECTION,
-            self.CONFIG_VIDEO_ENABLED,
-            fallback=False
-        )
+        return self._get_value('video_enabled')
 
     def is_depth_maps_enabled(self) -> bool:
-        return not self._config.getboolean(
-            self.CONFIG_DEFAULT_SECTION,
-            self.CONFIG_DISABLE_DEPTH_MAPS,
-            fallback=False
-        )
+        return self._get_value('depth_maps_enabled')
 
     def is_only_return_object_goal(self) -> bool:
-        return self._config.getboolean(
-            self.CONFIG_DEFAULT_SECTION,
-            self.CONFIG_ONLY_RETURN_GOAL_OBJECT,
-            fallback=False
-        )
+        return self._get_value('only_return_goal_object')
 
     def is_position_disabled(self) -> bool:
-        return self._config.getboolean(
-            self.CONFIG_DEFAULT_SECTION,
-            self.CONFIG_DISABLE_POSITION,
-            fallback=False
-        )
+        return self._get_value('position_disabled')
 
     def is_object_masks_enabled(self) -> bool:
-        return not self._config.getboolean(
-            self.CONFIG_DEFAULT_SECTION,
-            self.CONFIG_DISABLE_OBJECT_MASKS,
-            fallback=False
-        )
+        return self._get_value('object_masks_enabled')
 
     def get_screen_size(self) -> Tuple[int, int]:
         return (self.get_screen_width(), self.get_screen_height())
 
     def get_screen_width(self) -> int:
-        return self.get_size()
+        return self._get_value('size')
 
     def get_screen_height(self) -> int:
-        size = self.get_size()
-        return int(size / 3 * 2)
+        return int(self._get_value('size') / 3 * 2)
 
     def get_lava_penalty(self):
-        return self._config.getfloat(
-            self.CONFIG_DEFAULT_SECTION,
-            self.CONFIG_LAVA_PENALTY,
-            fallback=None
-        )
+        return self._get_value('lava_penalty')
 
     def get_step_penalty(self):
-        return self._config.getfloat(
-            self.CONFIG_DEFAULT_SECTION,
-            self.CONFIG_STEP_PENALTY,
-            fallback=None
-        )
+        return self._get_value('step_penalty')
 
     def get_goal_reward(self):
-        return self._config.getfloat(
-            self.CONFIG_DEFAULT_SECTION,
-            self.CONFIG_GOAL_REWARD,
-            fallback=None
-        )
+        return self._get_value('goal_reward')
 
     def get_steps_allowed_in_lava(self):
-        return self._config.getint(
-            self.CONFIG_DEFAULT_SECTION,
-            self.CONFIG_STEPS_ALLOWED_IN_LAVA,
-            fallback=self.STEPS_ALLOWED_IN_LAVA_DEFAULT
-        )
+        return self._get_value('steps_allowed_in_lava')
 
     def get_controller_timeout(self):
         """ Time (in seconds) to allow a run to be idle
         before attempting to end scene"""
-        return self._config.getint(
-            self.CONFIG_DEFAULT_SECTION,
-            self.CONFIG_CONTROLLER_TIMEOUT,
-            fallback=self.CONTROLLER_TIMEOUT_DEFAULT
-        )
+        return self._get_value('controller_timeout')
 
     def set_controller_timeout(self, seconds):
         """ Time (in seconds) to allow a controller to initialization
@@ -596,11 +764,7 @@ class ConfigManager:
     def get_timeout(self):
         """ Time (in seconds) to allow a run to be idle
         before attempting to end scene"""
-        return self._config.getint(
-            self.CONFIG_DEFAULT_SECTION,
-            self.CONFIG_TIMEOUT,
-            fallback=self.TIMEOUT_DEFAULT
-        )
+        return self._get_value('timeout')
 
     def set_timeout(self, seconds):
         """ Setting the time (in seconds) to allow a run to be idle
@@ -614,20 +778,17 @@ class ConfigManager:
     def is_top_down_plotter(self) -> bool:
         """Toggles whether old plotter should be used to create top down
         videos if videos are enabled."""
-        return self._config.getboolean(
-            self.CONFIG_DEFAULT_SECTION,
-            self.CONFIG_TOP_DOWN_PLOTTER,
-            fallback=False
-        )
+        return self._get_value('top_down_plotter')
 
     def is_top_down_camera(self) -> bool:
         """Toggles whether the new top down camera is used to create top down
         videos if videos are enabled."""
-        return self._config.getboolean(
-            self.CONFIG_DEFAULT_SECTION,
-            self.CONFIG_TOP_DOWN_CAMERA,
-            fallback=True
-        )
+        return self._get_value('top_down_camera')
+
+    def is_validate_event_payloads(self) -> bool:
+        """Whether the controller validates each event payload before
+        publishing it (slower; for debugging subscribers)."""
+        return self._get_value('validate_event_payloads')
 
 
 class SceneConfiguration(BaseModel):
@@ -667,6 +828,9 @@ class SceneConfiguration(BaseModel):
     sequence_number: Optional[int]
     training: Optional[bool]
 
+    # Each object's state list at each step, by object ID.
+    _object_states: Optional[Dict[str, List[List[str]]]] = PrivateAttr(None)
+
     def is_passive_scene(self) -> bool:
         """Return whether this scene is a passive scene."""
         goal = self.goal or Goal()
@@ -696,36 +860,49 @@ class SceneConfiguration(BaseModel):
         return d
     """
 
+    def index_object_states(self) -> None:
+        """Index each object's state list at each step by the object's ID,
+        for retrieve_object_states.  Called at the start of each scene; call
+        again after changing the scene's objects."""
+        object_states = {}
+        for object_config in self.objects:
+            if object_config.id in object_states:
+                continue
+            state_list_each_step = []
+            for state_list in (object_config.states or []):
+                # Validate the data type.
+                if state_list is None:
+                    state_list = []
+                elif not isinstance(state_list, list):
+                    state_list = [state_list]
+                else:
+                    state_list = [str(state) for state in state_list]
+                state_list_each_step.append(state_list)
+            object_states[object_config.id] = state_list_each_step
+        self._object_states = object_states
+
     def retrieve_object_states(self,
                                object_id, step_number):
         """Return the state list at the current step for the object with the
         given ID from the scene configuration data, if any."""
-        state_list_each_step = next(
-            (
-                object_config.states or []
-                for object_config in self.objects
-                if object_config.id == object_id
-            ),
-            [],
-        )
+        if self._object_states is None:
+            self.index_object_states()
+        state_list_each_step = self._object_states.get(object_id, [])
 
         # Retrieve the object's states in the current step.
         if len(state_list_each_step) > step_number:
-            state_list = state_list_each_step[step_number]
-            # Validate the data type.
-            if state_list is not None:
-                if not isinstance(state_list, list):
-                    return [state_list]
-                return [str(state) for state in state_list]
+            return list(state_list_each_step[step_number])
         return []
 
-    def retrieve_goal(self, steps_allowed_in_lava=0):
+    def get_normalized_goal(self) -> Optional[Goal]:
+        """Return a copy of the scene's goal with its action list parsed into
+        tuples, its category in its metadata, and its target images parsed,
+        without modifying this scene configuration (which may be shared by a
+        SceneCache)."""
         if not self.goal:
-            return self.update_goal_target_image(GoalMetadata(
-                steps_allowed_in_lava=steps_allowed_in_lava
-            ))
+            return None
 
-        goal = self.goal
+        goal = self.goal.copy(deep=True)
         goal.metadata = goal.metadata or {}
 
         # Transform action list data from strings to tuples.
@@ -741,9 +918,27 @@ class SceneConfiguration(BaseModel):
             # Backwards compatibility
             goal.metadata['category'] = goal.category
 
+        return self.update_goal_target_image(goal)
+
+    def get_unity_config(self) -> Dict:
+        """Return this scene configuration as the dict sent to Unity, with
+        its goal normalized like retrieve_goal's."""
+        config = self.dict(exclude_none=True, by_alias=True)
+        goal = self.get_normalized_goal()
+        if goal is not None:
+            config['goal'] = goal.dict(exclude_none=True, by_alias=True)
+        return config
+
+    def retrieve_goal(self, steps_allowed_in_lava=0):
+        goal = self.get_normalized_goal()
+        if not goal:
+            return self.update_goal_target_image(GoalMetadata(
+                steps_allowed_in_lava=steps_allowed_in_lava
+            ))
+
         return self.update_goal_target_image(
             GoalMetadata(
-                action_list=action_list or None,
+                action_list=goal.action_list or None,
                 category=goal.category or '',
                 description=goal.description or '',
                 habituation_total=goal.habituation_total or 0,
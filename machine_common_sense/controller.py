@@ -10,7 +10,7 @@ import os
 import platform
 import threading
 import time
-from typing import Dict, List, Optional, Union
+from typing import Callable, Collection, Dict, List, Optional, Tuple, Union
 
 import ai2thor.controller
 import ai2thor.fifo_server
@@ -21,19 +21,17 @@ import typeguard  # can we replace with pydantic function validator?
 
 logger = logging.getLogger(__name__)
 
-
-# How far the player can reach.  I think this value needs to be bigger
-# than the MAX_MOVE_DISTANCE or else the player may not be able to move
-# into a position to reach some objects (it may be mathematically impossible).
-DEFAULT_MOVE = 0.1
-
-from .action import Action
+# DEFAULT_MOVE is imported for backwards compatibility.
+from .action import DEFAULT_MOVE, Action  # noqa: F401
 from .config_manager import ConfigManager, SceneConfiguration
 from .controller_events import (AfterStepPayload, BeforeStepPayload,
                                 EndScenePayload, EventType, StartScenePayload)
 from .controller_output_handler import ControllerOutputHandler
+from .event_dispatcher import AsyncEventDispatcher
+from .frame_list import FrameList
 from .goal_metadata import GoalMetadata
 from .parameter import Parameter, compare_param_values, rebuild_endhabituation
+from .scene_cache import CachedScene
 from .step_metadata import StepMetadata
 
 
@@ -138,6 +136,8 @@ class Controller():
     def _on_init(self):
         '''Set class variables after controller is initialized'''
         self._subscribers = []
+        # Publishes events on background threads, if configured.
+        self._event_dispatcher = None
         self._failure_handler_registered = False
         self._end_scene_called = False
         self._goal = GoalMetadata()
@@ -157,9 +157,20 @@ class Controller():
 
         For users, call machine_common_sense.change_config()
         '''
+        if config.is_file_writing_enabled():
+            # Raise any recorder config error now, rather than within the
+            # subscribers, which would only log it.
+            config.get_recorder_queue_full_policy()
+        # Let subscribers handle their queued events with the old config.
+        if self._event_dispatcher:
+            self._event_dispatcher.close()
         self._config = config
         self._output_handler = ControllerOutputHandler(self._config)
         self.parameter_converter = Parameter(config)
+        self._event_dispatcher = (
+            AsyncEventDispatcher(config.get_async_subscriber_queue_size())
+            if config.is_async_subscribers_enabled() else None
+        )
 
     def _check_step_for_timeout(self):
         '''Meant for use during eval, if a scene is hung on the same step
@@ -193,7 +204,7 @@ class Controller():
 
     @typeguard.typechecked
     def start_scene(
-        self, config_data: Union[SceneConfiguration, Dict]) \
+        self, config_data: Union[SceneConfiguration, CachedScene, Dict]) \
             -> StepMetadata:
         """
         Starts a new scene using the given scene configuration data dict and
@@ -201,9 +212,11 @@ class Controller():
 
         Parameters
         ----------
-        config_data : SceneConfiguration or dict that can be serialized to
-            SceneConfiguration
-            The MCS scene configuration data for the scene to start.
+        config_data : SceneConfiguration, CachedScene, or dict that can be
+            serialized to SceneConfiguration
+            The MCS scene configuration data for the scene to start.  Use a
+            CachedScene (see SceneCache) to skip validating the same scene
+            each time it's run.
 
         Returns
         -------
@@ -213,21 +226,19 @@ class Controller():
         """
 
         scene_config = self._convert_scene_config(config_data)
+        scene_config.index_object_states()
 
         self._scene_config = scene_config
         # When one target key is 'target'
         # When multiple targets key is 'targets'
-        if config_data.get('goal') is not None and \
-            config_data['goal'].get('metadata') is not None and \
-                config_data['goal']['metadata'].get('target') is not None:
+        goal_metadata = (
+            scene_config.goal.metadata if scene_config.goal else None
+        ) or {}
+        if goal_metadata.get('target') is not None:
+            self.__goal_object_ids = [goal_metadata['target']['id']]
+        elif goal_metadata.get('targets') is not None:
             self.__goal_object_ids = \
-                [config_data['goal']['metadata']['target']['id']]
-        elif config_data.get('goal') is not None and \
-            config_data['goal'].get('metadata') is not None and \
-                config_data['goal']['metadata'].get('targets') is not None:
-            self.__goal_object_ids = \
-                [sub['id'] for sub in
-                    config_data['goal']['metadata']['targets']]
+                [sub['id'] for sub in goal_metadata['targets']]
         else:
             self.__goal_object_ids = []
         self.__habituation_trial = 1
@@ -252,7 +263,10 @@ class Controller():
             for file_path in file_list:
                 os.remove(file_path)
 
-        sc = scene_config.dict(exclude_none=True, by_alias=True)
+        if isinstance(config_data, CachedScene):
+            sc = config_data.unity_config
+        else:
+            sc = scene_config.get_unity_config()
 
         ai2thor_step = self.parameter_converter.wrap_step(
             output_folder=self.__output_folder,
@@ -274,25 +288,10 @@ class Controller():
         if not skip_preview_phase:
             if (self._goal is not None and
                     self._goal.last_preview_phase_step > 0):
-                image_list = output.image_list
-                depth_map_list = output.depth_map_list
-                object_mask_list = output.object_mask_list
-
                 logger.debug('STARTING PREVIEW PHASE...')
-
-                for _ in range(self._goal.last_preview_phase_step):
-                    output = self.step('Pass')
-                    image_list = image_list + output.image_list
-                    depth_map_list = depth_map_list + output.depth_map_list
-                    object_mask_list = (object_mask_list +
-                                        output.object_mask_list)
-
+                output = self._fast_forward_preview_phase(output)
                 logger.debug('ENDING PREVIEW PHASE')
 
-                output.image_list = image_list
-                output.depth_map_list = depth_map_list
-                output.object_mask_list = object_mask_list
-
             # TODO Should this be in the if block?  Now that we are using
             # subscribers, we may want to always register
             if (self._failure_handler_registered is False and
@@ -314,6 +313,8 @@ class Controller():
     def _convert_scene_config(self, config_data) -> SceneConfiguration:
         if isinstance(config_data, SceneConfiguration):
             return config_data
+        if isinstance(config_data, CachedScene):
+            return config_data.scene_config
         return SceneConfiguration(**config_data)
 
     def step(self, action: str, **kwargs: str) -> Optional[StepMetadata]:
@@ -339,12 +340,177 @@ class Controller():
             ValueError: If values are outside acceptable ranges or unable to
                 convert to a number.
         """
-        if (self._goal.last_step is not None and
-                self._goal.last_step == self.__step_number):
-            logger.error(
-                "You have passed the last step for this scene. "
-                "Ignoring your action. Please call controller.end_scene() "
-                "now.")
+        return self._step(action, kwargs)
+
+    def step_many(
+        self,
+        actions: List[Union[str, Tuple[str, Dict]]],
+        keep_outputs: Optional[Collection[int]] = None,
+        publish_events: bool = True
+    ) -> List[StepMetadata]:
+        """
+        Runs the given actions, in order, within the current scene, and
+        returns only the outputs that were asked for. Stops early if the
+        "last_step" of this scene is reached.
+
+        Parameters
+        ----------
+        actions : list of strings or (string, dict) tuples
+            The actions to run. Each action is either an action string (like
+            "Pass" or "MoveAhead,amount=0.5") or an action string and its
+            parameters as a tuple (like the tuples in the action_list).
+        keep_outputs : collection of ints, optional
+            The indexes, in the given actions, of the outputs to return.
+            By default, only the output of the final action run is returned:
+            the final given action's, or the output of the scene's
+            "last_step" if it's reached before every action is run.
+        publish_events : bool, optional
+            Whether to notify the subscribers (history, debug, and video
+            writers) of each step. If False, no subscribers are notified of
+            these steps, so they will be missing from any history file and
+            video, and only the restricted outputs that were asked for are
+            built. (default True)
+
+        Returns
+        -------
+        list of StepMetadata
+            The MCS output data objects from the kept actions, in order.
+            Empty if no actions were run because the scene's "last_step"
+            was already reached.
+
+        Raises
+        ------
+            ValueError: If an action is not in the action list.
+        """
+        keep_final = keep_outputs is None
+        keep_outputs = set(keep_outputs or ())
+        outputs = []
+        for index, action_data in enumerate(actions):
+            if self._is_past_last_step():
+                self._log_past_last_step()
+                break
+            action, kwargs = (
+                (action_data, {}) if isinstance(action_data, str)
+                else action_data
+            )
+            keep = index in keep_outputs or (keep_final and (
+                index == len(actions) - 1 or
+                self._goal.last_step == self.__step_number + 1))
+            output = self._step(
+                action,
+                dict(kwargs),
+                build_output=(keep or publish_events),
+                publish_events=publish_events
+            )
+            if keep:
+                outputs.append(output)
+        return outputs
+
+    def step_until(
+        self,
+        action: str,
+        predicate: Callable[[StepMetadata], bool],
+        max_steps: Optional[int] = None,
+        publish_events: bool = True,
+        **kwargs
+    ) -> Optional[StepMetadata]:
+        """
+        Runs the given action repeatedly within the current scene until the
+        given predicate returns True for its output, the max steps are run,
+        or the "last_step" of this scene is reached.
+
+        Parameters
+        ----------
+        action : string
+            A selected action string from the list of available actions.
+        predicate : callable
+            Called with the output of each step; stepping stops once it
+            returns True.
+        max_steps : int, optional
+            The maximum number of steps to run. (default None)
+        publish_events : bool, optional
+            Whether to notify the subscribers (history, debug, and video
+            writers) of each step. If False, only the restricted output of
+            each step is built. (default True)
+        **kwargs
+            Zero or more key-and-value parameters for the action.
+
+        Returns
+        -------
+        StepMetadata
+            The MCS output data object from the last step that was run, or
+            None if no step was run.
+        """
+        output = None
+        step_count = 0
+        while max_steps is None or step_count < max_steps:
+            if self._is_past_last_step():
+                self._log_past_last_step()
+                break
+            output = self._step(
+                action, dict(kwargs), publish_events=publish_events)
+            step_count += 1
+            if predicate(output):
+                break
+        return output
+
+    def _fast_forward_preview_phase(
+            self, output: StepMetadata) -> StepMetadata:
+        '''Run every Pass action of the preview phase and return the output
+        of its final step, with the images, depth maps, and object masks of
+        the whole preview phase (starting with those in the given output).
+        If no subscribers are registered, no output is built for any step
+        except the final one.'''
+        # Collect the lists of each step and concatenate them only once at
+        # the end, so the frames are never copied or converted in between.
+        frame_lists = ([output.image_list], [output.depth_map_list],
+                       [output.object_mask_list])
+        publish_events = len(self._subscribers) > 0
+        last_index = self._goal.last_preview_phase_step - 1
+        for index in range(self._goal.last_preview_phase_step):
+            if self._is_past_last_step():
+                self._log_past_last_step()
+                break
+            is_final_step = index == last_index or (
+                self._goal.last_step == self.__step_number + 1)
+            step_output = self._step(
+                'Pass',
+                {},
+                build_output=(publish_events or is_final_step),
+                publish_events=publish_events,
+                frame_lists=frame_lists
+            )
+            if step_output is not None:
+                output = step_output
+        output.image_list = FrameList.concat(frame_lists[0])
+        output.depth_map_list = FrameList.concat(frame_lists[1])
+        output.object_mask_list = FrameList.concat(frame_lists[2])
+        return output
+
+    def _is_past_last_step(self) -> bool:
+        return (self._goal.last_step is not None and
+                self._goal.last_step == self.__step_number)
+
+    def _log_past_last_step(self):
+        logger.error(
+            "You have passed the last step for this scene. "
+            "Ignoring your action. Please call controller.end_scene() "
+            "now.")
+
+    def _step(
+        self,
+        action: str,
+        kwargs: Dict,
+        build_output: bool = True,
+        publish_events: bool = True,
+        frame_lists: Optional[Tuple[List, List, List]] = None
+    ) -> Optional[StepMetadata]:
+        '''Run the given action.  If publish_events is False, subscribers
+        are not notified and only the restricted output is built (or nothing,
+        if build_output is also False).  If frame_lists are given, this step's
+        image, depth map, and object mask lists are appended to them.'''
+        if self._is_past_last_step():
+            self._log_past_last_step()
             return None
 
         # if they call end scene action they should have
@@ -388,14 +554,15 @@ class Controller():
 
         self.__step_number += 1
 
-        payload = self._create_event_payload_kwargs()
-        payload['action'] = action
-        payload['habituation_trial'] = self.__habituation_trial
-        payload['goal'] = self._goal
+        if publish_events:
+            payload = self._create_event_payload_kwargs()
+            payload['action'] = action
+            payload['habituation_trial'] = self.__habituation_trial
+            payload['goal'] = self._goal
 
-        self._publish_event(
-            EventType.ON_BEFORE_STEP,
-            BeforeStepPayload(**payload))
+            self._publish_event(
+                EventType.ON_BEFORE_STEP,
+                BeforeStepPayload(**payload))
 
         if (action == Action.END_HABITUATION.value):
             self.__habituation_trial += 1
@@ -414,6 +581,25 @@ class Controller():
             **kwargs)
         step_output = self._controller.step(ai2thor_step)
 
+        if not publish_events:
+            self.__steps_in_lava = step_output.metadata.get('stepsOnLava')
+            self.__triggered_by_sequence_incorrect = step_output.metadata.get(
+                'triggeredBySequenceIncorrect')
+            if not build_output:
+                if frame_lists is not None:
+                    self._append_frame_lists(
+                        frame_lists, self._output_handler.handle_frames(
+                            step_output, self.__step_number))
+                return None
+            output = self._output_handler.handle_restricted_output(
+                step_output, self._goal, self.__step_number,
+                self.__habituation_trial)
+            if frame_lists is not None:
+                self._append_frame_lists(frame_lists, (
+                    output.image_list, output.depth_map_list,
+                    output.object_mask_list))
+            return output
+
         (pre_restrict_output, output) = self._output_handler.handle_output(
             step_output, self._goal, self.__step_number,
             self.__habituation_trial)
@@ -431,8 +617,20 @@ class Controller():
             EventType.ON_AFTER_STEP,
             AfterStepPayload(**payload))
 
+        if frame_lists is not None:
+            self._append_frame_lists(frame_lists, (
+                output.image_list, output.depth_map_list,
+                output.object_mask_list))
         return output
 
+    def _append_frame_lists(
+        self,
+        frame_lists: Tuple[List, List, List],
+        step_frame_lists: Tuple[List, List, List]
+    ):
+        for frame_list, step_frame_list in zip(frame_lists, step_frame_lists):
+            frame_list.append(step_frame_list)
+
     @typeguard.typechecked
     def end_scene(
         self,
@@ -532,6 +730,10 @@ class Controller():
                 EndScenePayload(
                     **payload))
             self._end_scene_called = True
+            # Wait for the subscribers to finish writing this scene's
+            # history, debug, and video files.
+            if self._event_dispatcher:
+                self._event_dispatcher.flush()
         else:
             raise RuntimeError("end_scene called twice with the same scene")
 
@@ -547,6 +749,9 @@ class Controller():
     def stop_simulation(self) -> None:
         """Stop the 3D simulation environment. This controller won't work any
         more."""
+        if self._event_dispatcher:
+            self._event_dispatcher.close()
+            self._event_dispatcher = None
         self._controller.stop()
 
     @typeguard.typechecked
@@ -575,13 +780,29 @@ class Controller():
             self._subscribers.append(subscriber)
 
     def remove_all_event_handlers(self):
+        if self._event_dispatcher:
+            self._event_dispatcher.close()
         self._subscribers = []
 
-    @typeguard.typechecked
     def _publish_event(self, event_type: EventType,
                        payload: Union[StartScenePayload, BeforeStepPayload,
                                       AfterStepPayload,
                                       EndScenePayload]):
+        # Payloads are only type checked when debugging, since they're built
+        # on every step.
+        if self._config.is_validate_event_payloads():
+            typeguard.check_type(event_type, EventType)
+            typeguard.check_type(payload, Union[
+                StartScenePayload, BeforeStepPayload, AfterStepPayload,
+                EndScenePayload])
+            payload.validate()
+        # Stamp the time here, since asynchronous subscribers handle the
+        # event later.
+        payload.publish_time = time.perf_counter()
+        if self._event_dispatcher:
+            self._event_dispatcher.publish(
+                self._subscribers, event_type, payload.copy())
+            return
         for subscriber in self._subscribers:
             try:
                 subscriber.on_event(event_type, payload)
@@ -1,11 +1,13 @@
+import copy
 import datetime
 import enum
 from abc import ABC
-from typing import Dict, Optional, Union
+from typing import Any, Dict, Optional, Union
 
+import typeguard
 from ai2thor.server import Event, MultiAgentEvent
 
-from .config_manager import BaseModel, ConfigManager, SceneConfiguration
+from .config_manager import ConfigManager, SceneConfiguration
 from .goal_metadata import GoalMetadata
 from .step_metadata import StepMetadata
 
@@ -20,13 +22,85 @@ class EventType(enum.Enum):
     ON_END_SCENE = enum.auto()
 
 
-class BaseEventPayload(BaseModel):
+class BaseEventPayload():
+    '''
+    Base class for the payloads sent to controller event subscribers.
+    Payloads are built for every event on every step, so they're plain
+    slotted classes whose fields aren't validated, unless the
+    validate_event_payloads config option is enabled (for debugging).  Each
+    class annotates the types of its own fields for validate().
+
+    The controller sets publish_time, the time.perf_counter() seconds when it
+    published the event (which may be well before an asynchronous subscriber
+    handles it); it isn't a field, so it's ignored by __eq__.
+    '''
+
+    __slots__ = ('step_number', 'config', 'scene_config', 'publish_time')
+
     step_number: int
     config: ConfigManager
     scene_config: Optional[SceneConfiguration]
 
+    def __init__(
+        self,
+        *,
+        step_number: int,
+        config: ConfigManager,
+        scene_config: Optional[SceneConfiguration] = None
+    ):
+        self.step_number = step_number
+        self.config = config
+        self.scene_config = scene_config
+        self.publish_time = None
+
+    def copy(self) -> 'BaseEventPayload':
+        '''Return a copy of this payload for subscribers that handle it
+        after the controller returns (see AsyncEventDispatcher).  Data the
+        controller's caller can change, like the goal and restricted step
+        output, is copied; the rest is shared.  The config and scene config
+        are never changed once published (the controller replaces its config
+        only after flushing its subscribers).'''
+        return copy.copy(self)
+
+    @classmethod
+    def _field_types(cls) -> Dict[str, Any]:
+        return {
+            name: field_type
+            for parent in reversed(cls.__mro__)
+            for name, field_type in vars(parent).get(
+                '__annotations__', {}).items()
+        }
+
+    def validate(self) -> None:
+        '''Raise a typeguard.TypeCheckError if any field has the wrong
+        type.'''
+        for name, field_type in self._field_types().items():
+            try:
+                typeguard.check_type(getattr(self, name), field_type)
+            except typeguard.TypeCheckError as error:
+                raise typeguard.TypeCheckError(
+                    f'{type(self).__name__}.{name}: {error}') from error
+
+    def __eq__(self, other) -> bool:
+        if type(other) is not type(self):
+            return NotImplemented
+        return all(
+            getattr(self, name) == getattr(other, name)
+            for name in self._field_types()
+        )
+
+    def __repr__(self) -> str:
+        fields = ', '.join(
+            f'{name}={getattr(self, name)!r}' for name in self._field_types())
+        return f'{type(self).__name__}({fields})'
+
 
 class BasePostActionEventPayload(BaseEventPayload):
+    __slots__ = (
+        'output_folder', 'timestamp', 'wrapped_step', 'step_metadata',
+        'step_output', 'restricted_step_output', 'goal'
+    )
+
     output_folder: Optional[str]
     timestamp: str
     wrapped_step: dict
@@ -35,28 +109,110 @@ class BasePostActionEventPayload(BaseEventPayload):
     restricted_step_output: StepMetadata
     goal: GoalMetadata
 
+    def __init__(
+        self,
+        *,
+        timestamp: str,
+        wrapped_step: dict,
+        step_metadata: Union[Event, MultiAgentEvent],
+        step_output: StepMetadata,
+        restricted_step_output: StepMetadata,
+        goal: GoalMetadata,
+        output_folder: Optional[str] = None,
+        **kwargs
+    ):
+        super().__init__(**kwargs)
+        self.output_folder = output_folder
+        self.timestamp = timestamp
+        self.wrapped_step = wrapped_step
+        self.step_metadata = step_metadata
+        self.step_output = step_output
+        self.restricted_step_output = restricted_step_output
+        self.goal = goal
+
+    def copy(self) -> 'BasePostActionEventPayload':
+        payload_copy = super().copy()
+        payload_copy.restricted_step_output = (
+            self.restricted_step_output.copy())
+        if self.goal is not None:
+            payload_copy.goal = self.goal.copy()
+        return payload_copy
+
 
 class StartScenePayload(BasePostActionEventPayload):
-    ...
+    __slots__ = ()
 
 
 class AfterStepPayload(BasePostActionEventPayload):
+    __slots__ = ('ai2thor_action', 'step_params', 'action_kwargs')
+
     ai2thor_action: str
     step_params: dict
     action_kwargs: dict
 
+    def __init__(
+        self,
+        *,
+        ai2thor_action: str,
+        step_params: dict,
+        action_kwargs: dict,
+        **kwargs
+    ):
+        super().__init__(**kwargs)
+        self.ai2thor_action = ai2thor_action
+        self.step_params = step_params
+        self.action_kwargs = action_kwargs
+
 
 class BeforeStepPayload(BaseEventPayload):
+    __slots__ = ('action', 'goal', 'habituation_trial')
+
     action: str
     goal: GoalMetadata
     habituation_trial: Optional[int]
 
+    def __init__(
+        self,
+        *,
+        action: str,
+        goal: GoalMetadata,
+        habituation_trial: Optional[int] = None,
+        **kwargs
+    ):
+        super().__init__(**kwargs)
+        self.action = action
+        self.goal = goal
+        self.habituation_trial = habituation_trial
+
+    def copy(self) -> 'BeforeStepPayload':
+        payload_copy = super().copy()
+        if self.goal is not None:
+            payload_copy.goal = self.goal.copy()
+        return payload_copy
+
 
 class EndScenePayload(BaseEventPayload):
+    __slots__ = ('rating', 'score', 'report')
+
     rating: Optional[str]
     score: Optional[float]
     report: Optional[dict]
 
+    def __init__(
+        self,
+        *,
+        rating: Optional[str] = None,
+        score: Optional[float] = None,
+        report: Optional[dict] = None,
+        **kwargs
+    ):
+        super().__init__(**kwargs)
+        # Converted like the old pydantic payload did, since they're saved
+        # as-is in the scene history.
+        self.rating = rating if rating is None else str(rating)
+        self.score = score if score is None else float(score)
+        self.report = report
+
 
 class ControllerEventPayload(BaseEventPayload):
     '''
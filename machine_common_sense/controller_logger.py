@@ -220,10 +220,19 @@ class ControllerAi2thorFileGenerator(AbstractControllerSubscriber):
 
     def on_start_scene(self, payload):
         if payload.output_folder and payload.config.is_save_debug_json():
+            config = payload.config
             path = Path(payload.output_folder) / 'ai2thor_input_{}.json'
-            self._in_recorder = JsonRecorder(json_template=path)
+            self._in_recorder = JsonRecorder(
+                json_template=path,
+                max_queue_size=config.get_recorder_max_queue_size(),
+                queue_full_policy=config.get_recorder_queue_full_policy()
+            )
             path = Path(payload.output_folder) / 'ai2thor_output_{}.json'
-            self._out_recorder = JsonRecorder(json_template=path)
+            self._out_recorder = JsonRecorder(
+                json_template=path,
+                max_queue_size=config.get_recorder_max_queue_size(),
+                queue_full_policy=config.get_recorder_queue_full_policy()
+            )
         self._write_debug_input_file(payload)
         self._write_debug_output_file(payload)
 
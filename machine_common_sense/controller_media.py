@@ -1,21 +1,28 @@
+import collections
 import logging
 import pathlib
+import threading
+import weakref
 from abc import abstractmethod
 
 import numpy as np
-import PIL
+import PIL.Image
 
 from .controller_events import (AbstractControllerSubscriber, AfterStepPayload,
                                 BasePostActionEventPayload,
                                 ControllerEventPayload, EndScenePayload,
                                 StartScenePayload)
-from .plotter import TopDownPlotter
+from .frame_list import get_frame_arrays
 from .recorder import VideoRecorder
 
 logger = logging.getLogger(__name__)
 
 
 DEPTH_HSV_BANDS = 400.0
+# Number of quantized depths in each band of the depth color lookup table.
+DEPTH_LUT_HUE_STEPS = 256
+# Number of colorized depth maps to remember.
+DEPTH_COLOR_CACHE_SIZE = 32
 
 
 def convert_depth_to_hsv(
@@ -50,21 +57,103 @@ def convert_depth_to_hsv(
     return depth_hsv_array
 
 
+def _create_depth_rgb_lookup_table() -> np.array:
+    '''Return a lookup table from quantized depth (in steps of one hue value,
+    or 1/256 of a band) to the RGB color from convert_depth_to_hsv.'''
+    # Include one extra band so the far clipping plane itself is in range.
+    size = int(DEPTH_HSV_BANDS + 1) * DEPTH_LUT_HUE_STEPS
+    # Use a far clipping plane equal to the number of bands (so a band is 1)
+    # and depths in the middle of each step to avoid any rounding issues.
+    depths = (np.arange(size) + 0.5) / DEPTH_LUT_HUE_STEPS
+    hsv = convert_depth_to_hsv(depths.reshape(1, size), DEPTH_HSV_BANDS)
+    image = PIL.Image.fromarray(hsv, mode='HSV').convert('RGB')
+    lookup_table = np.asarray(image).reshape(size, 3).copy()
+    lookup_table.flags.writeable = False
+    return lookup_table
+
+
+class _DepthColorCache():
+    '''Remembers the colorized RGB arrays of the most recent depth maps, so
+    the depth image and video handlers don't colorize the same depth map
+    twice.  Keyed on the depth map's identity and the far clipping plane.'''
+
+    def __init__(self, size: int):
+        self._size = size
+        self._entries = collections.OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, depth_float_array: np.array, clipping_plane_far: float):
+        with self._lock:
+            entry = self._entries.get(
+                (id(depth_float_array), clipping_plane_far))
+            # Ensure the ID wasn't reused by a newer array.
+            if entry and entry[0]() is depth_float_array:
+                return entry[1]
+        return None
+
+    def put(
+        self,
+        depth_float_array: np.array,
+        clipping_plane_far: float,
+        rgb_array: np.array
+    ) -> None:
+        try:
+            reference = weakref.ref(depth_float_array)
+        except TypeError:
+            return
+        with self._lock:
+            key = (id(depth_float_array), clipping_plane_far)
+            self._entries[key] = (reference, rgb_array)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self._size:
+                self._entries.popitem(last=False)
+
+
+_depth_rgb_lookup_table = None
+_depth_color_cache = _DepthColorCache(DEPTH_COLOR_CACHE_SIZE)
+
+
+def convert_depth_to_rgb(
+    depth_float_array: np.array,
+    clipping_plane_far: float,
+    use_cache: bool = True
+) -> np.array:
+    '''Convert the given depth float array into a depth image, then return the
+    image as a read-only RGB array.  Uses the same colors as
+    convert_depth_to_hsv, but in a single lookup table pass.  If use_cache,
+    returns the same array for the same depth float array (like when both
+    the depth image and depth video are saved).'''
+    global _depth_rgb_lookup_table
+    if use_cache:
+        rgb_array = _depth_color_cache.get(
+            depth_float_array, clipping_plane_far)
+        if rgb_array is not None:
+            return rgb_array
+    if _depth_rgb_lookup_table is None:
+        _depth_rgb_lookup_table = _create_depth_rgb_lookup_table()
+    # Quantize each depth to its hue step across all the bands.
+    steps_per_depth = (
+        DEPTH_HSV_BANDS * DEPTH_LUT_HUE_STEPS / clipping_plane_far)
+    indexes = np.multiply(depth_float_array, steps_per_depth)
+    np.clip(indexes, 0, len(_depth_rgb_lookup_table) - 1, out=indexes)
+    rgb_array = _depth_rgb_lookup_table[indexes.astype(np.intp)]
+    rgb_array.flags.writeable = False
+    if use_cache:
+        _depth_color_cache.put(
+            depth_float_array, clipping_plane_far, rgb_array)
+    return rgb_array
+
+
 def convert_depth_to_image(
     depth_float_array: np.array,
     clipping_plane_far: float
 ) -> PIL.Image:
     '''Convert the given depth float array into a depth image, then return the
     image.'''
-    # Convert the depth array from a 2D array of floats, ranging from 0 to the
-    # camera's far clipping plane, to a 3D array of HSV tuples.
-    depth_hsv_array = convert_depth_to_hsv(
-        depth_float_array,
-        clipping_plane_far
+    return PIL.Image.fromarray(
+        convert_depth_to_rgb(depth_float_array, clipping_plane_far),
+        mode='RGB'
     )
-    image = PIL.Image.fromarray(depth_hsv_array, mode='HSV')
-    image = image.convert('RGB')
-    return image
 
 
 class AbstractImageEventHandler(AbstractControllerSubscriber):
@@ -145,7 +234,12 @@ class AbstractVideoEventHandler(AbstractControllerSubscriber):
         output_folder = pathlib.Path(payload.output_folder)
         vid_path = output_folder / video_filename
         fps = payload.step_output.physics_frames_per_second
-        return VideoRecorder(vid_path, fps=fps)
+        return VideoRecorder(
+            vid_path,
+            fps=fps,
+            max_queue_size=payload.config.get_recorder_max_queue_size(),
+            queue_full_policy=payload.config.get_recorder_queue_full_policy()
+        )
 
     def _get_filename_without_timestamp(self, filepath: pathlib.Path):
         return filepath.stem[:-16] + filepath.suffix
@@ -201,7 +295,7 @@ class ImageVideoEventHandler(AbstractVideoEventHandler):
         self.save_video_for_step(payload)
 
     def save_video_for_step(self, payload: ControllerEventPayload):
-        for scene_image in payload.step_output.image_list:
+        for scene_image in get_frame_arrays(payload.step_output.image_list):
             self.__recorder.add(scene_image)
 
     def on_end_scene(self, payload: ControllerEventPayload):
@@ -214,6 +308,9 @@ class UnityTopdownCameraCombinerEventHandler(AbstractVideoEventHandler):
     def on_start_scene(self, payload: StartScenePayload):
         self.__recorder = self.create_video_recorder(
             payload, AbstractVideoEventHandler.TOPDOWN)
+        # Imported here, so the plotting libraries are only loaded if top
+        # down videos are enabled.
+        from .plotter import TopDownPlotter
         self.__plotter = TopDownPlotter(
             team=payload.config.get_team(),
             scene_config=payload.scene_config
@@ -244,6 +341,7 @@ class TopdownVideoEventHandler(AbstractVideoEventHandler):
     def on_start_scene(self, payload: BasePostActionEventPayload):
         self.__recorder = self.create_video_recorder(
             payload, AbstractVideoEventHandler.TOPDOWN)
+        from .plotter import TopDownPlotter
         self.__plotter = TopDownPlotter(
             team=payload.config.get_team(),
             scene_config=payload.scene_config
@@ -271,9 +369,9 @@ class TopdownVideoEventHandler(AbstractVideoEventHandler):
                     if target.get('id'):
                         target_ids.append(target.get('id'))
 
-            plot = self.__plotter.plot(payload.step_metadata,
-                                       payload.step_number,
-                                       target_ids)
+            plot = self.__plotter.plot_array(payload.step_metadata,
+                                             payload.step_number,
+                                             target_ids)
             self.__recorder.add(plot)
 
     def on_end_scene(self, payload: BasePostActionEventPayload):
@@ -295,7 +393,7 @@ class DepthVideoEventHandler(AbstractVideoEventHandler):
 
     def save_video_for_step(self, payload: BasePostActionEventPayload):
         for depth_float_array in payload.step_output.depth_map_list:
-            depth_image = convert_depth_to_image(
+            depth_image = convert_depth_to_rgb(
                 depth_float_array,
                 payload.step_output.camera_clipping_planes[1]
             )
@@ -319,7 +417,8 @@ class SegmentationVideoEventHandler(AbstractVideoEventHandler):
         self.save_video_for_step(payload)
 
     def save_video_for_step(self, payload: BasePostActionEventPayload):
-        for object_mask in payload.step_output.object_mask_list:
+        for object_mask in get_frame_arrays(
+                payload.step_output.object_mask_list):
             self.__recorder.add(object_mask)
 
     def on_end_scene(self, payload: BasePostActionEventPayload):
@@ -1,16 +1,16 @@
-import copy
+import functools
 import logging
-from dataclasses import dataclass
-from typing import Tuple
+from collections import Counter
+from dataclasses import dataclass, field
+from typing import Dict, List, Tuple
 
-import numpy as np
-import PIL
 from ai2thor.server import Event
 
+from .action import DEFAULT_MOVE
 from .config_manager import ConfigManager, MetadataTier, SceneConfiguration
-from .controller import DEFAULT_MOVE
+from .frame_list import FrameList, depth_frame_to_depth_map, frame_to_image
 from .material import Material
-from .object_metadata import ObjectMetadata
+from .object_metadata import ObjectList, ObjectMetadata
 from .return_status import ReturnStatus
 from .reward import Reward
 from .step_metadata import StepMetadata
@@ -20,36 +20,37 @@ logger = logging.getLogger(__name__)
 
 @dataclass
 class SceneEvent():
-    '''Wraps step output from AI2thor'''
+    '''Wraps step output from AI2thor.  Derived fields (like the object
+    lists) are built on first access and cached for the lifetime of the
+    event; build_counts records how many times each field was built.'''
     _config: ConfigManager
     _scene_config: SceneConfiguration
     _raw_output: Event
     _step_number: int
+    _cache: dict = field(default_factory=dict, init=False, repr=False)
+    build_counts: Counter = field(
+        default_factory=Counter, init=False, repr=False)
 
     def __post_init__(self):
-        self.image_list = []
-        self.depth_map_list = []
-        self.object_mask_list = []
-
-        for event in self.events:
-            if hasattr(event, 'frame'):
-                scene_image = PIL.Image.fromarray(event.frame)
-                self.image_list.append(scene_image)
-
-                if self._config.is_depth_maps_enabled():
-                    unity_depth_array = event.depth_frame.astype(np.float32)
-                    # Convert to a 2D array (screen length X width)
-                    depth_float_array = np.squeeze(unity_depth_array)
-                    # Convert from (0.0, 1.0) to (0, max distance)
-                    depth_float_array = (
-                        depth_float_array * self.clipping_plane_far
-                    )
-                    self.depth_map_list.append(np.array(depth_float_array))
-
-                if self._config.is_object_masks_enabled():
-                    object_mask = PIL.Image.fromarray(
-                        event.instance_segmentation_frame)
-                    self.object_mask_list.append(object_mask)
+        # Wrap the raw frame buffers so images and depth maps are only built
+        # if something actually reads them.
+        events = [event for event in self.events if hasattr(event, 'frame')]
+        self.image_list = FrameList(
+            [event.frame for event in events],
+            frame_to_image
+        )
+        self.depth_map_list = FrameList(
+            [event.depth_frame for event in events],
+            functools.partial(
+                depth_frame_to_depth_map,
+                clipping_plane_far=self.clipping_plane_far
+            ),
+            convert_arrays=True
+        ) if self._config.is_depth_maps_enabled() else []
+        self.object_mask_list = FrameList(
+            [event.instance_segmentation_frame for event in events],
+            frame_to_image
+        ) if self._config.is_object_masks_enabled() else []
 
     @property
     def objects(self) -> list:
@@ -132,13 +133,19 @@ class SceneEvent():
     def position(self) -> dict:
         return self._raw_output.metadata['agent']['position']
 
+    def _get_cached(self, key: str, build):
+        if key not in self._cache:
+            self._cache[key] = build()
+            self.build_counts[key] += 1
+        return self._cache[key]
+
     def _get_objects(self, key: str):
         # Return object list for all tier levels, the restrict output function
         # will then strip out the necessary metadata
         metadata_tier = self._config.get_metadata_tier()
         show_all = metadata_tier != MetadataTier.DEFAULT
         # if no config specified, return visible objects (for now)
-        return sorted(
+        return ObjectList(sorted(
             [
                 self.retrieve_object_output(
                     object_metadata, self.object_colors
@@ -148,15 +155,18 @@ class SceneEvent():
                 object_metadata['isPickedUp']
             ],
             key=lambda x: x.uuid
-        )
+        ))
 
     @property
     def object_list(self):
-        return self._get_objects('objects')
+        return self._get_cached(
+            'object_list', lambda: self._get_objects('objects'))
 
     @property
     def structural_object_list(self):
-        return self._get_objects('structuralObjects')
+        return self._get_cached(
+            'structural_object_list',
+            lambda: self._get_objects('structuralObjects'))
 
     @property
     def return_status(self):
@@ -179,18 +189,18 @@ class SceneEvent():
     def object_colors(self):
         # Use the color map for the final event (though they should all be the
         # same anyway).
-        event = self._raw_output.events[len(
-            self._raw_output.events) - 1]
-        return event.object_id_to_color
+        return self._get_cached(
+            'object_colors',
+            lambda: self._raw_output.events[-1].object_id_to_color)
 
     @property
     def segmentation_colors(self):
-        return [{
+        return self._get_cached('segmentation_colors', lambda: [{
             'objectId': item['name'],
             'r': item['color'][0],
             'g': item['color'][1],
             'b': item['color'][2]
-        } for item in (self._raw_output.metadata.get('colors') or [])]
+        } for item in (self._raw_output.metadata.get('colors') or [])])
 
     def retrieve_object_output(
             self, object_metadata, object_id_to_color):
@@ -280,86 +290,119 @@ class ControllerOutputHandler():
         self._scene_event = SceneEvent(
             self._config, self._scene_config, raw_output, step_number)
         self._step_number = step_number
-        unrestricted = self._get_step_metadata(
-            goal, habituation_trial, False)
-        restricted = self._get_step_metadata(
-            goal, habituation_trial, True)
+        # Compute every derived field once, then build both the unrestricted
+        # and the restricted output from the same data.
+        step_data = self._get_step_data(goal, habituation_trial)
+        unrestricted = self._get_step_metadata(step_data, False)
+        restricted = self._get_step_metadata(step_data, True)
         return (unrestricted, restricted)
 
-    def _get_step_metadata(self, goal, habituation_trial,
-                           restricted=True) -> StepMetadata:
-        (restrict_depth_map, restrict_object_mask_list, restrict_non_oracle) =\
-            self.get_restrictions(restricted, self._config.get_metadata_tier())
-        step_output = StepMetadata(
-            action_list=goal.retrieve_action_list_at_step(
+    def handle_restricted_output(self, raw_output, goal, step_number,
+                                 habituation_trial):
+        '''Like handle_output, but only build the restricted output, for
+        steps that won't be published to any subscribers.'''
+        self._scene_event = SceneEvent(
+            self._config, self._scene_config, raw_output, step_number)
+        self._step_number = step_number
+        step_data = self._get_step_data(goal, habituation_trial)
+        return self._get_step_metadata(step_data, True)
+
+    def handle_frames(self, raw_output, step_number) -> Tuple[
+            List, List, List]:
+        '''Return only the image, depth map, and object mask lists from the
+        given raw output, for steps whose other output won't be read.'''
+        scene_event = SceneEvent(
+            self._config, self._scene_config, raw_output, step_number)
+        return (
+            scene_event.image_list,
+            scene_event.depth_map_list,
+            scene_event.object_mask_list
+        )
+
+    def _get_step_data(self, goal, habituation_trial) -> Dict:
+        '''Return the StepMetadata constructor arguments for the current
+        step, without any metadata tier restrictions applied.'''
+        scene_event = self._scene_event
+        return {
+            'action_list': goal.retrieve_action_list_at_step(
                 self._step_number,
-                self._scene_event.steps_on_lava,
-                self._scene_event.triggered_by_sequence_incorrect,
+                scene_event.steps_on_lava,
+                scene_event.triggered_by_sequence_incorrect,
                 self._scene_config.is_passive_scene()
             ),
-            camera_aspect_ratio=self._config.get_screen_size(),
-            camera_clipping_planes=self._scene_event.clipping_plane,
-            camera_field_of_view=self._scene_event.camera_field_of_view,
-            camera_height=self._scene_event.camera_height,
-            depth_map_list=[] if restrict_depth_map else (
-                self._scene_event.depth_map_list),
-            goal=goal,
-            habituation_trial=(
+            'camera_aspect_ratio': self._config.get_screen_size(),
+            'camera_clipping_planes': scene_event.clipping_plane,
+            'camera_field_of_view': scene_event.camera_field_of_view,
+            'camera_height': scene_event.camera_height,
+            'depth_map_list': scene_event.depth_map_list,
+            'goal': goal,
+            'habituation_trial': (
                 habituation_trial
                 if goal.habituation_total >= habituation_trial
                 else None
             ),
-            haptic_feedback=self._scene_event.haptic_feedback,
-            head_tilt=self._scene_event.head_tilt,
-            holes=None if restrict_non_oracle else [
-                (hole.x, hole.z) for hole in self._scene_config.holes
-            ],
-            image_list=self._scene_event.image_list,
-            lava=(
-                None if restrict_non_oracle else
-                self._scene_config.retrieve_lava()
-            ),
-            object_list=(
-                [] if restrict_non_oracle else self._scene_event.object_list),
-            object_mask_list=([] if restrict_object_mask_list else
-                              self._scene_event.object_mask_list),
-            position=(None if (
-                restrict_non_oracle or self._config.is_position_disabled()
-            ) else self._scene_event.position),
-            performer_radius=self._scene_event.performer_radius,
-            performer_reach=self._scene_event.performer_reach,
-            return_status=self._scene_event.return_status,
-            reward=Reward.calculate_reward(
-                goal, self._scene_event.objects, self._scene_event.agent,
-                self._step_number, self._scene_event.performer_reach,
-                self._scene_event.steps_on_lava,
+            'haptic_feedback': scene_event.haptic_feedback,
+            'head_tilt': scene_event.head_tilt,
+            'holes': [(hole.x, hole.z) for hole in self._scene_config.holes],
+            'image_list': scene_event.image_list,
+            'lava': self._scene_config.retrieve_lava(),
+            'object_list': scene_event.object_list,
+            'object_mask_list': scene_event.object_mask_list,
+            'position': scene_event.position,
+            'performer_radius': scene_event.performer_radius,
+            'performer_reach': scene_event.performer_reach,
+            'return_status': scene_event.return_status,
+            'reward': Reward.calculate_reward(
+                goal, scene_event.objects, scene_event.agent,
+                self._step_number, scene_event.performer_reach,
+                scene_event.steps_on_lava,
                 self._config.get_lava_penalty(),
                 self._config.get_step_penalty(),
                 self._config.get_goal_reward()),
-            resolved_object=(
-                None if restrict_non_oracle
-                else self._scene_event.resolved_object),
-            resolved_receptacle=(
-                None if restrict_non_oracle
-                else self._scene_event.resolved_receptacle),
-            room_dimensions=(
-                None if restrict_non_oracle
-                else self._scene_event.room_dimensions),
-            rotation=(
-                None if restrict_non_oracle else self._scene_event.rotation),
-            segmentation_colors=(
-                None if restrict_non_oracle
-                else self._scene_event.segmentation_colors
-            ),
-            step_number=self._step_number,
-            steps_on_lava=self._scene_event.steps_on_lava,
-            triggered_by_sequence_incorrect=(
-                self._scene_event.triggered_by_sequence_incorrect),
-            physics_frames_per_second=(
-                self._scene_event.physics_frames_per_second),
-            structural_object_list=([] if restrict_non_oracle else
-                                    self._scene_event.structural_object_list)
-        )
+            'resolved_object': scene_event.resolved_object,
+            'resolved_receptacle': scene_event.resolved_receptacle,
+            'room_dimensions': scene_event.room_dimensions,
+            'rotation': scene_event.rotation,
+            'segmentation_colors': scene_event.segmentation_colors,
+            'step_number': self._step_number,
+            'steps_on_lava': scene_event.steps_on_lava,
+            'triggered_by_sequence_incorrect': (
+                scene_event.triggered_by_sequence_incorrect),
+            'physics_frames_per_second': (
+                scene_event.physics_frames_per_second),
+            'structural_object_list': scene_event.structural_object_list
+        }
+
+    def _get_step_metadata(self, step_data: Dict,
+                           restricted=True) -> StepMetadata:
+        '''Build a StepMetadata from the given step data, projecting away
+        the fields that the configured metadata tier does not allow if
+        restricted.  Lists are shallow copied (ObjectLists keep their type
+        and arrays) so the outputs built from the same step data never share
+        a mutable list.'''
+        (restrict_depth_map, restrict_object_mask_list, restrict_non_oracle) =\
+            self.get_restrictions(restricted, self._config.get_metadata_tier())
+        step_args = {
+            key: (value.copy() if isinstance(value, list) else value)
+            for key, value in step_data.items()
+        }
+        if restrict_depth_map:
+            step_args['depth_map_list'] = []
+        if restrict_object_mask_list:
+            step_args['object_mask_list'] = []
+        if restrict_non_oracle:
+            step_args['holes'] = None
+            step_args['lava'] = None
+            step_args['object_list'] = []
+            step_args['position'] = None
+            step_args['resolved_object'] = None
+            step_args['resolved_receptacle'] = None
+            step_args['room_dimensions'] = None
+            step_args['rotation'] = None
+            step_args['segmentation_colors'] = None
+            step_args['structural_object_list'] = []
+
+        step_output = StepMetadata(**step_args)
 
         if (restrict_non_oracle):
             self.filter_step_output(step_output)
@@ -397,7 +440,7 @@ class ControllerOutputHandler():
         step_output.room_dimensions = None
 
         # Copy the goal object to avoid deleting data from the original object
-        step_output.goal = copy.deepcopy(step_output.goal)
+        step_output.goal = step_output.goal.copy()
 
         step_output.goal.triggered_by_target_sequence = None
         metadata = step_output.goal.metadata or {}
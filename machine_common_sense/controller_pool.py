@@ -0,0 +1,452 @@
+import collections
+import contextlib
+import glob
+import json
+import logging
+import multiprocessing
+import multiprocessing.connection
+import os
+import time
+import traceback
+from dataclasses import asdict, dataclass, field
+from typing import Any, Callable, Deque, Dict, List, Optional, Tuple, Union
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_LAST_STEP = 20
+HISTORY_DIRECTORY = 'SCENE_HISTORY'
+
+
+def run_scene_with_pass(controller, scene_data: Dict) -> Dict:
+    '''Default scene runner for the ControllerPool: starts the given scene,
+    runs Pass actions until its last step (or DEFAULT_LAST_STEP), and ends
+    the scene.  Returns the number of steps run and the time of each step.'''
+    last_step = (scene_data.get('goal') or {}).get(
+        'last_step', DEFAULT_LAST_STEP)
+    step_times = []
+    output = controller.start_scene(scene_data)
+    step_number = output.step_number if output else 0
+    while step_number < last_step:
+        start = time.perf_counter()
+        output = controller.step('Pass')
+        step_times.append(time.perf_counter() - start)
+        if output is None:
+            break
+        step_number = output.step_number
+    controller.end_scene()
+    return {'step_count': len(step_times), 'step_times': step_times}
+
+
+@dataclass
+class SceneResult:
+    '''The result of running one scene file in a ControllerPool.'''
+    scene_file: str
+    success: bool = False
+    worker_id: Optional[int] = None
+    attempts: int = 0
+    elapsed: float = 0.0
+    step_count: int = 0
+    step_times: List[float] = field(default_factory=list)
+    history_files: List[str] = field(default_factory=list)
+    output: Any = None
+    error: Optional[str] = None
+
+
+@dataclass
+class PoolReport:
+    '''The results of every scene file run in a ControllerPool, in the same
+    order as the given scene files, along with the total run time.'''
+    results: List[SceneResult] = field(default_factory=list)
+    elapsed: float = 0.0
+    worker_count: int = 0
+    worker_restarts: int = 0
+
+    @property
+    def failed(self) -> List[SceneResult]:
+        return [result for result in self.results if not result.success]
+
+    @property
+    def history_files(self) -> List[str]:
+        return [
+            history_file for result in self.results
+            for history_file in result.history_files
+        ]
+
+    def to_dict(self) -> Dict:
+        step_times = [
+            step_time for result in self.results
+            for step_time in result.step_times
+        ]
+        return {
+            'elapsed': self.elapsed,
+            'worker_count': self.worker_count,
+            'worker_restarts': self.worker_restarts,
+            'scene_count': len(self.results),
+            'failed_count': len(self.failed),
+            'step_count': len(step_times),
+            'step_time_average': (
+                sum(step_times) / len(step_times) if step_times else None
+            ),
+            'results': [asdict(result) for result in self.results]
+        }
+
+    def write(self, file_path: str) -> None:
+        '''Write this report to the given JSON file.'''
+        with open(file_path, 'w') as report_file:
+            json.dump(self.to_dict(), report_file, indent=4, default=str)
+
+
+def _create_controller(
+    config_file_or_dict: Union[Dict, str],
+    unity_app_file_path: Optional[str],
+    unity_cache_version: Optional[str]
+):
+    # Import here to avoid a circular import with the package __init__.
+    from . import create_controller
+    return create_controller(
+        config_file_or_dict=config_file_or_dict,
+        unity_app_file_path=unity_app_file_path,
+        unity_cache_version=unity_cache_version
+    )
+
+
+def _run_worker(
+    worker_id: int,
+    working_directory: str,
+    connection: multiprocessing.connection.Connection,
+    controller_factory: Callable,
+    controller_args: Tuple,
+    scene_runner: Callable
+) -> None:
+    '''Worker process loop: creates a controller in its own working
+    directory (so its debug and history files are kept separate), then runs
+    each scene file received on its connection until it receives None.'''
+    os.makedirs(working_directory, exist_ok=True)
+    os.chdir(working_directory)
+    try:
+        controller = controller_factory(*controller_args)
+    except Exception:
+        controller = None
+        logger.exception(f'Pool worker {worker_id} failed to initialize')
+    if not controller:
+        connection.send(('init_failed', None))
+        return
+    connection.send(('ready', None))
+
+    try:
+        while True:
+            scene_file = connection.recv()
+            if scene_file is None:
+                break
+            result = {'scene_file': scene_file}
+            history_pattern = os.path.join(HISTORY_DIRECTORY, '**', '*')
+            history_before = set(glob.glob(history_pattern, recursive=True))
+            start = time.perf_counter()
+            try:
+                # Import here to avoid a circular import.
+                from . import load_scene_json_file
+                scene_data = load_scene_json_file(scene_file)
+                if 'name' not in scene_data:
+                    scene_data['name'] = os.path.splitext(
+                        os.path.basename(scene_file))[0]
+                output = scene_runner(controller, scene_data) or {}
+                result['success'] = True
+                result['step_count'] = output.pop('step_count', 0)
+                result['step_times'] = output.pop('step_times', [])
+                result['output'] = output
+            except Exception:
+                result['error'] = traceback.format_exc()
+                logger.exception(f'Pool worker {worker_id} failed to run '
+                                 f'{scene_file}')
+            result['elapsed'] = time.perf_counter() - start
+            result['history_files'] = sorted(
+                os.path.abspath(history_file) for history_file in
+                set(glob.glob(history_pattern, recursive=True)) -
+                history_before if os.path.isfile(history_file)
+            )
+            connection.send(('result', result))
+    finally:
+        controller.stop_simulation()
+
+
+class _Worker():
+    '''Parent process state for one pool worker process.'''
+
+    def __init__(self, worker_id: int):
+        self.worker_id = worker_id
+        self.restarts = 0
+        self.process = None
+        self.connection = None
+        self.ready = False
+        self.task = None
+        self.task_started = None
+        self.started = None
+
+    def is_idle(self) -> bool:
+        return self.ready and self.task is None
+
+
+class ControllerPool():
+    '''
+    Runs scene files in parallel across multiple worker processes, each
+    with its own MCS Controller (and so its own Unity process and AI2-THOR
+    server) and its own working directory for output files.  Scene files
+    are handed out one at a time to idle workers.  Workers that crash or
+    hang are restarted, and their scene files are retried.
+
+    Parameters
+    ----------
+    worker_count : int
+        The number of worker processes (and Unity processes) to run.
+    config_file_or_dict : str or dict, optional
+        The MCS configuration for each controller.  See create_controller.
+        (default None)
+    unity_app_file_path : str, optional
+        The file path to your MCS Unity application.  See create_controller.
+        (default None)
+    unity_cache_version : str, optional
+        The version of the MCS Unity application.  See create_controller.
+        (default None)
+    output_directory : str, optional
+        The directory that will hold each worker's working directory.
+        (default "controller_pool")
+    scene_runner : callable, optional
+        A picklable function called with a controller and the scene data
+        from a scene file that runs the scene (including its start_scene and
+        end_scene calls) and returns a dict, optionally with "step_count"
+        and "step_times" keys, which is saved in the pool report.
+        (default run_scene_with_pass)
+    scene_timeout : float, optional
+        The number of seconds a worker may spend on one scene file (or on
+        creating its controller) before it is considered hung and restarted.
+        (default None, no timeout)
+    max_retries : int, optional
+        The number of times to retry a scene file after its worker crashed
+        or hung. Scene files that raised an error are not retried.
+        (default 1)
+    max_worker_restarts : int, optional
+        The number of times each worker process may be restarted.
+        (default 3)
+    controller_factory : callable, optional
+        A picklable function called in each worker process with the
+        config_file_or_dict, unity_app_file_path, and unity_cache_version
+        that returns a new controller. (default create_controller)
+    mp_context : multiprocessing context, optional
+        The context used to start the worker processes.
+        (default the "spawn" context)
+    '''
+
+    POLL_INTERVAL = 0.1
+
+    def __init__(
+        self,
+        worker_count: int,
+        config_file_or_dict: Union[Dict, str] = None,
+        unity_app_file_path: str = None,
+        unity_cache_version: str = None,
+        output_directory: str = 'controller_pool',
+        scene_runner: Callable[[Any, Dict], Dict] = run_scene_with_pass,
+        scene_timeout: Optional[float] = None,
+        max_retries: int = 1,
+        max_worker_restarts: int = 3,
+        controller_factory: Callable = _create_controller,
+        mp_context=None
+    ):
+        if worker_count < 1:
+            raise ValueError(f'worker_count must be positive: {worker_count}')
+        self._worker_count = worker_count
+        # Workers run in their own working directories, so relative paths
+        # must be made absolute first.
+        if isinstance(config_file_or_dict, str):
+            config_file_or_dict = os.path.abspath(config_file_or_dict)
+        if unity_app_file_path is not None:
+            unity_app_file_path = os.path.abspath(unity_app_file_path)
+        self._controller_args = (
+            config_file_or_dict, unity_app_file_path, unity_cache_version)
+        self._output_directory = os.path.abspath(output_directory)
+        self._scene_runner = scene_runner
+        self._scene_timeout = scene_timeout
+        self._max_retries = max_retries
+        self._max_worker_restarts = max_worker_restarts
+        self._controller_factory = controller_factory
+        self._context = mp_context or multiprocessing.get_context('spawn')
+        self._workers: List[_Worker] = []
+
+    def run(self, scene_files: List[str]) -> PoolReport:
+        '''Run every given scene file and return the pool report.  Relative
+        scene file paths are made absolute in the report.'''
+        start = time.perf_counter()
+        scene_files = [os.path.abspath(path) for path in scene_files]
+        results = {
+            index: SceneResult(scene_file=scene_file)
+            for index, scene_file in enumerate(scene_files)
+        }
+        pending: Deque[int] = collections.deque(results.keys())
+        self._workers = [
+            _Worker(worker_id)
+            for worker_id in range(min(self._worker_count, len(scene_files)))
+        ]
+        try:
+            for worker in self._workers:
+                self._start_worker(worker)
+            while pending or any(worker.task is not None
+                                 for worker in self._workers):
+                self._handle_messages(results)
+                self._check_workers(results, pending)
+                if not any(self._is_usable(worker)
+                           for worker in self._workers):
+                    self._fail_pending(
+                        results, pending,
+                        'No pool workers could be started'
+                    )
+                    break
+                for worker in self._workers:
+                    if pending and worker.is_idle():
+                        self._assign(worker, pending.popleft(), results)
+        finally:
+            for worker in self._workers:
+                self._stop_worker(worker)
+
+        return PoolReport(
+            results=[results[index] for index in sorted(results.keys())],
+            elapsed=time.perf_counter() - start,
+            worker_count=len(self._workers),
+            worker_restarts=sum(worker.restarts for worker in self._workers)
+        )
+
+    def _start_worker(self, worker: _Worker) -> None:
+        worker.ready = False
+        worker.task = None
+        worker.task_started = None
+        worker.started = time.perf_counter()
+        # Give each worker process its own pipe, rather than sharing a queue,
+        # so terminating a hung worker can't leave a shared lock acquired.
+        worker.connection, worker_connection = self._context.Pipe()
+        worker.process = self._context.Process(
+            target=_run_worker,
+            args=(
+                worker.worker_id,
+                os.path.join(self._output_directory,
+                             f'worker_{worker.worker_id}'),
+                worker_connection,
+                self._controller_factory,
+                self._controller_args,
+                self._scene_runner
+            ),
+            daemon=True
+        )
+        worker.process.start()
+        worker_connection.close()
+        logger.debug(f'Started pool worker {worker.worker_id} '
+                     f'(pid {worker.process.pid})')
+
+    def _stop_worker(self, worker: _Worker) -> None:
+        if worker.process is None:
+            return
+        if worker.process.is_alive():
+            with contextlib.suppress(OSError):
+                worker.connection.send(None)
+            worker.process.join(timeout=10)
+        if worker.process.is_alive():
+            worker.process.terminate()
+            worker.process.join()
+        worker.connection.close()
+        worker.process = None
+        worker.connection = None
+        worker.ready = False
+
+    def _restart_worker(self, worker: _Worker) -> None:
+        if worker.process is not None:
+            if worker.process.is_alive():
+                worker.process.terminate()
+            worker.process.join()
+            worker.connection.close()
+            worker.process = None
+            worker.connection = None
+        worker.ready = False
+        worker.task = None
+        if worker.restarts >= self._max_worker_restarts:
+            logger.error(f'Pool worker {worker.worker_id} reached its max '
+                         f'restarts and will not be restarted')
+            return
+        worker.restarts += 1
+        self._start_worker(worker)
+
+    def _is_usable(self, worker: _Worker) -> bool:
+        return worker.process is not None
+
+    def _assign(self, worker: _Worker, index: int, results: Dict) -> None:
+        result = results[index]
+        result.attempts += 1
+        result.worker_id = worker.worker_id
+        worker.task = index
+        worker.task_started = time.perf_counter()
+        worker.connection.send(result.scene_file)
+
+    def _handle_messages(self, results: Dict) -> None:
+        workers = {
+            worker.connection: worker for worker in self._workers
+            if worker.connection is not None
+        }
+        for connection in multiprocessing.connection.wait(
+                list(workers.keys()), timeout=self.POLL_INTERVAL):
+            worker = workers[connection]
+            try:
+                message_type, data = connection.recv()
+            except (EOFError, OSError):
+                # The worker exited; it's restarted in _check_workers.
+                continue
+            if message_type == 'ready':
+                worker.ready = True
+            elif message_type == 'init_failed':
+                self._restart_worker(worker)
+            elif message_type == 'result' and worker.task is not None:
+                result = results[worker.task]
+                if data.get('success'):
+                    # Clear the error from an earlier attempt.
+                    result.error = None
+                for key, value in data.items():
+                    setattr(result, key, value)
+                worker.task = None
+                worker.task_started = None
+
+    def _check_workers(self, results: Dict, pending: Deque[int]) -> None:
+        for worker in self._workers:
+            if worker.process is None:
+                continue
+            crashed = not worker.process.is_alive()
+            # A worker that isn't ready is still creating its controller.
+            busy_since = (
+                worker.task_started if worker.task is not None else
+                worker.started if not worker.ready else None
+            )
+            hung = (
+                self._scene_timeout is not None and
+                busy_since is not None and
+                time.perf_counter() - busy_since > self._scene_timeout
+            )
+            if not crashed and not hung:
+                continue
+            if worker.task is None and not crashed:
+                logger.error(f'Pool worker {worker.worker_id} timed out '
+                             f'creating its controller')
+            if worker.task is not None:
+                result = results[worker.task]
+                error = (
+                    f'Pool worker {worker.worker_id} '
+                    f'{"crashed" if crashed else "timed out"}'
+                )
+                logger.error(f'{error} running {result.scene_file}')
+                result.error = error
+                if result.attempts <= self._max_retries:
+                    pending.appendleft(worker.task)
+            self._restart_worker(worker)
+
+    def _fail_pending(
+        self,
+        results: Dict,
+        pending: Deque[int],
+        error: str
+    ) -> None:
+        while pending:
+            results[pending.popleft()].error = error
@@ -0,0 +1,106 @@
+import logging
+import queue
+import threading
+from typing import Any, Dict, List
+
+from .controller_events import EventType
+
+logger = logging.getLogger(__name__)
+
+# Tells a subscriber's worker thread to stop.
+_STOP = object()
+
+
+class _SubscriberWorker():
+    '''Calls one subscriber's on_event with each queued event, in order, on
+    its own thread.'''
+
+    def __init__(self, subscriber, queue_size: int):
+        self.subscriber = subscriber
+        self.queue = queue.Queue(maxsize=queue_size)
+        self.thread = threading.Thread(
+            target=self._run,
+            name=f'mcs-subscriber-{type(subscriber).__name__}',
+            daemon=True
+        )
+        self.thread.start()
+
+    def stop(self) -> None:
+        '''Handle every queued event, then stop the thread.'''
+        self.queue.put(_STOP)
+        self.thread.join()
+
+    def _run(self) -> None:
+        while True:
+            item = self.queue.get()
+            try:
+                if item is _STOP:
+                    return
+                event_type, payload = item
+                try:
+                    self.subscriber.on_event(event_type, payload)
+                except Exception as msg:
+                    logger.error(
+                        f"Error in event with type={event_type}"
+                        f" to subscriber={type(self.subscriber)}",
+                        exc_info=msg)
+            finally:
+                self.queue.task_done()
+
+
+class AsyncEventDispatcher():
+    '''
+    Publishes controller events to subscribers on background threads, so
+    subscriber work (like writing debug files, images, and videos) overlaps
+    with the next simulation step instead of delaying each step's output.
+
+    Each subscriber has its own worker thread, so it receives its events in
+    the order they were published, and its own queue of at most queue_size
+    events.  Publishing blocks while a subscriber's queue is full, so a slow
+    subscriber can't fall unboundedly behind the controller.
+
+    Parameters
+    ----------
+    queue_size : int, optional
+        The max number of events waiting for each subscriber. (default 16)
+    '''
+
+    QUEUE_SIZE_DEFAULT = 16
+
+    def __init__(self, queue_size: int = QUEUE_SIZE_DEFAULT):
+        self._queue_size = max(1, queue_size)
+        self._workers: Dict[int, _SubscriberWorker] = {}
+
+    def publish(
+        self,
+        subscribers: List[Any],
+        event_type: EventType,
+        payload: Any
+    ) -> None:
+        '''Queue the given event for each of the given subscribers.'''
+        for subscriber in subscribers:
+            worker = self._workers.get(id(subscriber))
+            if worker is not None and worker.subscriber is not subscriber:
+                # Another subscriber with the same id, which can only happen
+                # once the old one's gone, so finish its events first.
+                worker.stop()
+                worker = None
+            if worker is None:
+                worker = _SubscriberWorker(subscriber, self._queue_size)
+                self._workers[id(subscriber)] = worker
+            worker.queue.put((event_type, payload))
+
+    def flush(self) -> None:
+        '''Wait until every subscriber has handled every queued event.'''
+        for worker in list(self._workers.values()):
+            worker.queue.join()
+
+    def close(self) -> None:
+        '''Flush, then stop every worker thread.  Publishing again starts
+        new worker threads.'''
+        workers = list(self._workers.values())
+        self._workers = {}
+        for worker in workers:
+            worker.queue.put(_STOP)
+        for worker in workers:
+            worker.thread.join()
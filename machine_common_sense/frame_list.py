@@ -0,0 +1,152 @@
+from collections.abc import Sequence
+from typing import Any, Callable, List
+
+import numpy as np
+import PIL.Image
+
+
+def frame_to_image(frame: np.ndarray) -> PIL.Image.Image:
+    '''Convert the given image or object mask buffer into a PIL image.'''
+    return PIL.Image.fromarray(frame)
+
+
+def depth_frame_to_depth_map(
+    depth_frame: np.ndarray,
+    clipping_plane_far: float
+) -> np.ndarray:
+    '''Convert the given depth buffer, with values between 0.0 and 1.0, into
+    a 2D float32 array of depths between 0 and the far clipping plane.'''
+    # Scale and convert in one pass rather than with separate astype,
+    # squeeze, multiply and copy steps.
+    return np.multiply(
+        np.squeeze(depth_frame),
+        clipping_plane_far,
+        dtype=np.float32
+    )
+
+
+def get_frame_arrays(frame_list: Sequence) -> List[np.ndarray]:
+    '''Return the frames in the given image, depth map, or object mask list
+    as numpy arrays, without building any PIL images if the list is a
+    FrameList.'''
+    if isinstance(frame_list, FrameList):
+        return frame_list.as_arrays()
+    return [
+        frame if isinstance(frame, np.ndarray) else np.asarray(frame)
+        for frame in frame_list
+    ]
+
+
+class FrameList(Sequence):
+    '''
+    Read-only list of frames (images, depth maps, or object masks) that wraps
+    the raw numpy buffers from AI2-THOR without copying them, and converts
+    each frame into its output type (like a PIL image) only when it is first
+    accessed.  Converted frames are cached.
+
+    Agents that work with numpy arrays directly can call as_arrays() to skip
+    the conversion entirely.
+
+    A FrameList is a read-only Sequence, not a list: it supports indexing,
+    slicing, iteration, len(), and + (with lists too), but not item
+    assignment or methods like append.  Call list() on it for a mutable copy.
+
+    Parameters
+    ----------
+    frames : list of numpy arrays
+        The raw frame buffers.
+    convert : callable
+        Converts one raw frame buffer into its output type.
+    convert_arrays : bool, optional
+        Whether as_arrays() must also apply the conversion, for frames whose
+        raw buffer is not usable on its own (like unscaled depth buffers).
+        (default False)
+    '''
+
+    def __init__(
+        self,
+        frames: List[np.ndarray] = None,
+        convert: Callable[[np.ndarray], Any] = None,
+        convert_arrays: bool = False
+    ):
+        frames = [] if frames is None else list(frames)
+        self._frames = frames
+        self._converters = [convert] * len(frames)
+        self._convert_arrays = [convert_arrays] * len(frames)
+        self._items = [None] * len(frames)
+
+    def __len__(self) -> int:
+        return len(self._frames)
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self._get_item(i)
+                    for i in range(*index.indices(len(self)))]
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError('FrameList index out of range')
+        return self._get_item(index)
+
+    def _get_item(self, index: int):
+        if self._items[index] is None:
+            convert = self._converters[index]
+            frame = self._frames[index]
+            self._items[index] = frame if convert is None else convert(frame)
+        return self._items[index]
+
+    def as_arrays(self) -> List[np.ndarray]:
+        '''Return the frames as numpy arrays without building any images.
+        Image and object mask arrays are read-only views of the raw buffers
+        from AI2-THOR rather than copies.'''
+        arrays = []
+        for index, frame in enumerate(self._frames):
+            if self._convert_arrays[index]:
+                arrays.append(self._get_item(index))
+            else:
+                # Frames from a plain list (see concat) may be PIL images.
+                view = np.asarray(frame).view()
+                view.flags.writeable = False
+                arrays.append(view)
+        return arrays
+
+    @staticmethod
+    def concat(frame_lists: List[Sequence]) -> Sequence:
+        '''Concatenate the given FrameLists and/or lists, in linear time and
+        without converting any frames.  Returns a plain list if none of the
+        given lists are FrameLists.'''
+        if not any(isinstance(other, FrameList) for other in frame_lists):
+            return [item for other in frame_lists for item in other]
+        frame_list = FrameList()
+        for other in frame_lists:
+            if isinstance(other, FrameList):
+                frame_list._frames.extend(other._frames)
+                frame_list._converters.extend(other._converters)
+                frame_list._convert_arrays.extend(other._convert_arrays)
+                frame_list._items.extend(other._items)
+            else:
+                # Already converted items, which as_arrays converts with
+                # np.asarray, like get_frame_arrays.
+                frame_list._frames.extend(other)
+                frame_list._converters.extend([None] * len(other))
+                frame_list._convert_arrays.extend([False] * len(other))
+                frame_list._items.extend(other)
+        return frame_list
+
+    def __add__(self, other):
+        if not isinstance(other, (FrameList, list)):
+            return NotImplemented
+        return FrameList.concat([self, other])
+
+    def __radd__(self, other):
+        if not isinstance(other, list):
+            return NotImplemented
+        return FrameList.concat([other, self])
+
+    def __eq__(self, other):
+        if not isinstance(other, (FrameList, list)):
+            return NotImplemented
+        return list(self) == list(other)
+
+    def __repr__(self):
+        return repr(list(self))
@@ -117,6 +117,37 @@ class GoalMetadata:
     def __str__(self):
         return Stringifier.class_to_str(self)
 
+    def copy(self) -> 'GoalMetadata':
+        """Return a copy of this GoalMetadata that shares its data, except for
+        its metadata dict and the dicts and lists in it (like each target),
+        which are copied, so their items can be set or removed without
+        changing this GoalMetadata."""
+        goal_copy = GoalMetadata(
+            action_list=self.action_list,
+            category=self.category,
+            description=self.description,
+            habituation_total=self.habituation_total,
+            last_preview_phase_step=self.last_preview_phase_step,
+            last_step=self.last_step,
+            steps_allowed_in_lava=self.steps_allowed_in_lava,
+            triggered_by_target_sequence=self.triggered_by_target_sequence
+        )
+        goal_copy.metadata = None if self.metadata is None else {
+            key: self._copy_metadata_value(value)
+            for key, value in self.metadata.items()
+        }
+        return goal_copy
+
+    def _copy_metadata_value(self, value):
+        if isinstance(value, dict):
+            return dict(value)
+        if isinstance(value, list):
+            return [
+                dict(item) if isinstance(item, dict) else item
+                for item in value
+            ]
+        return value
+
     # Allows converting the class to a dictionary, along with allowing
     #   certain fields to be left out of output file
     def __iter__(self):
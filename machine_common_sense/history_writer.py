@@ -3,8 +3,9 @@ import logging
 import os
 import pathlib
 from time import perf_counter
-from typing import Union
+from typing import Dict, Optional, Union
 
+import numpy as np
 from numpyencoder import NumpyEncoder
 
 from machine_common_sense.step_metadata import StepMetadata
@@ -19,6 +20,29 @@ from .stringifier import Stringifier
 logger = logging.getLogger(__name__)
 
 
+def _apply_report(step: Dict, report: Dict):
+    current_step = step.get("step")
+
+    report_step = (
+        report.get(current_step) or
+        report.get(str(current_step))
+    )
+
+    if (report_step is not None):
+        # Use classification and confidence rather than rating and score to
+        # be compatible with old history files.
+        step["classification"] = report_step.get("rating")
+        step["confidence"] = report_step.get("score")
+        step["violations_xy_list"] = report_step.get("violations_xy_list")
+        step["internal_state"] = report_step.get("internal_state")
+
+
+def _get_publish_time_millis(payload) -> Optional[float]:
+    if payload.publish_time is None:
+        return None
+    return payload.publish_time * 1000
+
+
 class HistoryEventHandler(AbstractControllerSubscriber):
 
     def __init__(self):
@@ -45,9 +69,14 @@ class HistoryEventHandler(AbstractControllerSubscriber):
             # Create a new scene history writer with each new scene (config
             # data) so we always create a new, separate scene history file.
             # Also, ensure previous history item is cleared.
-            self.__history_writer = HistoryWriter(payload.scene_config,
-                                                  hist_info,
-                                                  payload.timestamp)
+            writer_class = (
+                StreamingHistoryWriter
+                if payload.config.is_history_streaming_enabled()
+                else HistoryWriter
+            )
+            self.__history_writer = writer_class(payload.scene_config,
+                                                 hist_info,
+                                                 payload.timestamp)
             init_history = SceneHistory(
                 step=payload.step_number,
                 action='Initialize',
@@ -56,15 +85,19 @@ class HistoryEventHandler(AbstractControllerSubscriber):
                 params=None,
                 output=payload.step_output.copy_without_depth_or_images(),
                 delta_time_millis=0)
-            self.__history_writer.add_step(init_history)
+            publish_time_millis = _get_publish_time_millis(payload)
+            self.__history_writer.init_timer(publish_time_millis)
+            self.__history_writer.add_step(init_history, publish_time_millis)
             self.__history_item = None
 
     def on_before_step(self, payload: BeforeStepPayload):
         if payload.config.is_history_enabled():
+            publish_time_millis = _get_publish_time_millis(payload)
             if payload.step_number == 0:
-                self.__history_writer.init_timer()
+                self.__history_writer.init_timer(publish_time_millis)
             if payload.step_number > 0:
-                self.__history_writer.add_step(self.__history_item)
+                self.__history_writer.add_step(
+                    self.__history_item, publish_time_millis)
                 self.__history_item = None
 
     def on_after_step(self, payload: AfterStepPayload):
@@ -87,27 +120,12 @@ class HistoryEventHandler(AbstractControllerSubscriber):
             self.__history_writer is not None and
             payload.config.is_history_enabled()
         ):
-            self.__history_writer.add_step(self.__history_item)
+            self.__history_writer.add_step(
+                self.__history_item, _get_publish_time_millis(payload))
 
             # Loop back and fill out previous steps with retrospective report
             if payload.report is not None:
-                for step in self.__history_writer.current_steps:
-                    current_step = step.get("step")
-
-                    report_step = (
-                        payload.report.get(current_step) or
-                        payload.report.get(str(current_step))
-                    )
-
-                    if (report_step is not None):
-                        # Use classification and confidence rather than rating
-                        # and score to be compatible with old history files.
-                        step["classification"] = report_step.get("rating")
-                        step["confidence"] = report_step.get("score")
-                        step["violations_xy_list"] = report_step.get(
-                            "violations_xy_list")
-                        step["internal_state"] = report_step.get(
-                            "internal_state")
+                self.__history_writer.add_report(payload.report)
 
             self.__history_writer.write_history_file(
                 payload.rating, payload.score)
@@ -166,15 +184,18 @@ class HistoryWriter(object):
         if isinstance(obj, float):
             obj = round(obj, num_digits)
         elif isinstance(obj, list):
-            obj = [self._round_all(item) for item in obj]
+            obj = [self._round_all(item, num_digits) for item in obj]
         elif isinstance(obj, dict):
             new_obj = {
-                subkey: self._round_all(val) for subkey,
+                subkey: self._round_all(val, num_digits) for subkey,
                 val in obj.items()}
             obj = new_obj
         elif isinstance(obj, tuple):
             obj = list(obj)
-            obj = tuple(self._round_all(obj))
+            obj = tuple(self._round_all(obj, num_digits))
+        elif isinstance(obj, np.ndarray) and obj.dtype.kind == 'f':
+            # Round whole arrays (like depth or position data) at once.
+            obj = np.round(obj, num_digits)
         return obj
 
     def update_history_output(
@@ -212,14 +233,24 @@ class HistoryWriter(object):
             history.output.object_list = None
         return history
 
-    def init_timer(self):
+    def init_timer(self, time_millis: Optional[float] = None):
         """Initialize the step timer.  Should be called when first command is
-            sent to controller"""
-        self.last_step_time_millis = perf_counter() * 1000
-
-    def add_step(self, step_obj: SceneHistory):
-        """Add a new step to the array of history steps"""
-        current_time = perf_counter() * 1000
+            sent to controller, with the perf_counter milliseconds when it was
+            sent (default now)"""
+        self.last_step_time_millis = (
+            perf_counter() * 1000 if time_millis is None else time_millis)
+
+    def add_step(
+        self,
+        step_obj: SceneHistory,
+        time_millis: Optional[float] = None
+    ):
+        """Add a new step to the array of history steps, timed from the
+            previous step to the given perf_counter milliseconds (default
+            now), which asynchronous subscribers must pass so the time spent
+            waiting in their queue isn't included"""
+        current_time = (
+            perf_counter() * 1000 if time_millis is None else time_millis)
         if step_obj is not None:
             step_obj.delta_time_millis = (
                 current_time - self.last_step_time_millis)
@@ -227,8 +258,16 @@ class HistoryWriter(object):
             if step_obj.output:
                 step_obj.target_visible = self.is_target_visible(step_obj)
             logger.debug("Adding history step")
-            self.current_steps.append(
-                dict(self.update_history_output(step_obj)))
+            self._append_step(dict(self.update_history_output(step_obj)))
+
+    def _append_step(self, step: dict):
+        self.current_steps.append(step)
+
+    def add_report(self, report: Dict):
+        """Add the retrospective report (classification, confidence,
+            violations, and internal state) to each reported step"""
+        for step in self.current_steps:
+            _apply_report(step, report)
 
     def is_target_visible(self, history: SceneHistory) -> Union[bool, list]:
         """Determine the current visibility of the target object, if any. In
@@ -273,3 +312,131 @@ class HistoryWriter(object):
 
     def __str__(self):
         return Stringifier.class_to_str(self)
+
+
+class StreamingHistoryWriter(HistoryWriter):
+    """
+    Scene history writer that appends each step to a JSON Lines history
+    stream file as soon as it's added, instead of keeping every step in
+    memory until the end of the scene, so its memory use doesn't grow with
+    the length of the scene, and a crash before end_scene doesn't lose the
+    steps run so far.  Each line of the stream file is a JSON object with one
+    key: "info", "step", "report", or "score".
+
+    Writing the history file converts the stream file into a history JSON
+    file with the same layout that HistoryWriter writes, then deletes the
+    stream file.  Use convert_history_stream to convert a stream file left
+    behind by a crash.
+    """
+    STREAM_FILE_EXTENSION = ".jsonl"
+
+    def __init__(self, scene_config_data=None, hist_info=None, timestamp=''):
+        super().__init__(scene_config_data, hist_info, timestamp)
+        self.stream_file = None
+        self._stream = None
+        if self.scene_history_file:
+            self.stream_file = (
+                os.path.splitext(self.scene_history_file)[0] +
+                self.STREAM_FILE_EXTENSION
+            )
+            self._stream = open(self.stream_file, "w")
+            self._write_record("info", self.info_obj)
+
+    def _write_record(self, key: str, value):
+        if self._stream is None:
+            return
+        # Round each record as it's written rather than the whole history at
+        # the end of the scene.
+        self._stream.write(
+            json.dumps({key: self._round_all(value)}, cls=NumpyEncoder) +
+            "\n"
+        )
+        self._stream.flush()
+
+    def _append_step(self, step: dict):
+        self._write_record("step", step)
+
+    def add_report(self, report: Dict):
+        self._write_record("report", report)
+
+    def write_file(self):
+        if self._stream is None:
+            return
+        self._write_record("score", self.end_score)
+        self._stream.close()
+        self._stream = None
+        logger.info(f"Saving history file {self.scene_history_file}")
+        convert_history_stream(self.stream_file, self.scene_history_file)
+        os.remove(self.stream_file)
+
+
+def _load_record(line: str) -> Optional[Dict]:
+    try:
+        return json.loads(line)
+    except ValueError:
+        # The last line may be incomplete if the writer crashed.
+        logger.warning(f"Skipping unreadable history record: {line[:80]}")
+        return None
+
+
+def convert_history_stream(
+    stream_file: str,
+    history_file: Optional[str] = None
+) -> str:
+    """
+    Convert a history stream file written by StreamingHistoryWriter into a
+    history JSON file, with the same layout that HistoryWriter writes, for
+    compatibility with scorecard tools.  Steps are read and written one at a
+    time, so long scenes are never entirely in memory.  A stream file whose
+    scene never ended (like after a crash) is given an empty score.
+
+    Parameters
+    ----------
+    stream_file : str
+        The history stream (.jsonl) file.
+    history_file : str, optional
+        The history JSON file to write. (default the stream file with a
+        .json extension)
+
+    Returns
+    -------
+    str
+        The history JSON file.
+    """
+    if history_file is None:
+        history_file = os.path.splitext(stream_file)[0] + ".json"
+
+    # Read everything except the steps first, since the report applies to the
+    # steps, and the score is written after them.
+    info = {}
+    report = {}
+    score = {"classification": "", "confidence": ""}
+    with open(stream_file) as stream:
+        for line in stream:
+            if not line.strip() or line.startswith('{"step"'):
+                continue
+            record = _load_record(line)
+            if record is None:
+                continue
+            if "info" in record:
+                info = record["info"]
+            elif "report" in record:
+                report.update(record["report"])
+            elif "score" in record:
+                score = record["score"]
+
+    with open(stream_file) as stream, open(history_file, "w") as history:
+        history.write('{"info": ' + json.dumps(info) + ', "steps": [')
+        first = True
+        for line in stream:
+            if not line.startswith('{"step"'):
+                continue
+            record = _load_record(line)
+            if record is None:
+                continue
+            step = record["step"]
+            _apply_report(step, report)
+            history.write(("" if first else ", ") + json.dumps(step))
+            first = False
+        history.write('], "score": ' + json.dumps(score) + '}')
+    return history_file
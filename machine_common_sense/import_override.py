@@ -1,8 +1,6 @@
 import builtins
 from types import ModuleType
 
-import portalocker
-
 
 class MockFcntl(ModuleType):
     """
@@ -18,6 +16,8 @@ class MockFcntl(ModuleType):
     LOCK_UN = 8
 
     def lockf(self, lock_file, lock_mode):
+        # Imported here, since it's only needed on Windows.
+        import portalocker
         if lock_mode == self.LOCK_SH:
             portalocker.lock(lock_file, portalocker.LockFlags.SHARED)
         if lock_mode > self.LOCK_SH and lock_mode < self.LOCK_UN:
@@ -67,8 +67,4 @@ class Material(Enum):
         -------
         boolean
         """
-        try:
-            _ = Material[enum_string.upper()]
-            return True
-        except KeyError:
-            return False
+        return enum_string.upper() in Material.__members__
@@ -1,3 +1,7 @@
+from typing import Dict, List, Optional
+
+import numpy as np
+
 from .stringifier import Stringifier
 
 
@@ -68,6 +72,17 @@ class ObjectMetadata(object):
         Whether you can see this object in your camera viewport.
     """
 
+    # Slots rather than a per-instance dict, since each step can have many
+    # objects, and scene histories keep every step.
+    __slots__ = (
+        'uuid', 'dimensions', 'direction', 'distance', 'distance_in_steps',
+        'distance_in_world', 'held', 'mass', 'material_list', 'position',
+        'rotation', 'segment_color', 'shape', 'state_list',
+        'texture_color_list', 'visible', 'is_open', 'openable', 'locked',
+        'associated_with_agent', 'simulation_agent_held_object',
+        'simulation_agent_is_holding_held_object'
+    )
+
     def __init__(
         self,
         uuid="",
@@ -150,3 +165,230 @@ class ObjectMetadata(object):
         yield 'simulation_agent_held_object', self.simulation_agent_held_object
         yield 'simulation_agent_is_holding_held_object', \
             self.simulation_agent_is_holding_held_object
+
+
+class ObjectList(list):
+    """
+    A list of ObjectMetadata, like the StepMetadata's object_list, that also
+    has numpy arrays of its objects' positions, distances, visibility, and
+    bounds, for vectorized queries over all of the objects in a step (like
+    finding every visible object within a given distance).
+
+    The arrays are read-only, built the first time they're needed, and
+    built again if the objects in the list change.  Changing an
+    ObjectMetadata in the list won't change the arrays built before then.
+    Copies (see copy) share the arrays until their objects change.
+
+    Example:
+
+    .. highlight:: python
+    .. code-block:: python
+
+        step_metadata = controller.step('Pass')
+        nearby = step_metadata.object_list.within(2.0, visible_only=True)
+        for object_metadata in nearby:
+            print(object_metadata.uuid)
+    """
+
+    def __init__(self, objects=()):
+        super().__init__(objects)
+        # The arrays and the object ids they were built from, and the
+        # objects' indexes by uuid and the object ids they were built from,
+        # shared by copies.
+        self._cache = {}
+
+    def _get_cache(self) -> Dict:
+        cache = getattr(self, '_cache', None)
+        if cache is None:
+            # If __init__ wasn't called.
+            cache = self._cache = {}
+        return cache
+
+    def _get_columns(self) -> Dict[str, np.ndarray]:
+        cache = self._get_cache()
+        key = tuple(map(id, self))
+        if cache.get('key') != key:
+            cache.clear()
+            cache['columns'] = self._create_columns()
+            cache['key'] = key
+        return cache['columns']
+
+    def copy(self) -> 'ObjectList':
+        """Return a shallow copy of this list, sharing its arrays."""
+        copied = ObjectList(self)
+        copied._cache = self._get_cache()
+        return copied
+
+    def _create_columns(self) -> Dict[str, np.ndarray]:
+        columns = self._create_column_arrays()
+        for array in columns.values():
+            # Shared by copies.
+            array.flags.writeable = False
+        return columns
+
+    def _create_column_arrays(self) -> Dict[str, np.ndarray]:
+        count = len(self)
+        positions = np.full((count, 3), np.nan)
+        bounds = np.full((count, 8, 3), np.nan)
+        for index, obj in enumerate(self):
+            position = obj.position or {}
+            positions[index] = [
+                position.get('x', np.nan),
+                position.get('y', np.nan),
+                position.get('z', np.nan)
+            ]
+            corners = obj.dimensions or []
+            if len(corners) == 8:
+                bounds[index] = [
+                    [corner['x'], corner['y'], corner['z']]
+                    for corner in corners
+                ]
+        return {
+            'positions': positions,
+            'bounds': bounds,
+            'distances_in_steps': np.array(
+                [obj.distance_in_steps for obj in self], dtype=float),
+            'distances_in_world': np.array(
+                [obj.distance_in_world for obj in self], dtype=float),
+            'visible': np.array([obj.visible for obj in self], dtype=bool),
+            'held': np.array([obj.held for obj in self], dtype=bool)
+        }
+
+    @property
+    def uuids(self) -> List[str]:
+        """The uuid of each object."""
+        return [obj.uuid for obj in self]
+
+    @property
+    def positions(self) -> np.ndarray:
+        """The "x", "y", and "z" position of each object, as an (N, 3)
+        array.  Missing coordinates are NaN."""
+        return self._get_columns()['positions']
+
+    @property
+    def bounds(self) -> np.ndarray:
+        """The "x", "y", and "z" of the 8 bounds corners (dimensions) of each
+        object, as an (N, 8, 3) array.  Objects without 8 corners are
+        NaN."""
+        return self._get_columns()['bounds']
+
+    @property
+    def distances_in_steps(self) -> np.ndarray:
+        """The distance_in_steps of each object, as an (N,) array."""
+        return self._get_columns()['distances_in_steps']
+
+    @property
+    def distances_in_world(self) -> np.ndarray:
+        """The distance_in_world of each object, as an (N,) array."""
+        return self._get_columns()['distances_in_world']
+
+    @property
+    def visible(self) -> np.ndarray:
+        """Whether each object is visible, as an (N,) bool array."""
+        return self._get_columns()['visible']
+
+    @property
+    def held(self) -> np.ndarray:
+        """Whether each object is held, as an (N,) bool array."""
+        return self._get_columns()['held']
+
+    def get(self, uuid: str) -> Optional[ObjectMetadata]:
+        """Return the object with the given uuid, or None."""
+        cache = self._get_cache()
+        index = cache.get('index', {}).get(uuid)
+        if index is not None and index < len(self) and (
+            self[index].uuid == uuid
+        ):
+            return self[index]
+        # Not found, so check whether the list has changed.
+        key = tuple(map(id, self))
+        if cache.get('index_key') != key:
+            cache['index'] = {
+                obj.uuid: index for index, obj in enumerate(self)
+            }
+            cache['index_key'] = key
+            index = cache['index'].get(uuid)
+            if index is not None:
+                return self[index]
+        return None
+
+    def select(self, mask) -> 'ObjectList':
+        """Return the objects for which the given (N,) bool array is true, in
+        order."""
+        return ObjectList(
+            self[index]
+            for index in np.flatnonzero(np.asarray(mask, dtype=bool))
+        )
+
+    def distances_from(self, position: Dict) -> np.ndarray:
+        """Return the 3D distance from the given "x", "y", and "z" position
+        (a dict, like the StepMetadata's position) to each object, as an (N,)
+        array."""
+        point = np.array([
+            position.get('x', 0.0),
+            position.get('y', 0.0),
+            position.get('z', 0.0)
+        ])
+        return np.linalg.norm(self.positions - point, axis=1)
+
+    def _distances(self, position: Optional[Dict]) -> np.ndarray:
+        if position is None:
+            distances = self.distances_in_world.copy()
+            # Unknown distances are negative.
+            distances[distances < 0] = np.nan
+            return distances
+        return self.distances_from(position)
+
+    def within(
+        self,
+        distance: float,
+        position: Dict = None,
+        visible_only: bool = False
+    ) -> 'ObjectList':
+        """
+        Return the objects within the given distance, in order.
+
+        Parameters
+        ----------
+        distance : float
+            The max distance, in meters.
+        position : dict, optional
+            The "x", "y", and "z" position to measure the distance from.
+            (default your position, using each object's distance_in_world)
+        visible_only : bool, optional
+            Whether to return only visible objects. (default False)
+        """
+        with np.errstate(invalid='ignore'):
+            mask = self._distances(position) <= distance
+        if visible_only:
+            mask &= self.visible
+        return self.select(mask)
+
+    def nearest(
+        self,
+        count: int = 1,
+        position: Dict = None,
+        visible_only: bool = False
+    ) -> 'ObjectList':
+        """
+        Return up to the given count of objects nearest the given position,
+        nearest first.  Objects with unknown distances are excluded.
+
+        Parameters
+        ----------
+        count : int, optional
+            The max number of objects. (default 1)
+        position : dict, optional
+            The "x", "y", and "z" position to measure the distance from.
+            (default your position, using each object's distance_in_world)
+        visible_only : bool, optional
+            Whether to return only visible objects. (default False)
+        """
+        distances = self._distances(position)
+        if visible_only:
+            distances = np.where(self.visible, distances, np.nan)
+        indexes = [
+            index for index in np.argsort(distances, kind='stable')
+            if not np.isnan(distances[index])
+        ]
+        return ObjectList(self[index] for index in indexes[:count])
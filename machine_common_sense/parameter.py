@@ -2,10 +2,9 @@ import random
 import string
 from typing import Any, Dict, List, Optional, Tuple
 
-from .action import (FORCE_ACTIONS, OBJECT_IMAGE_ACTIONS, OBJECT_MOVE_ACTIONS,
-                     RECEPTACLE_ACTIONS, Action)
+from .action import (DEFAULT_MOVE, FORCE_ACTIONS, OBJECT_IMAGE_ACTIONS,
+                     OBJECT_MOVE_ACTIONS, RECEPTACLE_ACTIONS, Action)
 from .config_manager import ConfigManager, MetadataTier
-from .controller import DEFAULT_MOVE
 
 
 def compare_param_values(value_1: Any, value_2: Any) -> bool:
@@ -148,6 +148,23 @@ class Texture():
     positions: list
 
 
+class _DrawingRecorder():
+    '''Stands in for a plot image to record the pixels drawn on it, so they
+    can be drawn again on later plots without recalculating them.'''
+
+    def __init__(self, shape: tuple) -> None:
+        self.shape = shape
+        self.operations = []
+
+    def __setitem__(self, key, value) -> None:
+        self.operations.append((key, value))
+
+    def replay(self, img: np.ndarray) -> np.ndarray:
+        for key, value in self.operations:
+            img[key] = value
+        return img
+
+
 class TopDownPlotter():
 
     DEFAULT_COLOR = colour.COLOR_NAME_TO_RGB['white']
@@ -181,6 +198,16 @@ class TopDownPlotter():
         self._team = team
         # create the room once as it is computationally expensive
         self.base_room_img = self._initialize_plot(scene_config)
+        # The room plus the structural objects that haven't moved yet, like
+        # walls, drawn beneath everything else, and redrawn only when one of
+        # them changes (like its visibility to the robot).
+        self._static_layer = None
+        self._static_layer_key = None
+        # The pixels drawn for each object on the latest step it changed,
+        # along with the metadata they were drawn from.
+        self._object_drawings: Dict[str, Tuple[tuple, _DrawingRecorder]] = {}
+        # Objects whose bounds have changed, so aren't on the static layer.
+        self._moved_ids = set()
 
     def _initialize_plot(self, scene_config: SceneConfiguration) -> np.ndarray:
         '''Create the initial plot with grid lines'''
@@ -229,20 +256,35 @@ class TopDownPlotter():
     def plot(self, scene_event: ai2thor.server.Event,
              step_number: int, goal_ids: list = None) -> PIL.Image.Image:
         '''Create a plot of the room, objects and robot'''
-        plt_img = self.base_room_img.copy()
+        return self._export_plot(
+            img=self.plot_array(scene_event, step_number, goal_ids))
 
+    def plot_array(self, scene_event: ai2thor.server.Event,
+                   step_number: int, goal_ids: list = None) -> np.ndarray:
+        '''Create a plot of the room, objects and robot as an RGB array'''
         plt_objects = self._find_plottable_objects(scene_event)
-        plt_img = self._draw_objects(plt_img,
-                                     plt_objects,
-                                     goal_ids)
+        structural_ids = set(
+            obj.get('objectId') for obj in
+            scene_event.metadata.get('structuralObjects', [])
+        )
+        static_count = self._count_static_objects(
+            plt_objects,
+            structural_ids,
+            goal_ids
+        )
+        plt_img = self._get_static_layer(
+            plt_objects[:static_count]
+        ).copy()
+        plt_img = self._draw_cached_objects(plt_img,
+                                            plt_objects[static_count:],
+                                            goal_ids)
 
         agent_metadata = scene_event.metadata.get('agent')
         plt_img = self._draw_robot(
             plt_img,
             agent_metadata)
 
-        plt_img = self._draw_step_number(plt_img, step_number)
-        return self._export_plot(img=plt_img)
+        return self._draw_step_number(plt_img, step_number)
 
     def _convert_to_image_coords(self, scene_pt: SceneCoord) -> ImageCoord:
         '''converts scene xz coordinate point to an xy image coordinate'''
@@ -632,6 +674,82 @@ class TopDownPlotter():
             key=lambda obj: obj['objectBounds']['objectBoundsCorners'][0]['y'])
         return combined_objects
 
+    def _count_static_objects(self, objects: List, structural_ids: set,
+                              goal_ids: list = None) -> int:
+        '''Return the number of objects at the start of the given (sorted)
+        list that are structural, non-goal objects that haven't moved in this
+        scene, and so may be drawn on the static layer.  Objects drawn later
+        in the list must stay on top of them.'''
+        count = 0
+        for obj in objects:
+            object_id = obj.get('objectId')
+            if (
+                object_id not in structural_ids or
+                object_id in self._moved_ids or
+                (goal_ids is not None and object_id in goal_ids)
+            ):
+                break
+            count += 1
+        return count
+
+    def _get_static_layer(self, objects: List) -> np.ndarray:
+        '''Return the room image with the given static objects drawn on it,
+        reusing the previous step's image if none of the objects changed.'''
+        key = tuple(
+            (obj.get('objectId'), self._object_signature(obj, False))
+            for obj in objects
+        )
+        if self._static_layer is None or self._static_layer_key != key:
+            self._static_layer = self._draw_cached_objects(
+                self.base_room_img.copy(),
+                objects
+            )
+            self._static_layer_key = key
+        return self._static_layer
+
+    def _object_signature(self, object_metadata: Dict,
+                          is_goal: bool) -> tuple:
+        '''Return everything about the object that changes how it's drawn,
+        including its height and rotation (like a ramp's tilt), which only
+        change its drawing through its corners now, but are part of its
+        SceneBounds'''
+        obj_bounds = object_metadata.get('objectBounds') or {}
+        corners = obj_bounds.get('objectBoundsCorners')
+        rotation = object_metadata.get('rotation')
+        return (
+            None if corners is None else tuple(
+                (corner['x'], corner['y'], corner['z']) for corner in corners
+            ),
+            None if rotation is None else tuple(
+                rotation.get(axis) for axis in ('x', 'y', 'z')
+            ),
+            tuple(object_metadata.get('colorsFromMaterials', [])[:1]),
+            object_metadata.get('visibleInCamera'),
+            is_goal
+        )
+
+    def _draw_cached_objects(self, img: np.ndarray, objects: List,
+                             goal_ids: list = None) -> np.ndarray:
+        '''Plot each object like _draw_objects, but reuse the pixels drawn for
+        it on a previous step if it hasn't changed since then.'''
+        for obj in objects:
+            object_id = obj.get('objectId')
+            if object_id is None:
+                img = self._draw_objects(img, [obj], goal_ids)
+                continue
+            is_goal = goal_ids is not None and object_id in goal_ids
+            signature = self._object_signature(obj, is_goal)
+            cached = self._object_drawings.get(object_id)
+            if cached is None or cached[0] != signature:
+                if cached is not None and cached[0][0] != signature[0]:
+                    self._moved_ids.add(object_id)
+                drawing = _DrawingRecorder(img.shape)
+                self._draw_objects(drawing, [obj], goal_ids)
+                cached = (signature, drawing)
+                self._object_drawings[object_id] = cached
+            img = cached[1].replay(img)
+        return img
+
     def _draw_objects(self, img: np.ndarray, objects: Dict,
                       goal_ids: list = None) -> np.ndarray:
         '''Plot the object bounds for each object in the scene'''
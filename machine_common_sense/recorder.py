@@ -5,28 +5,64 @@ import queue
 import threading
 import time
 from abc import ABC, abstractmethod
-from typing import Any
+from enum import Enum
+from typing import Any, Dict, Tuple, Union
 
-import cv2
 import numpy as np
-import PIL
+import PIL.Image
 
 logger = logging.getLogger(__name__)
 
 
+class QueueFullPolicy(Enum):
+    '''What a recorder does with a new item when its queue is full.'''
+    # Wait until the write thread makes room for the item.
+    BLOCK = 'block'
+    # Discard the item.
+    DROP = 'drop'
+
+
+# Tells the write thread to stop.
+_STOP = object()
+
+
 class BaseRecorder(ABC):
     '''BaseRecorder class provides common functionality for all recorders.
 
     The abstract class handles the thread writing and item storage queue.
+    The write thread blocks on the queue until an item is added, so items
+    are written as soon as possible, and stops once it reads the sentinel
+    added by finish().
+
+    The queue holds at most max_queue_size items (unbounded if 0).  When
+    the queue is full, add() either waits for the write thread to make room
+    (QueueFullPolicy.BLOCK, for up to timeout seconds, or forever if the
+    timeout is None) or discards the new item (QueueFullPolicy.DROP).
     '''
 
+    MAX_QUEUE_SIZE_DEFAULT = 128
+
     _queue = None
     _thread = None
     num_recorded = 0
+    num_dropped = 0
+    num_failed = 0
     recording = False
 
-    def __init__(self, timeout: float = 1.0):
+    def __init__(
+        self,
+        timeout: float = None,
+        max_queue_size: int = MAX_QUEUE_SIZE_DEFAULT,
+        queue_full_policy: Union[QueueFullPolicy, str] = QueueFullPolicy.BLOCK
+    ):
         self.timeout = timeout
+        self.max_queue_size = max_queue_size
+        self.queue_full_policy = QueueFullPolicy(queue_full_policy)
+        self._error = None
+        self._max_queue_depth = 0
+        self._write_count = 0
+        self._write_time_total = 0.0
+        self._write_time_max = 0.0
 
     def start(self):
         '''Start the recorder.
@@ -35,46 +71,82 @@ class BaseRecorder(ABC):
         '''
         logger.debug("Starting recorder")
         self.recording = True
-        self._queue = queue.Queue()
+        self._queue = queue.Queue(maxsize=self.max_queue_size)
         self._thread = threading.Thread(target=self.write, args=())
         self._thread.daemon = True
         self._thread.start()
 
     def flush(self) -> None:
-        '''Write every item currently in the queue'''
-        while not self._queue.empty():
+        '''Wait until every item currently in the queue is written
+
+        Raises:
+            Exception: The first error raised by any write, if any
+        '''
+        if self._thread is not None and self._thread.is_alive():
             logger.debug("Flushing recorder queue")
-            item = self._queue.get()
-            self._write(item)
-            self.num_recorded = self.num_recorded + 1
+            self._queue.join()
+        self._raise_error()
 
     def finish(self) -> None:
-        '''Flush and close the recorder thread
+        '''Write every remaining item and close the recorder thread
 
         Further recordings should use a new recorder instance.
+
+        Raises:
+            Exception: The first error raised by any write, if any
         '''
         logger.debug("Closing recorder")
         self.recording = False
-        self.flush()
-        self._thread.join()
+        if self._thread is not None and self._thread.is_alive():
+            # Always wait to add the sentinel, regardless of the policy.
+            self._queue.put(_STOP)
+            self._thread.join()
+        self._raise_error()
 
     def write(self) -> None:
-        '''Thread loop waiting for frames to enter the queue.'''
+        '''Thread loop waiting for items to enter the queue.'''
         if not self.recording:
             logger.warning("Recorder inactive. Unable to start thread.")
             return
 
         while True:
-            if not self.recording:
-                logger.debug("Recorder going inactive")
-                return
-            if not self._queue.empty():
-                item = self._queue.get()
-                self._write(item)
-                self.num_recorded = self.num_recorded + 1
-                logger.debug(f"Recorder wrote {self.num_recorded} items")
-            else:
-                time.sleep(self.timeout)
+            item = self._queue.get()
+            try:
+                if item is _STOP:
+                    logger.debug("Recorder going inactive")
+                    return
+                self._write_item(item)
+            finally:
+                self._queue.task_done()
+
+    def _write_item(self, item: Any) -> None:
+        start = time.perf_counter()
+        try:
+            self._write(item)
+        except Exception as error:
+            self.num_failed = self.num_failed + 1
+            logger.error("Recorder failed to write item", exc_info=error)
+            # Raise the first error on the caller's thread in flush/finish.
+            if self._error is None:
+                self._error = error
+            return
+        write_time = time.perf_counter() - start
+        self._write_count += 1
+        self._write_time_total += write_time
+        self._write_time_max = max(self._write_time_max, write_time)
+        self.num_recorded = self.num_recorded + 1
+        logger.debug(f"Recorder wrote {self.num_recorded} items")
+
+    def _get_item_index(self) -> int:
+        '''Return the index of the item being written, counting failed
+        writes, so the next item doesn't reuse a failed item's file name.'''
+        return self.num_recorded + self.num_failed
+
+    def _raise_error(self) -> None:
+        error = self._error
+        self._error = None
+        if error is not None:
+            raise error
 
     def add(self, item: Any) -> None:
         '''Adds an item to the queue
@@ -85,10 +157,44 @@ class BaseRecorder(ABC):
         Return:
             None
         '''
-        if self.recording:
-            logger.debug("Adding item to recorder queue")
-            self._queue.put(item)
-            logger.debug(f"Queue size is approximately {self._queue.qsize()}")
+        if not self.recording:
+            return
+        logger.debug("Adding item to recorder queue")
+        try:
+            if self.queue_full_policy == QueueFullPolicy.DROP:
+                self._queue.put_nowait(item)
+            else:
+                self._queue.put(item, timeout=self.timeout)
+        except queue.Full:
+            self.num_dropped = self.num_dropped + 1
+            logger.warning(
+                f"Recorder queue is full ({self.max_queue_size} items); "
+                f"dropped {self.num_dropped} items")
+            return
+        queue_depth = self._queue.qsize()
+        self._max_queue_depth = max(self._max_queue_depth, queue_depth)
+        logger.debug(f"Queue size is approximately {queue_depth}")
+
+    def get_metrics(self) -> Dict[str, Any]:
+        '''Returns the recorder's queue depth and write latency metrics
+
+        Return:
+            dict: The current and max queue depth, the number of items
+            recorded, dropped, and failed, and the average and max write time
+            in seconds
+        '''
+        return {
+            'queue_depth': self._queue.qsize() if self._queue else 0,
+            'max_queue_depth': self._max_queue_depth,
+            'num_recorded': self.num_recorded,
+            'num_dropped': self.num_dropped,
+            'num_failed': self.num_failed,
+            'write_time_average': (
+                self._write_time_total / self._write_count
+                if self._write_count else 0.0
+            ),
+            'write_time_max': self._write_time_max
+        }
 
     @abstractmethod
     def _write(self):
@@ -100,12 +206,17 @@ class JsonRecorder(BaseRecorder):
     '''Threaded json recorder'''
 
     def __init__(self, json_template: pathlib.Path,
-                 timeout: float = 1.0, sort_keys=True, indent=4):
+                 timeout: float = None, sort_keys=True, indent=4,
+                 max_queue_size: int = BaseRecorder.MAX_QUEUE_SIZE_DEFAULT,
+                 queue_full_policy: Union[QueueFullPolicy, str] = (
+                     QueueFullPolicy.BLOCK)):
         '''Create the json recorder.
 
         Args:
             json_template(pathlib.Path): Filename template
-            timeout (float): How often in seconds to check the queue
+            timeout (float): Max seconds to wait on a full queue
+            max_queue_size (int): Max items in the queue (0 is unbounded)
+            queue_full_policy (QueueFullPolicy): Block or drop on full queue
 
         Returns:
             None
@@ -113,7 +224,7 @@ class JsonRecorder(BaseRecorder):
         self.path = json_template
         self.sort_keys = sort_keys
         self.indent = indent
-        super().__init__(timeout)
+        super().__init__(timeout, max_queue_size, queue_full_policy)
         super().start()
 
     def _write(self, data: dict) -> None:
@@ -125,7 +236,7 @@ class JsonRecorder(BaseRecorder):
         Returns:
             None
         '''
-        json_file = str(self.path).format(self.num_recorded)
+        json_file = str(self.path).format(self._get_item_index())
         logger.debug(f"Writing {json_file}")
         with open(json_file, 'w') as json_file:
             json.dump(
@@ -142,18 +253,23 @@ class ImageRecorder(BaseRecorder):
 
     def __init__(self,
                  img_template: pathlib.Path,
-                 timeout: float = 1.0):
+                 timeout: float = None,
+                 max_queue_size: int = BaseRecorder.MAX_QUEUE_SIZE_DEFAULT,
+                 queue_full_policy: Union[QueueFullPolicy, str] = (
+                     QueueFullPolicy.BLOCK)):
         '''Create the image recorder.
 
         Args:
             img_template(pathlib.Path): Filename template
-            timeout (float): How often in seconds to check the queue
+            timeout (float): Max seconds to wait on a full queue
+            max_queue_size (int): Max items in the queue (0 is unbounded)
+            queue_full_policy (QueueFullPolicy): Block or drop on full queue
 
         Returns:
             None
         '''
         self.path = img_template
-        super().__init__(timeout)
+        super().__init__(timeout, max_queue_size, queue_full_policy)
         super().start()
 
     def _write(self, image: PIL.Image.Image) -> None:
@@ -165,7 +281,7 @@ class ImageRecorder(BaseRecorder):
         Returns:
             None
         '''
-        image_filename = str(self.path).format(self.num_recorded)
+        image_filename = str(self.path).format(self._get_item_index())
         logger.debug(f"Writing {image_filename}")
         image.save(image_filename)
 
@@ -177,14 +293,19 @@ class VideoRecorder(BaseRecorder):
                  vid_path: pathlib.Path,
                  fps: int,
                  fourcc: str = 'mp4v',
-                 timeout: float = 1.0):
+                 timeout: float = None,
+                 max_queue_size: int = BaseRecorder.MAX_QUEUE_SIZE_DEFAULT,
+                 queue_full_policy: Union[QueueFullPolicy, str] = (
+                     QueueFullPolicy.BLOCK)):
         '''Create the video recorder.
 
         Args:
             vid_path (pathlib.path): the output video file path
             fps (int): video frame rate per second
             fourcc (str): opencv fourcc / codec string
-            timeout (float): thread sleep timeout in seconds
+            timeout (float): max seconds to wait on a full queue
+            max_queue_size (int): max frames in the queue (0 is unbounded)
+            queue_full_policy (QueueFullPolicy): block or drop on full queue
 
         Returns:
             None
@@ -194,17 +315,27 @@ class VideoRecorder(BaseRecorder):
         self.fourcc = fourcc
         self.fps = fps
         self.writer = None
-        super().__init__(timeout)
+        super().__init__(timeout, max_queue_size, queue_full_policy)
         super().start()
 
-    def add(self, frame: PIL.Image.Image) -> None:
+    def add(
+        self,
+        frame: Union[PIL.Image.Image, np.ndarray],
+        bgr: bool = False
+    ) -> None:
         '''Adds the video frame to the queue.
 
         Requires that the start function was called
         otherwise the frame is ignored.
 
+        Numpy frames are queued without being copied, so they must not be
+        modified afterward.  BGR numpy frames are written to the video as-is,
+        which is the fastest path.
+
         Args:
-            frame (PIL.Image.Image): RGB video frame to be written
+            frame (PIL.Image.Image or np.ndarray): video frame to be written;
+                numpy frames are HxWx3 uint8 RGB (or BGR) or HxW grayscale
+            bgr (bool): whether a numpy frame is BGR rather than RGB
 
         Returns:
             None
@@ -212,9 +343,15 @@ class VideoRecorder(BaseRecorder):
         Raises:
             ValueError: If frame is a different size from the initial
         '''
+        if isinstance(frame, np.ndarray):
+            height, width = frame.shape[:2]
+        else:
+            width, height = frame.size
 
         if self.writer is None:
-            self.width, self.height = frame.size
+            # Imported here, so opencv is only loaded if a video is written.
+            import cv2
+            self.width, self.height = width, height
             logger.debug(
                 f"Establishing video writer size"
                 f"({self.width},{self.height}) from first frame")
@@ -223,26 +360,46 @@ class VideoRecorder(BaseRecorder):
                                           self.fps,
                                           (self.width, self.height),
                                           True)
-        width, height = frame.size
         if (width, height) != (self.width, self.height):
             raise ValueError(f"Wrong size frame ({width}, {height}) for "
                              f"video writer ({self.width}, {self.height})")
 
-        super().add(frame)
+        super().add((frame, bgr))
 
-    def _write(self, frame: PIL.Image.Image) -> None:
+    def _write(
+        self,
+        item: Tuple[Union[PIL.Image.Image, np.ndarray], bool]
+    ) -> None:
         '''Write the frame to the video recording
 
         Args:
-            frame (PIL.Image.Image): Image frame to be written
+            item (tuple): Image frame to be written, and whether it's BGR
 
         Return:
             None
         '''
-        # convert BGR PIL image to RGB for opencv video writer
-        cv_frame = np.array(frame.convert('RGB'))[:, :, ::-1]
+        frame, bgr = item
         logger.debug(f"Writing frame #{self.num_recorded} to {self.path}")
-        self.writer.write(cv_frame)
+        self.writer.write(self._to_bgr(frame, bgr))
+
+    def _to_bgr(
+        self,
+        frame: Union[PIL.Image.Image, np.ndarray],
+        bgr: bool
+    ) -> np.ndarray:
+        '''Return the given frame as a BGR array for the opencv writer'''
+        import cv2
+        if not isinstance(frame, np.ndarray):
+            frame = np.asarray(
+                frame if frame.mode == 'RGB' else frame.convert('RGB'))
+        if frame.ndim == 2:
+            return cv2.cvtColor(frame, cv2.COLOR_GRAY2BGR)
+        if frame.shape[2] == 4:
+            return cv2.cvtColor(
+                frame, cv2.COLOR_BGRA2BGR if bgr else cv2.COLOR_RGBA2BGR)
+        if bgr:
+            return np.ascontiguousarray(frame)
+        return cv2.cvtColor(frame, cv2.COLOR_RGB2BGR)
 
     def finish(self) -> None:
         '''Deactivate the recorder so that it does not accept more frames.
@@ -251,6 +408,8 @@ class VideoRecorder(BaseRecorder):
         closed.
         '''
         logger.debug("Closing video recorder")
-        super().finish()
-        if self.writer:
-            self.writer.release()
+        try:
+            super().finish()
+        finally:
+            if self.writer:
+                self.writer.release()
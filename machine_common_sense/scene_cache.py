@@ -0,0 +1,202 @@
+import collections
+import concurrent.futures
+import hashlib
+import json
+import logging
+import os
+import pickle
+import threading
+from dataclasses import dataclass
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from ._version import __version__
+from .config_manager import SceneConfiguration
+
+logger = logging.getLogger(__name__)
+
+SCENE_PACK_FORMAT = 1
+
+
+@dataclass(frozen=True)
+class CachedScene:
+    '''
+    A scene file's validated SceneConfiguration, along with the scene config
+    dict sent to Unity, made from it once rather than on each start_scene.
+    Pass it to Controller.start_scene in place of the scene data.  It's
+    shared by every user of its cache, so don't modify either field.
+    '''
+    content_hash: str
+    scene_config: SceneConfiguration
+    unity_config: Dict
+
+
+def hash_scene_content(content: bytes) -> str:
+    return hashlib.sha256(content).hexdigest()
+
+
+def create_cached_scene(content: bytes) -> CachedScene:
+    '''Return the CachedScene for the given scene file content.'''
+    scene_data = json.loads(content.decode('utf-8-sig'))
+    scene_config = SceneConfiguration(**scene_data)
+    return CachedScene(
+        content_hash=hash_scene_content(content),
+        scene_config=scene_config,
+        unity_config=scene_config.get_unity_config()
+    )
+
+
+def _load_scene_file(scene_file: str) -> Tuple[str, CachedScene]:
+    with open(scene_file, 'rb') as scene_file_object:
+        content = scene_file_object.read()
+    return os.path.abspath(scene_file), create_cached_scene(content)
+
+
+def create_scene_pack(
+    scene_files: Iterable[str],
+    pack_file: str,
+    max_workers: int = 1
+) -> int:
+    '''
+    Validate the given scene files and save them, ready to send to Unity,
+    in a single scene pack file, which SceneCache.load_pack can read much
+    faster than the scene files themselves.  Scene packs are pickled, so
+    only load ones from trusted sources, and they must be recreated for each
+    version of this package.  Returns the number of scenes in the pack.
+
+    Parameters
+    ----------
+    scene_files : iterable of str
+        The scene JSON files.
+    pack_file : str
+        The scene pack file to save.
+    max_workers : int, optional
+        The number of processes that validate scene files. (default 1)
+    '''
+    scene_files = list(scene_files)
+    if max_workers > 1:
+        with concurrent.futures.ProcessPoolExecutor(max_workers) as executor:
+            scenes = list(executor.map(
+                _load_scene_file, scene_files, chunksize=16))
+    else:
+        scenes = [_load_scene_file(scene_file) for scene_file in scene_files]
+    with open(pack_file, 'wb') as pack_file_object:
+        pickle.dump({
+            'format': SCENE_PACK_FORMAT,
+            'version': __version__,
+            'scenes': scenes
+        }, pack_file_object, protocol=pickle.HIGHEST_PROTOCOL)
+    return len(scenes)
+
+
+class SceneCache():
+    '''
+    Caches the validated scene configuration and Unity-ready scene config
+    dict of each scene file loaded, by its path and the hash of its content,
+    so running the same scene file again (for example, with another metadata
+    tier or team) skips reading, parsing, and validating it.  A scene file
+    that's been modified since it was cached is loaded again, and scene
+    files with the same content share one cache entry.
+
+    Parameters
+    ----------
+    max_size : int, optional
+        The max number of scenes cached; the least recently used scene is
+        removed once it's exceeded.  None is unlimited. (default 256)
+    '''
+
+    MAX_SIZE_DEFAULT = 256
+
+    def __init__(self, max_size: Optional[int] = MAX_SIZE_DEFAULT):
+        self.max_size = max_size
+        self.hits = 0
+        self.misses = 0
+        # Scenes by content hash, least recently used first.
+        self._scenes: Dict[str, CachedScene] = collections.OrderedDict()
+        # Content hash and (mtime, size) stat of each path.  A stat of None
+        # is from a scene pack, so the file's content must be hashed once.
+        self._paths: Dict[str, Tuple[str, Optional[Tuple[int, int]]]] = {}
+        self._lock = threading.Lock()
+
+    def get(self, scene_file: str) -> CachedScene:
+        '''Return the CachedScene for the given scene file, loading it if it
+        isn't cached or has been modified.  If the file doesn't exist but
+        was in a loaded scene pack, returns the packed scene.'''
+        path = os.path.abspath(scene_file)
+        try:
+            stat = os.stat(path)
+            stat = (stat.st_mtime_ns, stat.st_size)
+        except FileNotFoundError:
+            with self._lock:
+                content_hash, _ = self._paths.get(path, (None, None))
+                scene = self._use(content_hash)
+            if scene is None:
+                raise
+            return scene
+
+        with self._lock:
+            content_hash, cached_stat = self._paths.get(path, (None, None))
+            if cached_stat == stat:
+                scene = self._use(content_hash)
+                if scene is not None:
+                    return scene
+
+        with open(path, 'rb') as scene_file_object:
+            content = scene_file_object.read()
+        content_hash = hash_scene_content(content)
+        with self._lock:
+            self._paths[path] = (content_hash, stat)
+            scene = self._use(content_hash)
+            if scene is not None:
+                return scene
+            self.misses += 1
+
+        scene = create_cached_scene(content)
+        with self._lock:
+            self._add(scene)
+        return scene
+
+    def load_pack(self, pack_file: str) -> int:
+        '''Add the scenes from the given scene pack file (see
+        create_scene_pack) to the cache, and return how many there were.
+        Raises a ValueError if it's from another version of this package.'''
+        with open(pack_file, 'rb') as pack_file_object:
+            pack = pickle.load(pack_file_object)
+        if (
+            pack.get('format') != SCENE_PACK_FORMAT or
+            pack.get('version') != __version__
+        ):
+            raise ValueError(
+                f'Scene pack {pack_file} is from MCS version '
+                f'{pack.get("version")}, not {__version__}; recreate it')
+        scenes: List[Tuple[str, CachedScene]] = pack['scenes']
+        with self._lock:
+            for path, scene in scenes:
+                self._add(scene)
+                if self._paths.get(path, (None,))[0] != scene.content_hash:
+                    self._paths[path] = (scene.content_hash, None)
+        logger.debug(f'Loaded {len(scenes)} scenes from {pack_file}')
+        return len(scenes)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._scenes.clear()
+            self._paths.clear()
+
+    def __len__(self) -> int:
+        return len(self._scenes)
+
+    def _use(self, content_hash: Optional[str]) -> Optional[CachedScene]:
+        # Call with the lock held.
+        scene = self._scenes.get(content_hash)
+        if scene is not None:
+            self._scenes.move_to_end(content_hash)
+            self.hits += 1
+        return scene
+
+    def _add(self, scene: CachedScene) -> None:
+        # Call with the lock held.
+        self._scenes[scene.content_hash] = scene
+        self._scenes.move_to_end(scene.content_hash)
+        if self.max_size is not None:
+            while len(self._scenes) > self.max_size:
+                self._scenes.popitem(last=False)
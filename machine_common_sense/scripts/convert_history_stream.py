@@ -0,0 +1,23 @@
+import argparse
+
+from machine_common_sense.history_writer import convert_history_stream
+
+
+def main(stream_files):
+    for stream_file in stream_files:
+        history_file = convert_history_stream(stream_file)
+        print(f'Converted {stream_file} to {history_file}')
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=(
+        'Convert MCS scene history stream (.jsonl) files into scene history '
+        'JSON files'
+    ))
+    parser.add_argument(
+        'stream_files',
+        nargs='+',
+        help='Scene history stream (.jsonl) files'
+    )
+    args = parser.parse_args()
+    main(args.stream_files)
@@ -0,0 +1,37 @@
+import argparse
+import glob
+
+from machine_common_sense.scene_cache import create_scene_pack
+
+
+def main(scene_files, pack_file, max_workers):
+    count = create_scene_pack(scene_files, pack_file, max_workers)
+    print(f'Saved {count} scenes to {pack_file}')
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=(
+        'Validate MCS scene JSON files ahead of time and save them in a '
+        'scene pack file, to load with SceneCache.load_pack'
+    ))
+    parser.add_argument(
+        'pack_file',
+        help='Scene pack file to save'
+    )
+    parser.add_argument(
+        'scene_files',
+        nargs='+',
+        help='Scene JSON files, or glob patterns of them'
+    )
+    parser.add_argument(
+        '--max_workers',
+        type=int,
+        default=1,
+        help='Number of processes that validate scene files'
+    )
+    args = parser.parse_args()
+    scene_files = sorted(set(
+        scene_file for pattern in args.scene_files
+        for scene_file in (glob.glob(pattern) or [pattern])
+    ))
+    main(scene_files, args.pack_file, args.max_workers)
@@ -4,6 +4,7 @@ import statistics
 import time
 
 import machine_common_sense as mcs
+from machine_common_sense.controller_pool import PoolReport, SceneResult
 
 DEFAULT_STEP_COUNT = 20
 
@@ -16,6 +17,15 @@ def parse_args():
     parser.add_argument(
         'mcs_scene_dir',
         help='MCS JSON scene configuration directory')
+    parser.add_argument(
+        '--workers',
+        type=int,
+        default=1,
+        help='Number of MCS Unity apps to run scenes on in parallel')
+    parser.add_argument(
+        '--report',
+        default=None,
+        help='Save a JSON report of every scene to this file')
     return parser.parse_args()
 
 
@@ -50,6 +60,36 @@ def run_scene(controller, file_name):
     return step_time_list
 
 
+def run_parallel(args, file_list):
+    print(
+        f'FOUND {len(file_list)} SCENE CONFIGURATION FILES... '
+        f'STARTING {args.workers} MCS UNITY APPS...')
+    pool = mcs.ControllerPool(
+        worker_count=args.workers,
+        config_file_or_dict={},
+        unity_app_file_path=os.path.abspath(args.mcs_unity_build_file)
+    )
+    report = pool.run([os.path.abspath(file) for file in file_list])
+    if args.report:
+        report.write(args.report)
+
+    for result in report.failed:
+        print(f'FAILED {result.scene_file}: {result.error}')
+    data = report.to_dict()
+    print('===================================================='
+          '============================')
+    print(f'RAN {data["scene_count"]} SCENES WITH {data["step_count"]} '
+          f'TOTAL STEPS IN {report.elapsed:0.4f} SECONDS ON '
+          f'{report.worker_count} WORKERS')
+    if data['step_time_average'] is not None:
+        print(f'Average single step took {data["step_time_average"]:0.4f} '
+              f'seconds')
+    scene_time_list = [result.elapsed for result in report.results]
+    if scene_time_list:
+        print(f'Average single scene took '
+              f'{statistics.mean(scene_time_list):0.4f} seconds')
+
+
 def main():
     args = parse_args()
     file_list = sorted(
@@ -61,6 +101,10 @@ def main():
         ]
     )
 
+    if args.workers > 1:
+        run_parallel(args, file_list)
+        return
+
     print(
         f'FOUND {len(file_list)} SCENE CONFIGURATION FILES... '
         f'STARTING THE MCS UNITY APP...')
@@ -75,6 +119,7 @@ def main():
     step_time_max_list = []
     step_time_min_list = []
     step_time_sum_list = []
+    report = PoolReport(worker_count=1)
 
     for i in range(len(file_list)):
         print('========================================================='
@@ -90,6 +135,19 @@ def main():
         step_time_max_list.append(max(step_time_list))
         step_time_min_list.append(min(step_time_list))
         step_time_sum_list.append(sum(step_time_list))
+        report.results.append(SceneResult(
+            scene_file=os.path.abspath(file_list[i]),
+            success=True,
+            worker_id=0,
+            attempts=1,
+            elapsed=end - start,
+            step_count=len(step_time_list),
+            step_times=step_time_list
+        ))
+
+    report.elapsed = sum(scene_time_list)
+    if args.report:
+        report.write(args.report)
 
     print('===================================================='
           '============================')
@@ -1,12 +1,16 @@
+import functools
 import io
+import zlib
 from abc import ABCMeta, abstractmethod
+from typing import Optional, Tuple
 
 import msgpack
 import numpy as np
 import PIL.Image as Image
 
+from .frame_list import FrameList
 from .goal_metadata import GoalMetadata
-from .object_metadata import ObjectMetadata
+from .object_metadata import ObjectList, ObjectMetadata
 from .step_metadata import StepMetadata
 
 
@@ -48,6 +52,12 @@ class SerializerMsgPack(ISerializer):
         """Hook to serialize MCS Step Metadata as MsgPack, e.g.
         serialized = msgpack.packb(output, default=ext_pack, strict_types=True)
         """
+        return SerializerMsgPack._pack(x, SerializerMsgPack._ext_pack)
+
+    @staticmethod
+    def _pack(x, ext_pack):
+        """Serialize the given value as MsgPack, using the given hook for any
+        nested values."""
         if isinstance(x, StepMetadata):
             # TODO In future can investigate reflection for automating field
             # extraction, but notice that strict types flag is highly
@@ -64,19 +74,19 @@ class SerializerMsgPack(ISerializer):
                     x.position, x.return_status, x.reward, x.rotation,
                     x.step_number, x.structural_object_list
                 ],
-                    default=SerializerMsgPack._ext_pack,
+                    default=ext_pack,
                     strict_types=True))
         elif isinstance(x, tuple):
             return msgpack.ExtType(
                 2,
                 msgpack.packb([x[0], x[1]],
-                              default=SerializerMsgPack._ext_pack,
+                              default=ext_pack,
                               strict_types=True))
         elif isinstance(x, Image.Image):
             return msgpack.ExtType(
                 3,
                 msgpack.packb(SerializerMsgPack.image_to_bytes(x),
-                              default=SerializerMsgPack._ext_pack,
+                              default=ext_pack,
                               strict_types=True))
         elif isinstance(x, GoalMetadata):
             return msgpack.ExtType(
@@ -86,7 +96,7 @@ class SerializerMsgPack(ISerializer):
                     x.habituation_total, x.last_preview_phase_step,
                     x.last_step, x.metadata
                 ],
-                    default=SerializerMsgPack._ext_pack,
+                    default=ext_pack,
                     strict_types=True))
         elif isinstance(x, ObjectMetadata):
             return msgpack.ExtType(
@@ -97,14 +107,17 @@ class SerializerMsgPack(ISerializer):
                     x.material_list, x.position, x.rotation, x.segment_color,
                     x.shape, x.state_list, x.texture_color_list, x.visible
                 ],
-                    default=SerializerMsgPack._ext_pack,
+                    default=ext_pack,
                     strict_types=True))
         elif isinstance(x, np.ndarray):
             return msgpack.ExtType(
                 6,
                 msgpack.packb(x.tolist(),
-                              default=SerializerMsgPack._ext_pack,
+                              default=ext_pack,
                               strict_types=True))
+        elif isinstance(x, (FrameList, ObjectList)):
+            # Serialize the converted frames (or objects) as a normal list.
+            return list(x)
         return x
 
     @staticmethod
@@ -113,13 +126,20 @@ class SerializerMsgPack(ISerializer):
         Hook to deserialize MCS Step Metadata from MsgPack, e.g.
         deserialized = msgpack.unpackb(packed_bytes, ext_hook=ext_unpack)
         """
+        return SerializerMsgPack._unpack(
+            code, data, SerializerMsgPack._ext_unpack)
+
+    @staticmethod
+    def _unpack(code, data, ext_unpack):
+        """Deserialize the given MsgPack extension type, using the given hook
+        for any nested extension types."""
         if code == 1:
             action_list, camera_aspect_ratio, camera_clipping_planes, \
                 camera_field_of_view, camera_height, depth_map_list, goal, \
                 head_tilt, image_list, object_list, object_mask_list, \
                 position, return_status, reward, rotation, step_number, \
                 structural_object_list = \
-                msgpack.unpackb(data, ext_hook=SerializerMsgPack._ext_unpack)
+                msgpack.unpackb(data, ext_hook=ext_unpack)
             return StepMetadata(action_list=action_list,
                                 camera_aspect_ratio=camera_aspect_ratio,
                                 camera_clipping_planes=camera_clipping_planes,
@@ -138,16 +158,15 @@ class SerializerMsgPack(ISerializer):
                                 step_number=step_number,
                                 structural_object_list=structural_object_list)
         elif code == 2:
-            x0, x1 = msgpack.unpackb(data,
-                                     ext_hook=SerializerMsgPack._ext_unpack)
+            x0, x1 = msgpack.unpackb(data, ext_hook=ext_unpack)
             return x0, x1
         elif code == 3:
-            x = msgpack.unpackb(data, ext_hook=SerializerMsgPack._ext_unpack)
+            x = msgpack.unpackb(data, ext_hook=ext_unpack)
             return SerializerMsgPack.bytes_to_image(x)
         elif code == 4:
             action_list, category, description, habituation_total, \
                 last_preview_phase_step, last_step, metadata = \
-                msgpack.unpackb(data, ext_hook=SerializerMsgPack._ext_unpack)
+                msgpack.unpackb(data, ext_hook=ext_unpack)
             return GoalMetadata(action_list, category, description,
                                 habituation_total, last_preview_phase_step,
                                 last_step, metadata)
@@ -156,14 +175,14 @@ class SerializerMsgPack(ISerializer):
                 distance_in_world, held, mass, material_list, position, \
                 rotation, segment_color, shape, state_list, \
                 texture_color_list, visible = msgpack.unpackb(
-                    data, ext_hook=SerializerMsgPack._ext_unpack)
+                    data, ext_hook=ext_unpack)
             return ObjectMetadata(uuid, dimensions, direction, distance,
                                   distance_in_steps, distance_in_world, held,
                                   mass, material_list, position, rotation,
                                   segment_color, shape, state_list,
                                   texture_color_list, visible)
         elif code == 6:
-            x = msgpack.unpackb(data, ext_hook=SerializerMsgPack._ext_unpack)
+            x = msgpack.unpackb(data, ext_hook=ext_unpack)
             return np.asarray(x)
         return msgpack.ExtType(code, data)
 
@@ -196,3 +215,151 @@ class SerializerMsgPack(ISerializer):
     def deserialize(packed_step_metadata):
         return msgpack.unpackb(packed_step_metadata,
                                ext_hook=SerializerMsgPack._ext_unpack)
+
+
+@functools.lru_cache(maxsize=None)
+def _get_compressor(compression: Optional[str]):
+    """Return the (compress, decompress) functions for the given compression
+    name, cached for reuse by every serializer.  zstd and lz4 need their
+    optional packages (zstandard and lz4)."""
+    if compression is None:
+        return None
+    if compression == 'zlib':
+        # The fastest level, since throughput matters more than size here.
+        return functools.partial(zlib.compress, level=1), zlib.decompress
+    if compression == 'zstd':
+        try:
+            import zstandard
+        except ImportError as err:
+            raise ValueError(
+                'zstd compression needs the zstandard package') from err
+        # Zstd (de)compressors can't be shared between threads.
+        return (
+            lambda data: zstandard.ZstdCompressor().compress(data),
+            lambda data: zstandard.ZstdDecompressor().decompress(data)
+        )
+    if compression == 'lz4':
+        try:
+            import lz4.frame
+        except ImportError as err:
+            raise ValueError('lz4 compression needs the lz4 package') from err
+        return lz4.frame.compress, lz4.frame.decompress
+    raise ValueError(f'Unsupported compression: {compression}')
+
+
+class SerializerMsgPackBinary(SerializerMsgPack):
+    """
+    Serializer to (de)serialize StepMetadata into/from MsgPack format, like
+    SerializerMsgPack, but much faster and smaller for images and numpy
+    arrays (like depth maps): they're stored as their raw pixel or array
+    buffers (with their mode or dtype and shape), rather than as PNGs and
+    nested lists.  Deserialized arrays and images are built directly on the
+    unpacked buffers with np.frombuffer and PIL.Image.frombuffer without
+    copying them, so deserialized arrays are read-only.
+
+    Can also deserialize the output of SerializerMsgPack (version 0.1.0),
+    but SerializerMsgPack can't deserialize this serializer's output.
+    """
+
+    COMPRESSION_MIN_BYTES = 1024
+
+    @classmethod
+    def version(cls):
+        return "0.2.0"
+
+    @staticmethod
+    def _pack_buffer(buffer: memoryview, compression: Optional[str]) -> Tuple:
+        if (
+            compression is not None and
+            buffer.nbytes >= SerializerMsgPackBinary.COMPRESSION_MIN_BYTES
+        ):
+            return compression, _get_compressor(compression)[0](buffer)
+        return None, buffer
+
+    @staticmethod
+    def _unpack_buffer(compression: Optional[str], data: bytes):
+        if compression is None:
+            return data
+        return _get_compressor(compression)[1](data)
+
+    @staticmethod
+    def _ext_pack(x, compression: Optional[str] = None):
+        """Hook to serialize MCS Step Metadata as MsgPack"""
+        if isinstance(x, np.ndarray) and x.dtype.kind in 'biufc':
+            x = np.ascontiguousarray(x)
+            compression, buffer = SerializerMsgPackBinary._pack_buffer(
+                memoryview(x).cast('B'), compression)
+            return msgpack.ExtType(7, msgpack.packb(
+                [x.dtype.str, list(x.shape), compression, buffer],
+                strict_types=True))
+        if isinstance(x, Image.Image):
+            compression, buffer = SerializerMsgPackBinary._pack_buffer(
+                memoryview(x.tobytes()), compression)
+            return msgpack.ExtType(8, msgpack.packb(
+                [x.mode, list(x.size), compression, buffer],
+                strict_types=True))
+        return SerializerMsgPack._pack(
+            x, SerializerMsgPackBinary._get_ext_pack(compression))
+
+    @staticmethod
+    def _get_ext_pack(compression: Optional[str]):
+        if compression is None:
+            return SerializerMsgPackBinary._ext_pack
+        return functools.partial(
+            SerializerMsgPackBinary._ext_pack, compression=compression)
+
+    @staticmethod
+    def _ext_unpack(code, data):
+        """Hook to deserialize MCS Step Metadata from MsgPack"""
+        if code == 7:
+            dtype, shape, compression, buffer = msgpack.unpackb(data)
+            return np.frombuffer(
+                SerializerMsgPackBinary._unpack_buffer(compression, buffer),
+                dtype=np.dtype(dtype)
+            ).reshape(shape)
+        if code == 8:
+            mode, size, compression, buffer = msgpack.unpackb(data)
+            return Image.frombuffer(
+                mode,
+                tuple(size),
+                SerializerMsgPackBinary._unpack_buffer(compression, buffer),
+                'raw',
+                mode,
+                0,
+                1
+            )
+        return SerializerMsgPack._unpack(
+            code, data, SerializerMsgPackBinary._ext_unpack)
+
+    @staticmethod
+    def serialize(
+        step_metadata: StepMetadata,
+        compression: Optional[str] = None
+    ):
+        """
+        Serializes step metadata into MsgPack.  See
+        SerializerMsgPack.serialize.
+
+        Args:
+            step_metadata: MCS step metadata output
+            compression: Lossless compression for image and array buffers:
+                "zlib", "zstd" (needs the zstandard package), or "lz4"
+                (needs the lz4 package).  Buffers smaller than
+                COMPRESSION_MIN_BYTES aren't compressed.  Deserializing
+                works with any compression. (default None)
+
+        Returns:
+            Serialized version of step metadata in MsgPack format.
+        """
+        if compression is not None:
+            # Raise any ValueError here, rather than from within msgpack.
+            _get_compressor(compression)
+        return msgpack.packb(
+            step_metadata,
+            default=SerializerMsgPackBinary._get_ext_pack(compression),
+            strict_types=True)
+
+    @staticmethod
+    def deserialize(packed_step_metadata):
+        return msgpack.unpackb(packed_step_metadata,
+                               ext_hook=SerializerMsgPackBinary._ext_unpack)
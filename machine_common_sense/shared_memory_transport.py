@@ -0,0 +1,356 @@
+import pickle
+import time
+from typing import List, Optional, Tuple
+
+import numpy as np
+
+from .frame_list import FrameList, frame_to_image, get_frame_arrays
+from .step_metadata import StepMetadata
+
+try:
+    from multiprocessing import resource_tracker, shared_memory
+except ImportError as error:
+    # Before python 3.8
+    raise ImportError(
+        'The shared memory transport requires python 3.8 or newer'
+    ) from error
+
+# The frame lists published as raw buffers, and whether each is converted
+# into images when accessed.
+FRAME_FIELDS = (
+    ('image_list', True),
+    ('depth_map_list', False),
+    ('object_mask_list', True)
+)
+
+# Shared memory layout: a control block of uint64 counters, followed by the
+# ring of slots.  Each slot is a header (its sequence number plus one, so
+# an unwritten slot never matches, and the length of its pickled step
+# metadata and frame layout) followed by the pickled metadata and each
+# frame's raw buffer.
+#
+# Python has no memory barriers, so this relies on stores becoming visible
+# to other processes in the order they're made, as on x86 (and, in
+# practice, on the counter and header being written well after the slot's
+# data).  On weakly ordered CPUs (like ARM), the consumer could see a new
+# write index before the slot's header, so it also waits for the header's
+# sequence number to match; but it could still, rarely, read frame data
+# that isn't fully visible yet.
+_MAGIC = 0x4D43535348524D31  # "MCSSHRM1"
+_CONTROL_SIZE = 64
+_MAGIC_INDEX = 0
+_SLOT_COUNT_INDEX = 1
+_SLOT_SIZE_INDEX = 2
+# The number of steps published, and the number released by the consumer.
+_WRITE_INDEX = 3
+_READ_INDEX = 4
+_CLOSED_INDEX = 5
+_SLOT_HEADER_SIZE = 16
+_ALIGNMENT = 64
+
+
+def _align(offset: int) -> int:
+    return (offset + _ALIGNMENT - 1) // _ALIGNMENT * _ALIGNMENT
+
+
+def _attach(name: str) -> shared_memory.SharedMemory:
+    '''Attach to existing shared memory without registering it with this
+    process's resource tracker, which would otherwise destroy it when this
+    process exits, even though the publisher still owns it.'''
+    try:
+        return shared_memory.SharedMemory(name=name, track=False)
+    except TypeError:
+        # Before python 3.13
+        memory = shared_memory.SharedMemory(name=name)
+        resource_tracker.unregister(memory._name, 'shared_memory')
+        return memory
+
+
+class _SharedMemoryRing():
+
+    def __init__(self, memory: shared_memory.SharedMemory):
+        self._memory = memory
+        self._control = np.ndarray(
+            (_CONTROL_SIZE // 8,), dtype=np.uint64, buffer=memory.buf)
+
+    @property
+    def name(self) -> str:
+        '''The name of the shared memory.'''
+        return self._memory.name
+
+    def _get(self, index: int) -> int:
+        return int(self._control[index])
+
+    def _set(self, index: int, value: int) -> None:
+        self._control[index] = value
+
+    def _wait(
+        self,
+        condition,
+        timeout: Optional[float],
+        poll_interval: float
+    ) -> bool:
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while not condition():
+            if deadline is not None and time.monotonic() >= deadline:
+                return False
+            time.sleep(poll_interval)
+        return True
+
+    def _slot_offset(self, sequence: int) -> int:
+        slot_count = self._get(_SLOT_COUNT_INDEX)
+        slot_size = self._get(_SLOT_SIZE_INDEX)
+        return _CONTROL_SIZE + (sequence % slot_count) * slot_size
+
+
+class SharedMemoryStepPublisher(_SharedMemoryRing):
+    '''
+    Publishes StepMetadata to a SharedMemoryStepConsumer in another process
+    through a ring buffer of slots in shared memory, rather than through
+    files or pipes.  Each step's images, depth maps, and object masks are
+    copied once, as raw buffers, into the next free slot, along with the
+    rest of its metadata (pickled, without its frames).
+
+    The consumer releases each slot when it receives the next step, and
+    publishing waits while every slot holds a step the consumer hasn't
+    released yet, so the publisher runs at most slot_count steps ahead of
+    the consumer.  Only one consumer is supported.  The ring relies on x86
+    memory ordering; on weakly ordered CPUs (like ARM), a consumer could
+    rarely read a step's frames before they're fully written.
+
+    Parameters
+    ----------
+    name : str, optional
+        The name of the shared memory, which the consumer needs. (default a
+        random name; see the name property)
+    slot_count : int, optional
+        The number of slots in the ring. (default 4)
+    slot_size : int, optional
+        The size of each slot in bytes, which must fit each step's frames
+        and metadata. (default 8 MiB, enough for a 600x400 step)
+    poll_interval : float, optional
+        Seconds between checks for a free slot. (default 0.0005)
+    '''
+
+    SLOT_COUNT_DEFAULT = 4
+    SLOT_SIZE_DEFAULT = 8 * 1024 * 1024
+    POLL_INTERVAL_DEFAULT = 0.0005
+
+    def __init__(
+        self,
+        name: Optional[str] = None,
+        slot_count: int = SLOT_COUNT_DEFAULT,
+        slot_size: int = SLOT_SIZE_DEFAULT,
+        poll_interval: float = POLL_INTERVAL_DEFAULT
+    ):
+        if slot_count < 1:
+            raise ValueError('slot_count must be at least 1')
+        slot_size = _align(slot_size)
+        super().__init__(shared_memory.SharedMemory(
+            name=name,
+            create=True,
+            size=_CONTROL_SIZE + slot_count * slot_size
+        ))
+        self._poll_interval = poll_interval
+        self._set(_SLOT_COUNT_INDEX, slot_count)
+        self._set(_SLOT_SIZE_INDEX, slot_size)
+        self._set(_WRITE_INDEX, 0)
+        self._set(_READ_INDEX, 0)
+        self._set(_CLOSED_INDEX, 0)
+        self._set(_MAGIC_INDEX, _MAGIC)
+
+    def publish(
+        self,
+        step_metadata: StepMetadata,
+        timeout: Optional[float] = None
+    ) -> int:
+        '''
+        Publish the given StepMetadata in the next free slot, waiting for one
+        if needed.  Returns the step's sequence number (the number of steps
+        published before it).  Raises a TimeoutError if no slot is freed
+        within the given timeout (in seconds; by default, wait forever), or
+        a ValueError if the step doesn't fit in a slot.
+        '''
+        sequence = self._get(_WRITE_INDEX)
+        slot_count = self._get(_SLOT_COUNT_INDEX)
+        if not self._wait(
+            lambda: sequence - self._get(_READ_INDEX) < slot_count,
+            timeout,
+            self._poll_interval
+        ):
+            raise TimeoutError(
+                'Timed out waiting for the consumer to release a slot')
+
+        frames = []
+        layout: List[Tuple] = []
+        for field, _ in FRAME_FIELDS:
+            for array in get_frame_arrays(getattr(step_metadata, field)):
+                frames.append(array)
+                layout.append((field, array.dtype.str, array.shape))
+        header = pickle.dumps(
+            (step_metadata.copy_without_depth_or_images(), layout),
+            protocol=pickle.HIGHEST_PROTOCOL
+        )
+        slot_size = self._get(_SLOT_SIZE_INDEX)
+        offset = _align(_SLOT_HEADER_SIZE + len(header))
+        offsets = []
+        for array in frames:
+            offsets.append(offset)
+            offset = _align(offset + array.nbytes)
+        if offset > slot_size:
+            raise ValueError(
+                f'Step needs {offset} bytes, but slots are {slot_size} bytes')
+
+        slot = self._slot_offset(sequence)
+        buffer = self._memory.buf
+        buffer[slot + _SLOT_HEADER_SIZE:
+               slot + _SLOT_HEADER_SIZE + len(header)] = header
+        for array, frame_offset in zip(frames, offsets):
+            start = slot + frame_offset
+            np.ndarray(
+                array.shape,
+                dtype=array.dtype,
+                buffer=buffer,
+                offset=start
+            )[...] = array
+        np.ndarray((2,), dtype=np.uint64, buffer=buffer, offset=slot)[:] = (
+            sequence + 1, len(header))
+        # Make the step visible to the consumer only once it's written.
+        self._set(_WRITE_INDEX, sequence + 1)
+        return sequence
+
+    def close(self, unlink: bool = True) -> None:
+        '''Tell the consumer no more steps will be published, then close (and
+        by default, destroy) the shared memory.'''
+        self._set(_CLOSED_INDEX, 1)
+        self._control = None
+        self._memory.close()
+        if unlink:
+            self._memory.unlink()
+
+    def __enter__(self) -> 'SharedMemoryStepPublisher':
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback) -> None:
+        self.close()
+
+
+class SharedMemoryStepConsumer(_SharedMemoryRing):
+    '''
+    Receives StepMetadata published by a SharedMemoryStepPublisher in
+    another process.  The received step's images, depth maps, and object
+    masks are FrameLists of read-only numpy views of the shared memory, not
+    copies: call as_arrays() to use them as numpy arrays, or index them to
+    build PIL images (for images and object masks) as usual.
+
+    Each step's views are only valid until the next call to receive, which
+    releases its slot to the publisher, so copy any frames that must be kept
+    longer.  The views keep the shared memory mapped, so close raises a
+    BufferError while any of them are still referenced.  Only use with
+    trusted publishers, since the step metadata is pickled.
+
+    Parameters
+    ----------
+    name : str
+        The name of the publisher's shared memory.
+    poll_interval : float, optional
+        Seconds between checks for a new step. (default 0.0005)
+    '''
+
+    def __init__(
+        self,
+        name: str,
+        poll_interval: float = SharedMemoryStepPublisher.POLL_INTERVAL_DEFAULT
+    ):
+        super().__init__(_attach(name))
+        if self._get(_MAGIC_INDEX) != _MAGIC:
+            self._memory.close()
+            raise ValueError(
+                f'Shared memory {name} is not from a step publisher')
+        self._poll_interval = poll_interval
+        self._sequence = self._get(_READ_INDEX)
+        self._holding = False
+
+    def release(self) -> None:
+        '''Release the latest received step's slot to the publisher.  Its
+        frame views must not be used after this.'''
+        if self._holding:
+            self._holding = False
+            self._sequence += 1
+            self._set(_READ_INDEX, self._sequence)
+
+    def receive(self, timeout: Optional[float] = None) -> StepMetadata:
+        '''
+        Release the previous step, then return the next published step,
+        waiting for one if needed.  Returns None if the publisher has closed
+        and every step has been received, or raises a TimeoutError if no
+        step is published within the given timeout (in seconds; by default,
+        wait forever).
+        '''
+        self.release()
+        sequence = self._sequence
+        if not self._wait(
+            lambda: (
+                self._get(_WRITE_INDEX) > sequence or
+                self._get(_CLOSED_INDEX)
+            ),
+            timeout,
+            self._poll_interval
+        ):
+            raise TimeoutError('Timed out waiting for a step')
+        if self._get(_WRITE_INDEX) <= sequence:
+            return None
+
+        slot = self._slot_offset(sequence)
+        buffer = self._memory.buf
+        slot_header = np.ndarray(
+            (2,), dtype=np.uint64, buffer=buffer, offset=slot)
+        # Re-check the slot's own sequence number, in case its header isn't
+        # visible yet (see the memory ordering note above).
+        if not self._wait(
+            lambda: int(slot_header[0]) == sequence + 1,
+            timeout,
+            self._poll_interval
+        ):
+            raise TimeoutError('Timed out waiting for a step')
+        header_size = int(slot_header[1])
+        start = slot + _SLOT_HEADER_SIZE
+        step_metadata, layout = pickle.loads(
+            buffer[start:start + header_size])
+        frames = {field: [] for field, _ in FRAME_FIELDS}
+        offset = _align(_SLOT_HEADER_SIZE + header_size)
+        for field, dtype, shape in layout:
+            # Unlike np.ndarray(buffer=...), np.frombuffer keeps the buffer
+            # exported, so the memory can't be unmapped under the view.
+            dtype = np.dtype(dtype)
+            view = np.frombuffer(
+                buffer, dtype=dtype, count=int(np.prod(shape)),
+                offset=slot + offset).reshape(shape)
+            view.flags.writeable = False
+            frames[field].append(view)
+            offset = _align(offset + view.nbytes)
+        for field, is_image in FRAME_FIELDS:
+            setattr(step_metadata, field, FrameList(
+                frames[field], frame_to_image if is_image else None))
+        self._holding = True
+        return step_metadata
+
+    def close(self) -> None:
+        '''Release the latest received step, and close the shared memory.
+        Raises a BufferError if any received frames are still referenced;
+        delete (or copy) them first.'''
+        self.release()
+        self._control = None
+        try:
+            self._memory.close()
+        except BufferError as error:
+            raise BufferError(
+                'Received frames are still referenced, so the shared memory '
+                'cannot be closed; delete them first'
+            ) from error
+
+    def __enter__(self) -> 'SharedMemoryStepConsumer':
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback) -> None:
+        self.close()
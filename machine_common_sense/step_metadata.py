@@ -1,6 +1,5 @@
-import copy
-
 from .goal_metadata import GoalMetadata
+from .object_metadata import ObjectList
 from .return_status import ReturnStatus
 from .stringifier import Stringifier
 
@@ -50,12 +49,13 @@ class StepMetadata:
         the whole scene.
     camera_height : float
         The player camera's height, in meters.
-    depth_map_list : list of 2D numpy arrays
+    depth_map_list : FrameList of 2D numpy arrays
         The list of 2-dimensional numpy arrays of depth float data from the
         scene after the last action and physics simulation were run. This is
         usually a list with 1 array, except for the output from start_scene
         for a scene with a scripted Preview Phase (Preview Phase case details
-        TBD).
+        TBD). Like image_list, it's a read-only FrameList, not a list.
+        Each depth map is only computed when it is first accessed.
         Each 32-bit depth float in the 2-dimensional numpy array is a value
         between the camera's near clipping plane (default 0.01) and the
         camera's far clipping plane (default 150) corresponding to the depth,
@@ -77,27 +77,37 @@ class StepMetadata:
     holes : list of tuples
         Coordinates of holes as (X, Z) float tuples. Will be set to 'None' if
         using a metadata level below the 'oracle' level.
-    image_list : list of Pillow.Image objects
+    image_list : FrameList of Pillow.Image objects
         The list of images from the scene after the last action and physics
         simulation were run. This is usually a list with 1 image, except for
         the output from start_scene for a scene with a scripted Preview Phase.
         (Preview Phase case details TBD).
+        It's a read-only :mod:`FrameList <machine_common_sense.FrameList>`,
+        not a list, so it can't be changed in place; call `list(image_list)`
+        for a list.
+        Each image is only created when it is first accessed. To get the
+        images as read-only RGB numpy arrays instead, without creating any
+        Pillow.Image objects, call `image_list.as_arrays()`.
     lava : list of tuples
         Coordinates of pools of lava as (X1, Z1, X2, Z2) float tuples, where
         X1/Z1 is the top-left corner and X2/Z2 is the bottom-right conrer. Will
         be set to 'None' if using a metadata level below the 'oracle' level.
-    object_list : list of ObjectMetadata objects
+    object_list : ObjectList of ObjectMetadata objects
         The list of metadata for all the visible interactive objects in the
         scene. This list will be empty if using a metadata level below
         the 'oracle' level. For metadata on structural objects like walls,
-        please see structural_object_list
-    object_mask_list : list of Pillow.Image objects
+        please see structural_object_list. See :mod:`ObjectList
+        <machine_common_sense.ObjectList>` for its vectorized queries.
+    object_mask_list : FrameList of Pillow.Image objects
         The list of object mask (instance segmentation) images from the scene
         after the last action and physics simulation were run. This is usually
         a list with 1 image, except for the output from start_scene for a
         scene with a scripted Preview Phase (Preview Phase case details TBD).
         The color of each object in the mask corresponds to the "color"
         property in its ObjectMetadata object.
+        Like image_list, it's a read-only FrameList, and you can call
+        `object_mask_list.as_arrays()` to get the masks as read-only numpy
+        arrays instead.
         Note that this list will be empty if the metadata level is 'none'
         or 'level1'.
     performer_radius: float
@@ -143,7 +153,7 @@ class StepMetadata:
         current scene.
     steps_in_lava : integer
         The number of steps the agent has touched lava
-    structural_object_list : list of ObjectMetadata objects
+    structural_object_list : ObjectList of ObjectMetadata objects
         The list of metadata for all the visible structural objects (like
         walls, occluders, and ramps) in the scene. This list will be empty
         if using a metadata level below the 'oracle' level.
@@ -211,7 +221,10 @@ class StepMetadata:
         self.holes = [] if holes is None else holes
         self.image_list = [] if image_list is None else image_list
         self.lava = [] if lava is None else lava
-        self.object_list = [] if object_list is None else object_list
+        self.object_list = (
+            object_list if isinstance(object_list, ObjectList)
+            else ObjectList(object_list or [])
+        )
         self.object_mask_list = (
             [] if object_mask_list is None else object_mask_list
         )
@@ -232,10 +245,29 @@ class StepMetadata:
         )
         self.step_number = step_number
         self.steps_on_lava = steps_on_lava
-        self.structural_object_list = [
-        ] if structural_object_list is None else structural_object_list
+        self.structural_object_list = (
+            structural_object_list
+            if isinstance(structural_object_list, ObjectList)
+            else ObjectList(structural_object_list or [])
+        )
         self.triggered_by_sequence_incorrect = triggered_by_sequence_incorrect
 
+    # The frame properties, which are left out of __iter__ and
+    # copy_without_depth_or_images.
+    FRAME_PROPERTIES = ('depth_map_list', 'image_list', 'object_mask_list')
+
+    # The properties in __iter__ and copy_without_depth_or_images.
+    COPIED_PROPERTIES = (
+        'action_list', 'camera_aspect_ratio', 'camera_clipping_planes',
+        'camera_field_of_view', 'camera_height', 'goal', 'habituation_trial',
+        'haptic_feedback', 'head_tilt', 'holes', 'lava', 'object_list',
+        'performer_radius', 'performer_reach', 'physics_frames_per_second',
+        'position', 'resolved_object', 'resolved_receptacle', 'return_status',
+        'room_dimensions', 'reward', 'rotation', 'segmentation_colors',
+        'step_number', 'steps_on_lava', 'structural_object_list',
+        'triggered_by_sequence_incorrect'
+    )
+
     def __str__(self):
         return Stringifier.class_to_str(self)
 
@@ -246,46 +278,45 @@ class StepMetadata:
             return {obj.uuid: dict(obj) for obj in obj_list}
 
     def copy_without_depth_or_images(self):
-        """Return a deep copy of this StepMetadata with default depth_map_list,
-        image_list, and object_mask_list properties."""
+        """Return a copy of this StepMetadata with default depth_map_list,
+        image_list, and object_mask_list properties.  The copy's lists and
+        dicts (and its goal, see GoalMetadata.copy) are new, so setting or
+        removing their items won't change this StepMetadata, but the items
+        themselves (like each ObjectMetadata) are shared, so they must not be
+        changed."""
         step_metadata_copy = StepMetadata()
-        # This class's __iter__ function will ignore specific properties.
-        for key, _ in self:
-            setattr(step_metadata_copy, key, copy.deepcopy(getattr(self, key)))
+        for key in self.COPIED_PROPERTIES:
+            value = getattr(self, key)
+            if key == 'goal':
+                value = value.copy()
+            elif isinstance(value, list):
+                # Keep the list type (like ObjectList).
+                value = type(value)(value)
+            elif isinstance(value, dict):
+                value = dict(value)
+            setattr(step_metadata_copy, key, value)
+        return step_metadata_copy
+
+    def copy(self):
+        """Return a copy of this StepMetadata like
+        copy_without_depth_or_images, but with this StepMetadata's
+        depth_map_list, image_list, and object_mask_list.  Plain lists of
+        frames are copied, but read-only FrameLists are shared."""
+        step_metadata_copy = self.copy_without_depth_or_images()
+        for key in self.FRAME_PROPERTIES:
+            value = getattr(self, key)
+            if type(value) is list:
+                value = list(value)
+            setattr(step_metadata_copy, key, value)
         return step_metadata_copy
 
     # Allows converting the class to a dictionary, along with allowing
     #   certain fields to be left out of output file
     def __iter__(self):
-        yield 'action_list', self.action_list
-        yield 'camera_aspect_ratio', self.camera_aspect_ratio
-        yield 'camera_clipping_planes', self.camera_clipping_planes
-        yield 'camera_field_of_view', self.camera_field_of_view
-        yield 'camera_height', self.camera_height
-        # Intentionally no depth_map_list
-        yield 'goal', dict(self.goal)
-        yield 'habituation_trial', self.habituation_trial
-        yield 'haptic_feedback', self.haptic_feedback
-        yield 'head_tilt', self.head_tilt
-        yield 'holes', self.head_tilt
-        # Intentionally no image_list
-        yield 'lava', self.head_tilt
-        yield 'object_list', self.check_list_none(self.object_list)
-        # Intentionally no object_mask_list
-        yield 'performer_radius', self.performer_radius
-        yield 'performer_reach', self.performer_reach
-        yield 'physics_frames_per_second', self.physics_frames_per_second
-        yield 'position', self.position
-        yield 'resolved_object', self.resolved_object
-        yield 'resolved_receptacle', self.resolved_receptacle
-        yield 'return_status', self.return_status
-        yield 'room_dimensions', self.room_dimensions
-        yield 'reward', self.reward
-        yield 'rotation', self.rotation
-        yield 'segmentation_colors', self.segmentation_colors
-        yield 'step_number', self.step_number
-        yield 'steps_on_lava', self.steps_on_lava
-        yield 'structural_object_list', self.check_list_none(
-            self.structural_object_list)
-        yield 'triggered_by_sequence_incorrect', \
-            self.triggered_by_sequence_incorrect
+        for key in self.COPIED_PROPERTIES:
+            value = getattr(self, key)
+            if key == 'goal':
+                value = dict(value)
+            elif key in ('object_list', 'structural_object_list'):
+                value = self.check_list_none(value)
+            yield key, value
@@ -15,6 +15,17 @@ class Stringifier:
     NUMBER_OF_DECIMALS = 6
     NUMBER_OF_SPACES = 4
 
+    @staticmethod
+    def _properties(input_class) -> dict:
+        if hasattr(input_class, '__dict__'):
+            return vars(input_class)
+        # Classes with __slots__ (like ObjectMetadata) have no __dict__.
+        return {
+            slot: getattr(input_class, slot)
+            for slot in type(input_class).__slots__
+            if hasattr(input_class, slot)
+        }
+
     @staticmethod
     def class_to_str(input_class, depth=0):
         """
@@ -35,7 +46,8 @@ class Stringifier:
         next_indent = " " * Stringifier.NUMBER_OF_SPACES * (depth + 1)
         props = {
             prop_key: prop_value
-            for prop_key, prop_value in vars(input_class).items()
+            for prop_key, prop_value in Stringifier._properties(
+                input_class).items()
             if not prop_key.startswith('_') or callable(prop_value)
         }
         text_list = [next_indent +
@@ -1,11 +1,18 @@
+import concurrent.futures
+import contextlib
 import datetime
 import glob
+import hashlib
 import logging
+import os
 import platform
 import shutil
 import tarfile
 from abc import ABC, abstractmethod
 from pathlib import Path
+from typing import List, Optional
+from urllib.parse import urlparse
+from urllib.request import url2pathname
 from zipfile import ZipFile
 
 import requests
@@ -27,6 +34,10 @@ PLATFORM_LINUX = "Linux"
 PLATFORM_OTHER = "other"
 PLATFORM_WINDOWS64 = "Windows"
 
+# Base URL, file:// URL, or local directory to download the Unity release
+# zips from instead of the release URLs, like for offline installs.
+MIRROR_ENV_VAR = "MCS_UNITY_DOWNLOAD_MIRROR"
+
 
 class UnityExecutableProvider():
     '''Automatically provides MCS AI2-THOR Unity executable for the MCS
@@ -34,8 +45,9 @@ class UnityExecutableProvider():
 
     DOWNLOAD_FILE = "MCS-AI2-THOR-Unity-App-v{}.zip"
 
-    def __init__(self):
-        self._downloader = Downloader()
+    def __init__(self, mirror: str = None):
+        self._downloader = Downloader(
+            mirror or os.environ.get(MIRROR_ENV_VAR))
         self._platform_init()
 
     def _platform_init(self):
@@ -106,6 +118,7 @@ class AbstractExecutionCache(ABC):
     cache for MCS Unity executables.  '''
     CACHE_LOCATION = Path.home() / ".mcs/"
     TIMESTAMP_FILE = ".timestamp"
+    EXTRACT_WORKERS = min(8, os.cpu_count() or 1)
 
     def __init__(self):
         cache_base = self.CACHE_LOCATION.expanduser()
@@ -154,28 +167,75 @@ class AbstractExecutionCache(ABC):
 
     def add_zip_to_cache(self, version, zip_file: Path):
         ver_dir = self._get_version_dir(version)
-        zip = ZipFile(zip_file)
         logger.info(
             f"Unzipping {zip_file.name} to {ver_dir.as_posix()}")
-        zip.extractall(ver_dir)
-        logger.info(f"Deleting {zip_file.name}.")
-        if platform.system() in [PLATFORM_LINUX, PLATFORM_MAC]:
-            zip_file.unlink()
-        ver_dir = self._get_version_dir(version)
-        file = self._get_executable_file().format(version=version)
-        if platform.system() in [PLATFORM_LINUX, PLATFORM_MAC]:
-            (ver_dir / file).chmod(755)
-
-        for file in self._get_gz_files():
-            file = file.format(version=version)
-            gz = ver_dir / file
-            logger.info(
-                f"Unzipping {gz.name} to {ver_dir.as_posix()}.")
-            self._unzip_tar_gz(gz, ver_dir)
-            logger.info(f"Deleting {gz.name}.")
-            gz.unlink()
+        with concurrent.futures.ThreadPoolExecutor(
+            max_workers=self.EXTRACT_WORKERS
+        ) as executor:
+            self._unzip(zip_file, ver_dir, executor)
+            logger.info(f"Deleting {zip_file.name}.")
+            if platform.system() in [PLATFORM_LINUX, PLATFORM_MAC]:
+                zip_file.unlink()
+            ver_dir = self._get_version_dir(version)
+            file = self._get_executable_file().format(version=version)
+            if platform.system() in [PLATFORM_LINUX, PLATFORM_MAC]:
+                (ver_dir / file).chmod(755)
+
+            gz_files = [
+                ver_dir / file.format(version=version)
+                for file in self._get_gz_files()
+            ]
+            for future in [
+                executor.submit(self._unzip_and_delete_tar_gz, gz, ver_dir)
+                for gz in gz_files
+            ]:
+                future.result()
         (ver_dir / self.TIMESTAMP_FILE).touch()
 
+    def _unzip(
+        self,
+        zip_file: Path,
+        dest: Path,
+        executor: concurrent.futures.Executor
+    ):
+        '''Extract the given zip file, splitting its members between the
+        executor's workers, each with its own ZipFile.'''
+        with ZipFile(zip_file) as zip:
+            members = zip.infolist()
+        # Make the directories first, so the workers don't race to.  (The
+        # workers still sanitize any unsafe member paths.)
+        for member in members:
+            path = Path(member.filename)
+            if path.is_absolute() or '..' in path.parts:
+                continue
+            path = dest / path
+            (path if member.is_dir() else path.parent).mkdir(
+                parents=True, exist_ok=True)
+        members = [member for member in members if not member.is_dir()]
+        # Largest first, so the workers finish at about the same time.
+        members.sort(key=lambda member: member.file_size, reverse=True)
+        batches = [
+            members[index::self.EXTRACT_WORKERS]
+            for index in range(self.EXTRACT_WORKERS)
+        ]
+        for future in [
+            executor.submit(self._unzip_members, zip_file, batch, dest)
+            for batch in batches if batch
+        ]:
+            future.result()
+
+    def _unzip_members(self, zip_file: Path, members: List, dest: Path):
+        with ZipFile(zip_file) as zip:
+            for member in members:
+                zip.extract(member, dest)
+
+    def _unzip_and_delete_tar_gz(self, gz: Path, dest: Path):
+        logger.info(
+            f"Unzipping {gz.name} to {dest.as_posix()}.")
+        self._unzip_tar_gz(gz, dest)
+        logger.info(f"Deleting {gz.name}.")
+        gz.unlink()
+
     def _unzip_tar_gz(self, tar_gz_file: Path, dest: Path):
         tar = tarfile.open(tar_gz_file.as_posix(), "r:gz")
         tar.extractall(path=dest.as_posix())
@@ -279,9 +339,27 @@ class Windows64ExecutionCache(AbstractExecutionCache):
 
 
 class Downloader():
-    '''Handles downloading MCS AI2THOR package'''
+    '''Handles downloading MCS AI2THOR package, from its release URL or
+    from the given mirror: a base URL, file:// URL, or local directory
+    with the same file names as the releases.'''
+
+    CHUNK_SIZE = 1024 * 1024
+    CHECKSUM_EXTENSION = ".sha256"
+    MAX_ATTEMPTS = 5
+    PART_EXTENSION = ".part"
+    # Seconds to wait to connect, or between bytes received.
+    TIMEOUT = 60
+
+    def __init__(self, mirror: str = None):
+        self._mirror = mirror
 
     def get_url(self, ver):
+        url = self._get_release_url(ver)
+        if self._mirror:
+            return f"{self._mirror.rstrip('/')}/{url.split('/')[-1]}"
+        return url
+
+    def _get_release_url(self, ver):
         sys = platform.system()
         if (sys == "Windows"):
             return WIN64_URL.format(
@@ -295,22 +373,122 @@ class Downloader():
             raise Exception(f"OS '{sys}' not supported")
 
     def download(self, url: str, filename: str,
-                 destination_folder: Path) -> Path:
-        file_data = self._do_download(url)
-        # todo probably change this
+                 destination_folder: Path, checksum: str = None) -> Path:
+        '''Download the file at the given URL (or file:// URL or local path)
+        into the given folder, streaming it to disk.  A partial download
+        left by an earlier interrupted attempt is resumed.  The file is
+        verified against the given SHA-256 checksum or, if none is given,
+        the one in the file at the same URL with a .sha256 extension, if
+        there is one.'''
         file = destination_folder / filename
-        file.write_bytes(file_data)
+        part_file = destination_folder / (filename + self.PART_EXTENSION)
+        if checksum is None:
+            checksum = self.get_checksum(url)
+        for attempt in range(1, self.MAX_ATTEMPTS + 1):
+            try:
+                self._do_download(url, part_file)
+                break
+            except (requests.ConnectionError,
+                    requests.exceptions.ChunkedEncodingError,
+                    requests.Timeout) as e:
+                if attempt == self.MAX_ATTEMPTS:
+                    raise
+                logger.warning(
+                    f"Download of {url} interrupted (attempt {attempt}), "
+                    f"resuming", exc_info=e)
+        if checksum is not None:
+            actual = self._hash_file(part_file)
+            if actual != checksum.lower():
+                part_file.unlink()
+                raise Exception(
+                    f"Checksum mismatch for {url}: expected {checksum}, "
+                    f"got {actual}")
+        part_file.replace(file)
+        # Path.unlink's missing_ok needs python 3.8
+        with contextlib.suppress(FileNotFoundError):
+            self._get_validator_file(part_file).unlink()
         return file
 
-    # TODO should probably change how we download so we can write file
-    # sequentially
-    def _do_download(self, url):
+    def get_checksum(self, url: str) -> Optional[str]:
+        '''Return the SHA-256 checksum in the .sha256 file for the given
+        URL, or None if there isn't one.'''
+        checksum_url = url + self.CHECKSUM_EXTENSION
+        try:
+            local_path = self._get_local_path(checksum_url)
+            if local_path:
+                text = local_path.read_text()
+            else:
+                r = requests.get(checksum_url, timeout=self.TIMEOUT)
+                if r.status_code != 200:
+                    return None
+                text = r.text
+        except (OSError, requests.RequestException):
+            return None
+        # Formatted like sha256sum output: "<checksum>  <file name>"
+        return text.split()[0].lower() if text.strip() else None
+
+    def _get_local_path(self, url: str) -> Optional[Path]:
+        '''Return the local file path for the given file:// URL or path, or
+        None if it's a remote URL.'''
+        parsed = urlparse(url)
+        if parsed.scheme == 'file':
+            return Path(url2pathname(parsed.path))
+        if parsed.scheme in ['http', 'https']:
+            return None
+        return Path(url)
+
+    def _get_validator_file(self, part_file: Path) -> Path:
+        return part_file.with_name(part_file.name + '.validator')
+
+    def _do_download(self, url: str, part_file: Path) -> None:
+        '''Stream the file at the given URL to the given partial download
+        file, resuming from the end of the file if it already exists.'''
         logger.debug(f"Downloading file from {url}")
-        r = requests.get(url, stream=True)
-        r.raise_for_status()
-        size = int(r.headers["Content-Length"].strip())
-        total_bytes = 0
-
+        start = part_file.stat().st_size if part_file.exists() else 0
+        local_path = self._get_local_path(url)
+        if local_path:
+            size = local_path.stat().st_size
+            with open(local_path, 'rb') as source:
+                source.seek(start)
+                self._write_chunks(
+                    url,
+                    iter(lambda: source.read(self.CHUNK_SIZE), b''),
+                    part_file,
+                    start,
+                    size
+                )
+            return
+
+        validator_file = self._get_validator_file(part_file)
+        headers = {}
+        if start and validator_file.exists():
+            # Only resume if the file hasn't changed on the server since.
+            headers['Range'] = f'bytes={start}-'
+            headers['If-Range'] = validator_file.read_text()
+        with requests.get(url, stream=True, headers=headers,
+                          timeout=self.TIMEOUT) as r:
+            if r.status_code == 416:
+                # Already complete, or the file has shrunk; start over.
+                part_file.unlink()
+                return self._do_download(url, part_file)
+            r.raise_for_status()
+            if r.status_code != 206:
+                # The server sent the whole file, so start over.
+                start = 0
+            validator = r.headers.get('ETag') or r.headers.get(
+                'Last-Modified')
+            if validator and start == 0:
+                validator_file.write_text(validator)
+            size = start + int(r.headers["Content-Length"].strip())
+            self._write_chunks(
+                url,
+                r.iter_content(self.CHUNK_SIZE),
+                part_file,
+                start,
+                size
+            )
+
+    def _write_chunks(self, url, chunks, part_file, start, size):
         widgets = [
             url.split("/")[-1],
             ": ",
@@ -321,21 +499,37 @@ class Downloader():
             f" of {str(round(size / 1024 / 1024, 2))[:4]}MB",
         ]
 
-        pbar = ProgressBar(widgets=widgets, maxval=size).start()
-        file_data = []
-        for buf in r.iter_content(1024):
-            if buf:
-                file_data.append(buf)
-                total_bytes += len(buf)
-                pbar.update(total_bytes)
+        total_bytes = start
+        pbar = ProgressBar(widgets=widgets, maxval=max(size, 1)).start()
+        with open(part_file, 'r+b' if start else 'wb') as file:
+            file.seek(start)
+            file.truncate()
+            for buf in chunks:
+                if buf:
+                    file.write(buf)
+                    total_bytes += len(buf)
+                    pbar.update(min(total_bytes, size))
         pbar.finish()
+        if total_bytes != size:
+            raise requests.ConnectionError(
+                f"Downloaded {total_bytes} of {size} bytes from {url}")
 
-        return b"".join(file_data)
+    def _hash_file(self, file: Path) -> str:
+        sha256 = hashlib.sha256()
+        with open(file, 'rb') as f:
+            for buf in iter(lambda: f.read(self.CHUNK_SIZE), b''):
+                sha256.update(buf)
+        return sha256.hexdigest()
 
     def is_updated(self, url, date: datetime.datetime):
         # Default to true?
         try:
             updated = True
+            local_path = self._get_local_path(url)
+            if local_path:
+                updated = datetime.datetime.fromtimestamp(
+                    local_path.stat().st_mtime) > date
+                return updated
             r = requests.get(url, stream=True)
             r.raise_for_status()
             last_mod = r.headers['last-modified']
@@ -0,0 +1,121 @@
+import asyncio
+import threading
+import unittest
+from unittest.mock import MagicMock, patch
+
+import machine_common_sense as mcs
+from machine_common_sense.async_controller import AsyncController
+from machine_common_sense.controller_events import EventType
+
+from .mock_controller import MOCK_VARIABLES, MockControllerAI2THOR
+
+TEST_FILE_NAME = "test async controller"
+
+
+class TestAsyncController(unittest.TestCase):
+
+    def setUp(self):
+        self.controller = MockControllerAI2THOR()
+        self.controller._publish_event = MagicMock()
+        self.async_controller = AsyncController(self.controller)
+
+    def tearDown(self):
+        self.async_controller._executor.shutdown()
+
+    def test_controller(self):
+        self.assertIs(self.async_controller.controller, self.controller)
+
+    def test_start_scene_step_and_end_scene(self):
+        async def run():
+            output = await self.async_controller.start_scene(
+                {'name': TEST_FILE_NAME})
+            self.assertEqual(output.step_number, 0)
+            output = await self.async_controller.step(
+                mcs.Action.MOVE_AHEAD.value)
+            self.assertEqual(output.step_number, 1)
+            self.assertEqual(len(output.image_list),
+                             MOCK_VARIABLES['event_count'])
+            outputs = await self.async_controller.step_many(['Pass', 'Pass'])
+            self.assertEqual(outputs[0].step_number, 3)
+            output = await self.async_controller.step_until(
+                'Pass', lambda output: output.step_number == 5)
+            self.assertEqual(output.step_number, 5)
+            await self.async_controller.end_scene(rating=1, report={})
+
+        asyncio.run(run())
+        self.assertTrue(self.controller._end_scene_called)
+        self.controller._publish_event.assert_called_with(
+            EventType.ON_END_SCENE, unittest.mock.ANY)
+
+    def test_calls_run_off_the_event_loop(self):
+        threads = []
+        self.controller.step = MagicMock(
+            side_effect=lambda *args, **kwargs: threads.append(
+                threading.current_thread()))
+
+        async def run():
+            await self.async_controller.step('Pass')
+            await self.async_controller.step('Pass')
+
+        asyncio.run(run())
+        self.assertEqual(len(threads), 2)
+        self.assertIsNot(threads[0], threading.main_thread())
+        # Every call on one controller is run on the same thread.
+        self.assertIs(threads[0], threads[1])
+
+    def test_multiple_controllers_concurrently(self):
+        # Both controllers must be inside their step calls at the same time
+        # for either call to finish.
+        barrier = threading.Barrier(2, timeout=5)
+        other_controller = MockControllerAI2THOR()
+        other_async_controller = AsyncController(other_controller)
+        self.controller.step = MagicMock(
+            side_effect=lambda *args, **kwargs: barrier.wait())
+        other_controller.step = MagicMock(
+            side_effect=lambda *args, **kwargs: barrier.wait())
+
+        async def run():
+            return await asyncio.gather(
+                self.async_controller.step('Pass'),
+                other_async_controller.step('Pass')
+            )
+
+        try:
+            self.assertEqual(sorted(asyncio.run(run())), [0, 1])
+        finally:
+            other_async_controller._executor.shutdown()
+
+    def test_stop_simulation(self):
+        self.controller.stop_simulation = MagicMock()
+
+        async def run():
+            async with self.async_controller:
+                pass
+
+        asyncio.run(run())
+        self.controller.stop_simulation.assert_called_once_with()
+        with self.assertRaises(RuntimeError):
+            asyncio.run(self.async_controller.step('Pass'))
+
+    def test_create_async_controller(self):
+        controller = MagicMock()
+        with patch('machine_common_sense.create_controller',
+                   return_value=controller) as create_controller:
+            async_controller = asyncio.run(mcs.create_async_controller(
+                config_file_or_dict={}, unity_app_file_path='unity'))
+        self.assertIsInstance(async_controller, AsyncController)
+        self.assertIs(async_controller.controller, controller)
+        create_controller.assert_called_once_with(
+            config_file_or_dict={},
+            unity_app_file_path='unity',
+            unity_cache_version=None
+        )
+        async_controller._executor.shutdown()
+
+        with patch('machine_common_sense.create_controller',
+                   return_value=None):
+            self.assertIsNone(asyncio.run(mcs.create_async_controller()))
+
+
+if __name__ == '__main__':
+    unittest.main()
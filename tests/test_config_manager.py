@@ -1,3 +1,4 @@
+import dataclasses
 import os
 import unittest
 from unittest.mock import DEFAULT, patch
@@ -310,6 +311,17 @@ class TestConfigManager(unittest.TestCase):
 
         self.assertTrue(self.config_mngr.is_history_enabled())
 
+    def test_is_history_streaming_enabled(self):
+        self.assertFalse(self.config_mngr.is_history_streaming_enabled())
+
+        self.config_mngr._config[
+            self.config_mngr.CONFIG_DEFAULT_SECTION
+        ][
+            self.config_mngr.CONFIG_HISTORY_STREAMING
+        ] = 'true'
+
+        self.assertTrue(self.config_mngr.is_history_streaming_enabled())
+
     def test_is_noise_enabled(self):
         self.assertFalse(self.config_mngr.is_noise_enabled())
 
@@ -329,6 +341,111 @@ class TestConfigManager(unittest.TestCase):
 
         self.assertFalse(self.config_mngr.is_noise_enabled())
 
+    def test_is_async_subscribers_enabled(self):
+        self.assertFalse(self.config_mngr.is_async_subscribers_enabled())
+
+        self.config_mngr._config[
+            self.config_mngr.CONFIG_DEFAULT_SECTION
+        ][
+            self.config_mngr.CONFIG_ASYNC_SUBSCRIBERS
+        ] = 'true'
+
+        self.assertTrue(self.config_mngr.is_async_subscribers_enabled())
+
+    def test_get_async_subscriber_queue_size(self):
+        self.assertEqual(
+            self.config_mngr.get_async_subscriber_queue_size(),
+            self.config_mngr.ASYNC_SUBSCRIBER_QUEUE_SIZE_DEFAULT)
+
+        self.config_mngr._config[
+            self.config_mngr.CONFIG_DEFAULT_SECTION
+        ][
+            self.config_mngr.CONFIG_ASYNC_SUBSCRIBER_QUEUE_SIZE
+        ] = '4'
+
+        self.assertEqual(
+            self.config_mngr.get_async_subscriber_queue_size(), 4)
+
+    def test_snapshot(self):
+        config_mngr = ConfigManager(config_file_or_dict={})
+        snapshot = config_mngr.snapshot
+        self.assertIs(config_mngr.snapshot, snapshot)
+        self.assertEqual(snapshot.metadata_tier, MetadataTier.DEFAULT)
+        with self.assertRaises(dataclasses.FrozenInstanceError):
+            snapshot.team = 'test'
+
+        config_mngr.invalidate()
+        self.assertIsNot(config_mngr.snapshot, snapshot)
+        self.assertEqual(config_mngr.snapshot, snapshot)
+
+    def test_malformed_option_only_breaks_its_getter(self):
+        config_mngr = ConfigManager(
+            config_file_or_dict={'metadata': 'bogus', 'team': 'x'})
+        self.assertEqual(config_mngr.get_team(), 'x')
+        self.assertTrue(config_mngr.is_history_enabled())
+        with self.assertRaises(ValueError):
+            config_mngr.get_metadata_tier()
+        with self.assertRaises(ValueError):
+            config_mngr.snapshot
+        # The error isn't cached.
+        config_mngr.set_metadata_tier('oracle')
+        self.assertEqual(
+            config_mngr.get_metadata_tier(), MetadataTier.ORACLE)
+
+    def test_snapshot_invalidated_on_change(self):
+        config_mngr = ConfigManager(config_file_or_dict={})
+        snapshot = config_mngr.snapshot
+
+        config_mngr.set_metadata_tier('oracle')
+        self.assertEqual(
+            config_mngr.get_metadata_tier(), MetadataTier.ORACLE)
+        self.assertEqual(snapshot.metadata_tier, MetadataTier.DEFAULT)
+
+        config_mngr.set_timeout('5')
+        self.assertEqual(config_mngr.get_timeout(), 5)
+
+        config_mngr._config[config_mngr.CONFIG_DEFAULT_SECTION][
+            config_mngr.CONFIG_TEAM] = 'test'
+        self.assertEqual(config_mngr.get_team(), 'test')
+
+        config_mngr._config.remove_option(
+            config_mngr.CONFIG_DEFAULT_SECTION, config_mngr.CONFIG_TEAM)
+        self.assertEqual(config_mngr.get_team(), '')
+
+    def test_get_recorder_max_queue_size(self):
+        self.assertEqual(
+            self.config_mngr.get_recorder_max_queue_size(),
+            self.config_mngr.RECORDER_MAX_QUEUE_SIZE_DEFAULT)
+
+        self.config_mngr._config[
+            self.config_mngr.CONFIG_DEFAULT_SECTION
+        ][
+            self.config_mngr.CONFIG_RECORDER_MAX_QUEUE_SIZE
+        ] = '0'
+
+        self.assertEqual(self.config_mngr.get_recorder_max_queue_size(), 0)
+
+    def test_get_recorder_queue_full_policy(self):
+        self.assertEqual(
+            self.config_mngr.get_recorder_queue_full_policy(), 'block')
+
+        self.config_mngr._config[
+            self.config_mngr.CONFIG_DEFAULT_SECTION
+        ][
+            self.config_mngr.CONFIG_RECORDER_QUEUE_FULL_POLICY
+        ] = 'Drop'
+
+        self.assertEqual(
+            self.config_mngr.get_recorder_queue_full_policy(), 'drop')
+
+        self.config_mngr._config[
+            self.config_mngr.CONFIG_DEFAULT_SECTION
+        ][
+            self.config_mngr.CONFIG_RECORDER_QUEUE_FULL_POLICY
+        ] = 'wait'
+        with self.assertRaisesRegex(ValueError, 'recorder_queue_full_policy'):
+            self.config_mngr.get_recorder_queue_full_policy()
+
     def test_is_video_enabled(self):
         self.assertFalse(self.config_mngr.is_video_enabled())
 
@@ -839,6 +956,35 @@ class TestSceneConfig(unittest.TestCase):
         assert config_7.is_passive_scene()
         assert config_8.is_passive_scene()
 
+    def test_retrieve_object_states(self):
+        scene_config = SceneConfiguration(objects=[
+            SceneObject(id='obj_1', type='ball', states=[
+                ['state_1'], [], ['state_2', 'state_3']]),
+            SceneObject(id='obj_2', type='ball'),
+            SceneObject(id='obj_1', type='cube', states=[['ignored']])
+        ])
+        self.assertEqual(
+            scene_config.retrieve_object_states('obj_1', 0), ['state_1'])
+        self.assertEqual(scene_config.retrieve_object_states('obj_1', 1), [])
+        self.assertEqual(
+            scene_config.retrieve_object_states('obj_1', 2),
+            ['state_2', 'state_3'])
+        self.assertEqual(scene_config.retrieve_object_states('obj_1', 3), [])
+        self.assertEqual(scene_config.retrieve_object_states('obj_2', 0), [])
+        self.assertEqual(scene_config.retrieve_object_states('obj_3', 0), [])
+
+        # The returned lists are copies.
+        scene_config.retrieve_object_states('obj_1', 0).append('state_4')
+        self.assertEqual(
+            scene_config.retrieve_object_states('obj_1', 0), ['state_1'])
+
+        # Changes to the objects are seen once they're indexed again.
+        scene_config.objects[1].states = [['state_5']]
+        self.assertEqual(scene_config.retrieve_object_states('obj_2', 0), [])
+        scene_config.index_object_states()
+        self.assertEqual(
+            scene_config.retrieve_object_states('obj_2', 0), ['state_5'])
+
     def test_retrieve_goal_with_config_metadata(self):
         # self.controller.set_metadata_tier('oracle')
         goal = {
@@ -921,6 +1067,8 @@ class TestSceneConfig(unittest.TestCase):
             "category": "test category",
             "key": "value"
         })
+        # The scene configuration's own goal isn't modified.
+        self.assertEqual(scene_config.goal.metadata, {"key": "value"})
 
     def test_update_goal_target_image(self):
         goal = {'metadata': {
@@ -1,6 +1,9 @@
 import glob
+import json
 import os
 import shutil
+import threading
+import time
 import unittest
 from types import SimpleNamespace
 from unittest.mock import ANY, MagicMock
@@ -14,6 +17,7 @@ from machine_common_sense.config_manager import (ConfigManager, MetadataTier,
 from machine_common_sense.controller_events import EndScenePayload, EventType
 from machine_common_sense.goal_metadata import GoalMetadata
 from machine_common_sense.parameter import Parameter
+from machine_common_sense.scene_cache import create_cached_scene
 
 from .mock_controller import MOCK_VARIABLES, MockControllerAI2THOR
 
@@ -320,6 +324,78 @@ class TestController(unittest.TestCase):
             EndScenePayload(**test_payload)
         )
 
+    def test_async_subscribers(self):
+        controller = MockControllerAI2THOR()
+        controller._set_config(ConfigManager({'async_subscribers': 'true'}))
+        self.assertIsNotNone(controller._event_dispatcher)
+        release = threading.Event()
+        event_types = []
+        payloads = []
+
+        def on_event(event_type, payload):
+            release.wait(timeout=5)
+            event_types.append(event_type)
+            payloads.append(payload)
+
+        subscriber = MagicMock()
+        subscriber.on_event.side_effect = on_event
+        controller.subscribe(subscriber)
+
+        controller.start_scene({'name': TEST_FILE_NAME})
+        output = controller.step('Pass')
+        # Steps don't wait for subscribers.
+        self.assertEqual(output.step_number, 1)
+        self.assertEqual(event_types, [])
+        step_returned = time.perf_counter()
+
+        release.set()
+        controller.end_scene(report={})
+        # End scene waits for subscribers.
+        self.assertEqual(event_types, [
+            EventType.ON_START_SCENE,
+            EventType.ON_BEFORE_STEP,
+            EventType.ON_AFTER_STEP,
+            EventType.ON_END_SCENE
+        ])
+        # Events are timed when published, not when handled.
+        publish_times = [payload.publish_time for payload in payloads]
+        self.assertEqual(publish_times, sorted(publish_times))
+        self.assertLess(publish_times[2], step_returned)
+        # Subscribers get copies of the output returned to the caller.
+        self.assertIsNot(payloads[2].restricted_step_output, output)
+        self.assertIsNot(payloads[2].goal, output.goal)
+        controller._event_dispatcher.close()
+
+    def test_set_config_invalid_queue_full_policy(self):
+        controller = MockControllerAI2THOR()
+        with self.assertRaisesRegex(ValueError, 'recorder_queue_full_policy'):
+            controller._set_config(ConfigManager({
+                'video_enabled': 'true',
+                'recorder_queue_full_policy': 'wait'
+            }))
+        # It's only used when writing files.
+        controller._set_config(
+            ConfigManager({'recorder_queue_full_policy': 'wait'}))
+
+    def test_validate_event_payloads(self):
+        controller = MockControllerAI2THOR()
+        controller._set_config(
+            ConfigManager({'validate_event_payloads': 'true'}))
+        subscriber = MagicMock()
+        controller.subscribe(subscriber)
+        controller.start_scene({'name': TEST_FILE_NAME})
+        controller.step('Pass')
+        controller.end_scene(report={})
+        self.assertEqual(subscriber.on_event.call_count, 4)
+
+        payload = EndScenePayload(
+            **controller._create_event_payload_kwargs())
+        payload.step_number = 'one'
+        with self.assertRaises(typeguard.TypeCheckError):
+            controller._publish_event(EventType.ON_END_SCENE, payload)
+        with self.assertRaises(typeguard.TypeCheckError):
+            controller._publish_event(EventType.ON_END_SCENE, {})
+
     def test_end_scene_with_numpy_float(self):
         test_payload = self.controller._create_event_payload_kwargs()
 
@@ -476,6 +552,47 @@ class TestController(unittest.TestCase):
         self.assertEqual(len(output.structural_object_list),
                          len(MOCK_VARIABLES['metadata']['structuralObjects']))
 
+    def test_start_scene_cached_scene(self):
+        scene = create_cached_scene(json.dumps({
+            'name': TEST_FILE_NAME,
+            'goal': {'metadata': {'targets': [{'id': 'a'}, {'id': 'b'}]}}
+        }).encode())
+        output = self.controller.start_scene(scene)
+        self.assertEqual(output.step_number, 0)
+        self.assertIs(self.controller._scene_config, scene.scene_config)
+        parameters = self.controller._controller.initialization_parameters
+        self.assertIs(parameters['sceneConfig'], scene.unity_config)
+        self.assertEqual(parameters['goalObjectIds'], ['a', 'b'])
+
+    def test_start_scene_cached_scene_matches_uncached(self):
+        scene_data = {
+            'name': TEST_FILE_NAME,
+            'goal': {
+                'action_list': [['Pass', 'MoveAhead,amount=0.1']],
+                'category': 'retrieval',
+                'metadata': {'target': {'id': 'a', 'image': '[[0, 1]]'}}
+            }
+        }
+        self.controller.start_scene(json.loads(json.dumps(scene_data)))
+        uncached = self.controller._controller.initialization_parameters[
+            'sceneConfig']
+        scene = create_cached_scene(json.dumps(scene_data).encode())
+        self.controller.start_scene(scene)
+        cached = self.controller._controller.initialization_parameters[
+            'sceneConfig']
+        self.assertEqual(cached, uncached)
+        self.assertEqual(cached['goal']['actionList'], [
+            [('Pass', {}), ('MoveAhead', {'amount': 0.1})]
+        ])
+        self.assertEqual(cached['goal']['metadata'], {
+            'category': 'retrieval',
+            'target': {'id': 'a', 'image': [[0, 1]]}
+        })
+        # The shared cached scene configuration isn't modified.
+        self.assertEqual(
+            scene.scene_config.goal.dict(exclude_none=True),
+            scene_data['goal'])
+
     def test_start_scene_preview_phase(self):
         self.controller.set_metadata_tier(
             MetadataTier.ORACLE.value)
@@ -510,6 +627,46 @@ class TestController(unittest.TestCase):
         self.assertEqual(len(output.structural_object_list),
                          len(MOCK_VARIABLES['metadata']['structuralObjects']))
 
+    def test_start_scene_preview_phase_without_subscribers(self):
+        self.controller.set_metadata_tier(
+            MetadataTier.ORACLE.value)
+        self.controller._output_handler.handle_output = MagicMock(
+            wraps=self.controller._output_handler.handle_output)
+        self.controller._output_handler.handle_restricted_output = MagicMock(
+            wraps=self.controller._output_handler.handle_restricted_output)
+        output = self.controller.start_scene({'name': TEST_FILE_NAME, 'goal': {
+            'last_preview_phase_step': 5}
+        })
+        self.assertEqual(output.step_number, 5)
+        self.assertEqual(len(output.image_list),
+                         MOCK_VARIABLES['event_count'] * 6)
+        # Only the initialize step and the final preview step are handled.
+        self.controller._output_handler.handle_output.assert_called_once()
+        self.controller._output_handler.handle_restricted_output\
+            .assert_called_once()
+        self.controller._publish_event.assert_called_once_with(
+            EventType.ON_START_SCENE, ANY)
+
+    def test_start_scene_preview_phase_with_subscribers(self):
+        self.controller.set_metadata_tier(
+            MetadataTier.ORACLE.value)
+        self.controller.subscribe(MagicMock())
+        output = self.controller.start_scene({'name': TEST_FILE_NAME, 'goal': {
+            'last_preview_phase_step': 5}
+        })
+        self.assertEqual(output.step_number, 5)
+        self.assertEqual(len(output.image_list),
+                         MOCK_VARIABLES['event_count'] * 6)
+        self.assertEqual(len(output.depth_map_list),
+                         MOCK_VARIABLES['event_count'] * 6)
+        event_types = [
+            call.args[0] for call in
+            self.controller._publish_event.call_args_list
+        ]
+        self.assertEqual(event_types.count(EventType.ON_BEFORE_STEP), 5)
+        self.assertEqual(event_types.count(EventType.ON_AFTER_STEP), 5)
+        self.assertEqual(event_types[-1], EventType.ON_START_SCENE)
+
     def test_step(self):
         self.controller.set_metadata_tier(
             MetadataTier.ORACLE.value)
@@ -581,6 +738,94 @@ class TestController(unittest.TestCase):
         output = self.controller.step(mcs.Action.MOVE_AHEAD.value)
         self.assertIsNone(output)
 
+    def test_step_many(self):
+        self.controller.set_metadata_tier(
+            MetadataTier.ORACLE.value)
+        self.controller.start_scene({'name': TEST_FILE_NAME})
+        self.controller._publish_event.reset_mock()
+        outputs = self.controller.step_many([
+            mcs.Action.MOVE_AHEAD.value,
+            'MoveAhead,amount=0.5',
+            (mcs.Action.PASS.value, {})
+        ])
+        self.assertEqual(len(outputs), 1)
+        self.assertEqual(outputs[0].step_number, 3)
+        self.assertEqual(
+            outputs[0].action_list,
+            GoalMetadata.DEFAULT_ACTIONS)
+        self.assertEqual(self.controller.get_last_step_data()['action'],
+                         mcs.Action.PASS.value)
+        # Every step is still published by default.
+        self.assertEqual(self.controller._publish_event.call_count, 6)
+
+        outputs = self.controller.step_many(
+            [mcs.Action.PASS.value] * 3, keep_outputs=[0, 2])
+        self.assertEqual([output.step_number for output in outputs], [4, 6])
+
+    def test_step_many_without_events(self):
+        self.controller.set_metadata_tier(
+            MetadataTier.LEVEL_2.value)
+        self.controller.start_scene({'name': TEST_FILE_NAME})
+        self.controller._publish_event.reset_mock()
+        self.controller._output_handler.handle_output = MagicMock()
+        outputs = self.controller.step_many(
+            [mcs.Action.PASS.value] * 5, publish_events=False)
+        self.controller._publish_event.assert_not_called()
+        self.controller._output_handler.handle_output.assert_not_called()
+        self.assertEqual(len(outputs), 1)
+        self.assertEqual(outputs[0].step_number, 5)
+        # Only the restricted output is built.
+        self.assertEqual(outputs[0].position, None)
+
+    def test_step_many_last_step(self):
+        self.controller.start_scene({'name': TEST_FILE_NAME})
+        self.controller.set_goal(mcs.GoalMetadata(last_step=2))
+        outputs = self.controller.step_many(
+            [mcs.Action.PASS.value] * 5, keep_outputs=range(5))
+        self.assertEqual([output.step_number for output in outputs], [1, 2])
+
+    def test_step_many_last_step_default_outputs(self):
+        self.controller.start_scene({'name': TEST_FILE_NAME})
+        self.controller.set_goal(mcs.GoalMetadata(last_step=3))
+        # The last step's output is kept, even without events.
+        outputs = self.controller.step_many(
+            [mcs.Action.PASS.value] * 2, publish_events=False)
+        self.assertEqual([output.step_number for output in outputs], [2])
+        outputs = self.controller.step_many(
+            [mcs.Action.PASS.value] * 5, publish_events=False)
+        self.assertEqual([output.step_number for output in outputs], [3])
+        # Nothing is returned if no actions are run.
+        self.assertEqual(
+            self.controller.step_many([mcs.Action.PASS.value]), [])
+
+    def test_step_many_invalid_action(self):
+        self.controller.start_scene({'name': TEST_FILE_NAME})
+        self.controller.set_goal(mcs.GoalMetadata(
+            action_list=[[('Pass', {})], [('Pass', {})]]))
+        with self.assertRaises(ValueError):
+            self.controller.step_many([
+                mcs.Action.PASS.value,
+                mcs.Action.MOVE_AHEAD.value
+            ])
+
+    def test_step_until(self):
+        self.controller.start_scene({'name': TEST_FILE_NAME})
+        output = self.controller.step_until(
+            mcs.Action.PASS.value,
+            lambda output: output.step_number == 4
+        )
+        self.assertEqual(output.step_number, 4)
+
+        output = self.controller.step_until(
+            mcs.Action.PASS.value, lambda output: False, max_steps=3,
+            publish_events=False)
+        self.assertEqual(output.step_number, 7)
+
+        self.controller.set_goal(mcs.GoalMetadata(last_step=9))
+        output = self.controller.step_until(
+            mcs.Action.PASS.value, lambda output: False)
+        self.assertEqual(output.step_number, 9)
+
     def test_get_metadata_level(self):
         self.assertEqual('default', self.controller.get_metadata_level())
 
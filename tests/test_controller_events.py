@@ -0,0 +1,135 @@
+import copy
+import unittest
+
+import typeguard
+from ai2thor.server import Event
+
+from machine_common_sense.config_manager import (ConfigManager,
+                                                 SceneConfiguration)
+from machine_common_sense.controller_events import (AfterStepPayload,
+                                                    BeforeStepPayload,
+                                                    EndScenePayload,
+                                                    StartScenePayload)
+from machine_common_sense.goal_metadata import GoalMetadata
+from machine_common_sense.step_metadata import StepMetadata
+
+
+class TestControllerEvents(unittest.TestCase):
+
+    def setUp(self):
+        self.config = ConfigManager({})
+        self.scene_config = SceneConfiguration(name='test')
+
+    def create_after_step_payload(self, **kwargs):
+        return AfterStepPayload(**{
+            'step_number': 1,
+            'config': self.config,
+            'scene_config': self.scene_config,
+            'timestamp': '20210831-202203',
+            'wrapped_step': {},
+            'step_metadata': Event({'screenWidth': 600, 'screenHeight': 400}),
+            'step_output': StepMetadata(),
+            'restricted_step_output': StepMetadata(),
+            'goal': GoalMetadata(),
+            'ai2thor_action': 'Pass',
+            'step_params': {},
+            'action_kwargs': {},
+            **kwargs
+        })
+
+    def test_after_step_payload(self):
+        payload = self.create_after_step_payload()
+        self.assertEqual(payload.step_number, 1)
+        self.assertIs(payload.config, self.config)
+        self.assertIs(payload.scene_config, self.scene_config)
+        self.assertIsNone(payload.output_folder)
+        self.assertEqual(payload.ai2thor_action, 'Pass')
+        self.assertFalse(hasattr(payload, '__dict__'))
+        payload.validate()
+
+    def test_copy(self):
+        goal = GoalMetadata(metadata={'target': {'id': 'ball'}})
+        payload = self.create_after_step_payload(
+            goal=goal, restricted_step_output=StepMetadata(goal=goal))
+        payload.publish_time = 12.5
+        payload_copy = payload.copy()
+        self.assertEqual(payload_copy.publish_time, 12.5)
+        self.assertIs(payload_copy.config, payload.config)
+        self.assertIs(payload_copy.step_metadata, payload.step_metadata)
+        # Changes to the caller's goal and output don't reach the copy.
+        goal.metadata['target']['id'] = 'changed'
+        payload.restricted_step_output.object_list.append('changed')
+        self.assertEqual(payload_copy.goal.metadata['target']['id'], 'ball')
+        self.assertEqual(
+            payload_copy.restricted_step_output.goal.metadata['target']['id'],
+            'ball')
+        self.assertEqual(
+            list(payload_copy.restricted_step_output.object_list), [])
+
+    def test_publish_time_ignored_by_eq(self):
+        payload = self.create_after_step_payload()
+        other = copy.copy(payload)
+        other.publish_time = 1.0
+        self.assertIsNone(payload.publish_time)
+        self.assertEqual(payload, other)
+
+    def test_start_scene_payload(self):
+        payload = StartScenePayload(
+            step_number=0,
+            config=self.config,
+            output_folder='output/',
+            timestamp='20210831-202203',
+            wrapped_step={},
+            step_metadata=Event({'screenWidth': 600, 'screenHeight': 400}),
+            step_output=StepMetadata(),
+            restricted_step_output=StepMetadata(),
+            goal=GoalMetadata()
+        )
+        self.assertIsNone(payload.scene_config)
+        self.assertEqual(payload.output_folder, 'output/')
+        payload.validate()
+
+    def test_before_step_payload(self):
+        payload = BeforeStepPayload(
+            step_number=1, config=self.config, action='Pass',
+            goal=GoalMetadata())
+        self.assertIsNone(payload.habituation_trial)
+        payload.validate()
+
+    def test_end_scene_payload(self):
+        payload = EndScenePayload(
+            step_number=1, config=self.config, rating=1.0, score=1)
+        self.assertEqual(payload.rating, '1.0')
+        self.assertEqual(payload.score, 1.0)
+        self.assertIsInstance(payload.score, float)
+        self.assertIsNone(payload.report)
+        payload.validate()
+
+    def test_missing_field(self):
+        with self.assertRaises(TypeError):
+            BeforeStepPayload(step_number=1, config=self.config)
+
+    def test_validate(self):
+        payload = self.create_after_step_payload(step_params=None)
+        with self.assertRaisesRegex(
+                typeguard.TypeCheckError, 'AfterStepPayload.step_params'):
+            payload.validate()
+        payload = self.create_after_step_payload(config={})
+        with self.assertRaises(typeguard.TypeCheckError):
+            payload.validate()
+
+    def test_eq(self):
+        payload = self.create_after_step_payload()
+        self.assertEqual(payload, self.create_after_step_payload(
+            step_metadata=payload.step_metadata,
+            step_output=payload.step_output,
+            restricted_step_output=payload.restricted_step_output,
+            goal=payload.goal
+        ))
+        self.assertNotEqual(
+            payload, self.create_after_step_payload(step_number=2))
+        self.assertIn('step_number=1', repr(payload))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -1,9 +1,14 @@
 import unittest
 
 import numpy as np
+import PIL
 from numpy.testing import assert_array_equal
 
-from machine_common_sense.controller_media import convert_depth_to_hsv
+from machine_common_sense.controller_media import (convert_depth_to_hsv,
+                                                   convert_depth_to_image,
+                                                   convert_depth_to_rgb,
+                                                   get_frame_arrays)
+from machine_common_sense.frame_list import FrameList, frame_to_image
 
 
 class TestControllerMedia(unittest.TestCase):
@@ -26,6 +31,59 @@ class TestControllerMedia(unittest.TestCase):
         ]), (40, 10, 3))
         assert_array_equal(actual_output, expected_output)
 
+    def test_convert_depth_to_rgb(self):
+        input_array = np.array([[0, 0.1875], [75, 149]], dtype=np.float32)
+        actual_output = convert_depth_to_rgb(input_array, 150.0)
+        self.assertEqual(actual_output.shape, (2, 2, 3))
+        self.assertEqual(actual_output.dtype, np.uint8)
+        image = convert_depth_to_image(input_array, 150.0)
+        assert_array_equal(np.asarray(image), actual_output)
+
+    def test_convert_depth_to_rgb_matches_hsv(self):
+        # Depths in the middle of each hue step, across every band.
+        input_array = np.array([
+            (np.arange(0, 400 * 256, 7) + 0.5) * (150.0 / 400 / 256)
+        ])
+        actual_output = convert_depth_to_rgb(
+            input_array, 150.0, use_cache=False)
+        expected_output = np.asarray(PIL.Image.fromarray(
+            convert_depth_to_hsv(input_array, 150.0), mode='HSV'
+        ).convert('RGB'))
+        assert_array_equal(actual_output, expected_output)
+
+    def test_convert_depth_to_rgb_out_of_range(self):
+        input_array = np.array([[-1, 0, 150, 1000]], dtype=np.float32)
+        actual_output = convert_depth_to_rgb(
+            input_array, 150.0, use_cache=False)
+        assert_array_equal(actual_output[0][0], actual_output[0][1])
+        assert_array_equal(actual_output[0][2], actual_output[0][3])
+
+    def test_convert_depth_to_rgb_cache(self):
+        input_array = np.array([[0, 10], [75, 149]], dtype=np.float32)
+        output = convert_depth_to_rgb(input_array, 150.0)
+        self.assertFalse(output.flags.writeable)
+        self.assertIs(convert_depth_to_rgb(input_array, 150.0), output)
+        # The cache is keyed on the clipping plane.
+        self.assertIsNot(convert_depth_to_rgb(input_array, 100.0), output)
+        self.assertIsNot(
+            convert_depth_to_rgb(input_array, 150.0, use_cache=False),
+            output
+        )
+        # A different array with the same values is colorized again.
+        other_output = convert_depth_to_rgb(input_array.copy(), 150.0)
+        self.assertIsNot(other_output, output)
+        assert_array_equal(other_output, output)
+
+    def test_get_frame_arrays(self):
+        frame = np.array([[[1, 2, 3]]], dtype=np.uint8)
+        frame_list = FrameList([frame], frame_to_image)
+        arrays = get_frame_arrays(frame_list)
+        self.assertTrue(np.shares_memory(arrays[0], frame))
+        # No images are built.
+        self.assertIsNone(frame_list._items[0])
+        arrays = get_frame_arrays([frame_to_image(frame)])
+        assert_array_equal(arrays[0], frame)
+
 
 if __name__ == '__main__':
     unittest.main()
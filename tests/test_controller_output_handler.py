@@ -1,5 +1,6 @@
 import unittest
 from types import SimpleNamespace
+from unittest.mock import patch
 
 import numpy
 
@@ -965,6 +966,37 @@ class TestControllerOutputHandler(unittest.TestCase):
 
         self.assertEqual(actual.lava, [(-15, 10, -12, -10), (3, 10, 15, -10)])
 
+    def test_wrap_output_computes_step_data_once(self):
+        self._config.set_metadata_tier(MetadataTier.ORACLE.value)
+        (
+            mock_scene_event_data,
+            image_data,
+            depth_data,
+            object_mask_data
+        ) = self.create_wrap_output_scene_event()
+        mock_event = self.create_mock_scene_event(mock_scene_event_data)
+
+        coh = ControllerOutputHandler(self._config)
+        coh.set_scene_config(SceneConfiguration())
+        reward_function = ('machine_common_sense.controller_output_handler.'
+                           'Reward.calculate_reward')
+        with patch(reward_function, return_value=1) as calculate_reward:
+            (res, actual) = coh.handle_output(
+                mock_event, GoalMetadata(), 0, 1)
+            calculate_reward.assert_called_once()
+
+        self.assertEqual(res.reward, 1)
+        self.assertEqual(actual.reward, 1)
+        self.assertEqual(len(res.object_list), 2)
+        self.assertEqual(len(actual.object_list), 2)
+        self.assertIs(res.object_list[0], actual.object_list[0])
+        # Each output gets its own list even though the data is shared.
+        self.assertIsNot(res.object_list, actual.object_list)
+        self.assertIsNot(res.action_list, actual.action_list)
+        # But the object lists share their arrays.
+        self.assertIsInstance(actual.object_list, mcs.ObjectList)
+        self.assertIs(res.object_list._cache, actual.object_list._cache)
+
     def test_save_images(self):
         self._config.set_metadata_tier(
             MetadataTier.ORACLE.value)
@@ -1132,6 +1164,40 @@ class TestControllerOutputHandler(unittest.TestCase):
             actual[1].simulation_agent_is_holding_held_object,
             False)
 
+    def test_retrieve_object_list_cached(self):
+        mock_scene_event_data = self.create_retrieve_object_list_scene_event()
+
+        mock_event = self.create_mock_scene_event(mock_scene_event_data)
+        scene_event = SceneEvent(
+            self._config, SceneConfiguration(), mock_event, 0)
+        self.assertEqual(scene_event.build_counts['object_list'], 0)
+        first = scene_event.object_list
+        second = scene_event.object_list
+        self.assertIs(first, second)
+        self.assertEqual(scene_event.build_counts['object_list'], 1)
+        scene_event.segmentation_colors
+        scene_event.segmentation_colors
+        self.assertEqual(scene_event.build_counts['segmentation_colors'], 1)
+
+    def test_wrap_output_builds_each_field_once(self):
+        self._config.set_metadata_tier(MetadataTier.ORACLE.value)
+        (
+            mock_scene_event_data,
+            image_data,
+            depth_data,
+            object_mask_data
+        ) = self.create_wrap_output_scene_event()
+        mock_event = self.create_mock_scene_event(mock_scene_event_data)
+
+        coh = ControllerOutputHandler(self._config)
+        coh.set_scene_config(SceneConfiguration())
+        coh.handle_output(mock_event, GoalMetadata(), 0, 1)
+        build_counts = coh._scene_event.build_counts
+        self.assertEqual(build_counts['object_list'], 1)
+        self.assertEqual(build_counts['structural_object_list'], 1)
+        self.assertEqual(build_counts['object_colors'], 1)
+        self.assertEqual(build_counts['segmentation_colors'], 1)
+
     def test_retrieve_object_list_with_states(self):
         scene_config = {
             'name': 'test name',
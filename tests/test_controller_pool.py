@@ -0,0 +1,232 @@
+import json
+import multiprocessing
+import os
+import shutil
+import tempfile
+import time
+import unittest
+from types import SimpleNamespace
+
+from machine_common_sense.controller_pool import (ControllerPool, PoolReport,
+                                                  SceneResult,
+                                                  run_scene_with_pass)
+
+
+class FakeController():
+    def __init__(self, *args):
+        self.step_number = 0
+        self.last_step = None
+
+    def start_scene(self, scene_data):
+        self.step_number = 0
+        self.last_step = scene_data.get('goal', {}).get('last_step')
+        return SimpleNamespace(step_number=0)
+
+    def step(self, action):
+        if self.step_number == self.last_step:
+            return None
+        self.step_number += 1
+        return SimpleNamespace(step_number=self.step_number)
+
+    def end_scene(self):
+        os.makedirs('SCENE_HISTORY', exist_ok=True)
+        with open(f'SCENE_HISTORY/{os.getpid()}_{time.time()}.json',
+                  'w') as history_file:
+            history_file.write('{}')
+
+    def stop_simulation(self):
+        pass
+
+
+def create_fake_controller(*args):
+    return FakeController()
+
+
+def create_no_controller(*args):
+    return None
+
+
+def create_hung_controller(*args):
+    time.sleep(60)
+
+
+def run_scene_with_failures(controller, scene_data):
+    behavior = scene_data.get('behavior')
+    if behavior == 'error':
+        raise ValueError('bad scene')
+    if behavior == 'crash_once' and not os.path.exists('crashed'):
+        open('crashed', 'w').close()
+        os._exit(1)
+    if behavior == 'hang':
+        time.sleep(60)
+    return {'step_count': 1, 'step_times': [0.5], 'name': scene_data['name']}
+
+
+class TestControllerPool(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.context = multiprocessing.get_context('fork')
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def create_scene_files(self, scene_list):
+        scene_files = []
+        for index, scene_data in enumerate(scene_list):
+            scene_file = os.path.join(self.directory, f'scene_{index}.json')
+            with open(scene_file, 'w') as scene_json:
+                json.dump(scene_data, scene_json)
+            scene_files.append(scene_file)
+        return scene_files
+
+    def create_pool(self, **kwargs):
+        return ControllerPool(
+            worker_count=kwargs.pop('worker_count', 2),
+            output_directory=os.path.join(self.directory, 'output'),
+            controller_factory=kwargs.pop(
+                'controller_factory', create_fake_controller),
+            mp_context=self.context,
+            **kwargs
+        )
+
+    def test_invalid_worker_count(self):
+        with self.assertRaises(ValueError):
+            ControllerPool(worker_count=0)
+
+    def test_run(self):
+        scene_files = self.create_scene_files([
+            {'goal': {'last_step': 3}},
+            {'goal': {'last_step': 5}},
+            {'goal': {'last_step': 2}}
+        ])
+        report = self.create_pool().run(scene_files)
+        self.assertIsInstance(report, PoolReport)
+        self.assertEqual(report.worker_count, 2)
+        self.assertEqual(report.failed, [])
+        self.assertEqual(
+            [result.scene_file for result in report.results], scene_files)
+        self.assertEqual(
+            [result.step_count for result in report.results], [3, 5, 2])
+        for result in report.results:
+            self.assertTrue(result.success)
+            self.assertEqual(result.attempts, 1)
+            self.assertEqual(len(result.history_files), 1)
+            self.assertTrue(result.history_files[0].startswith(
+                os.path.join(self.directory, 'output', 'worker_')))
+        self.assertEqual(len(report.history_files), 3)
+
+        report_file = os.path.join(self.directory, 'report.json')
+        report.write(report_file)
+        with open(report_file) as report_json:
+            data = json.load(report_json)
+        self.assertEqual(data['scene_count'], 3)
+        self.assertEqual(data['failed_count'], 0)
+        self.assertEqual(data['step_count'], 10)
+
+    def test_run_with_errors_and_crashes(self):
+        scene_files = self.create_scene_files([
+            {'behavior': 'error'},
+            {'behavior': 'crash_once'},
+            {'behavior': 'ok'}
+        ])
+        report = self.create_pool(
+            worker_count=1,
+            scene_runner=run_scene_with_failures
+        ).run(scene_files)
+        error_result, crash_result, ok_result = report.results
+        # Scenes that raise errors are not retried.
+        self.assertFalse(error_result.success)
+        self.assertEqual(error_result.attempts, 1)
+        self.assertIn('bad scene', error_result.error)
+        # Scenes whose worker crashed are retried on a new worker.
+        self.assertTrue(crash_result.success)
+        self.assertIsNone(crash_result.error)
+        self.assertEqual(crash_result.attempts, 2)
+        self.assertEqual(crash_result.output, {'name': 'scene_1'})
+        self.assertTrue(ok_result.success)
+        self.assertEqual(report.worker_restarts, 1)
+
+    def test_run_with_hung_worker(self):
+        scene_files = self.create_scene_files([
+            {'behavior': 'hang'},
+            {'behavior': 'ok'}
+        ])
+        report = self.create_pool(
+            scene_runner=run_scene_with_failures,
+            scene_timeout=0.5,
+            max_retries=0
+        ).run(scene_files)
+        hang_result, ok_result = report.results
+        self.assertFalse(hang_result.success)
+        self.assertIn('timed out', hang_result.error)
+        self.assertEqual(hang_result.attempts, 1)
+        self.assertTrue(ok_result.success)
+
+    def test_run_with_hung_controller(self):
+        scene_files = self.create_scene_files([{}])
+        report = self.create_pool(
+            worker_count=1,
+            controller_factory=create_hung_controller,
+            scene_timeout=0.5,
+            max_worker_restarts=1
+        ).run(scene_files)
+        self.assertEqual(len(report.failed), 1)
+        self.assertEqual(report.worker_restarts, 1)
+        self.assertEqual(report.results[0].attempts, 0)
+
+    def test_run_with_relative_paths(self):
+        scene_files = self.create_scene_files([{'goal': {'last_step': 2}}])
+        cwd = os.getcwd()
+        os.chdir(self.directory)
+        try:
+            pool = self.create_pool(
+                worker_count=1,
+                config_file_or_dict='config.ini',
+                unity_app_file_path='MCS.x86_64'
+            )
+            report = pool.run([os.path.basename(scene_files[0])])
+        finally:
+            os.chdir(cwd)
+        self.assertEqual(pool._controller_args[:2], (
+            os.path.join(self.directory, 'config.ini'),
+            os.path.join(self.directory, 'MCS.x86_64')
+        ))
+        self.assertEqual(report.failed, [])
+        self.assertEqual(report.results[0].scene_file, scene_files[0])
+        self.assertEqual(report.results[0].step_count, 2)
+
+    def test_run_without_controllers(self):
+        scene_files = self.create_scene_files([{}, {}])
+        report = self.create_pool(
+            worker_count=1,
+            controller_factory=create_no_controller,
+            max_worker_restarts=1
+        ).run(scene_files)
+        self.assertEqual(len(report.failed), 2)
+        self.assertEqual(report.worker_restarts, 1)
+        for result in report.results:
+            self.assertEqual(result.attempts, 0)
+            self.assertIsNotNone(result.error)
+
+    def test_run_scene_with_pass(self):
+        controller = FakeController()
+        cwd = os.getcwd()
+        os.chdir(self.directory)
+        try:
+            output = run_scene_with_pass(
+                controller, {'goal': {'last_step': 4}})
+        finally:
+            os.chdir(cwd)
+        self.assertEqual(output['step_count'], 4)
+        self.assertEqual(len(output['step_times']), 4)
+
+    def test_scene_result_defaults(self):
+        result = SceneResult(scene_file='scene.json')
+        self.assertFalse(result.success)
+        self.assertEqual(result.attempts, 0)
+        self.assertEqual(result.history_files, [])
+
+
+if __name__ == '__main__':
+    unittest.main()
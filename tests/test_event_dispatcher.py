@@ -0,0 +1,132 @@
+import threading
+import unittest
+from unittest.mock import MagicMock, patch
+
+from machine_common_sense.controller_events import EventType
+from machine_common_sense.event_dispatcher import AsyncEventDispatcher
+
+
+class RecordingSubscriber():
+    def __init__(self):
+        self.events = []
+        self.threads = []
+
+    def on_event(self, event_type, payload):
+        self.events.append((event_type, payload))
+        self.threads.append(threading.current_thread())
+
+
+class BlockingSubscriber(RecordingSubscriber):
+    def __init__(self):
+        super().__init__()
+        self.started = threading.Event()
+        self.release = threading.Event()
+
+    def on_event(self, event_type, payload):
+        self.started.set()
+        self.release.wait(timeout=5)
+        super().on_event(event_type, payload)
+
+
+class TestAsyncEventDispatcher(unittest.TestCase):
+
+    def setUp(self):
+        self.dispatcher = AsyncEventDispatcher(queue_size=2)
+
+    def tearDown(self):
+        self.dispatcher.close()
+
+    def test_publish_in_order(self):
+        subscriber_1 = RecordingSubscriber()
+        subscriber_2 = RecordingSubscriber()
+        for index in range(10):
+            self.dispatcher.publish(
+                [subscriber_1, subscriber_2], EventType.ON_AFTER_STEP, index)
+        self.dispatcher.flush()
+        expected = [(EventType.ON_AFTER_STEP, index) for index in range(10)]
+        self.assertEqual(subscriber_1.events, expected)
+        self.assertEqual(subscriber_2.events, expected)
+        # Each subscriber has its own thread, off the publishing thread.
+        self.assertEqual(len(set(subscriber_1.threads)), 1)
+        self.assertIsNot(subscriber_1.threads[0], threading.current_thread())
+        self.assertIsNot(subscriber_1.threads[0], subscriber_2.threads[0])
+
+    def test_publish_does_not_wait_for_subscriber(self):
+        subscriber = BlockingSubscriber()
+        self.dispatcher.publish(
+            [subscriber], EventType.ON_START_SCENE, 'start')
+        self.assertTrue(subscriber.started.wait(timeout=5))
+        self.assertEqual(subscriber.events, [])
+        subscriber.release.set()
+        self.dispatcher.flush()
+        self.assertEqual(subscriber.events,
+                         [(EventType.ON_START_SCENE, 'start')])
+
+    def test_publish_blocks_when_queue_full(self):
+        subscriber = BlockingSubscriber()
+        self.dispatcher.publish([subscriber], EventType.ON_AFTER_STEP, 0)
+        self.assertTrue(subscriber.started.wait(timeout=5))
+        # The first event is being handled, so two more fill the queue.
+        self.dispatcher.publish([subscriber], EventType.ON_AFTER_STEP, 1)
+        self.dispatcher.publish([subscriber], EventType.ON_AFTER_STEP, 2)
+
+        published = threading.Event()
+
+        def publish():
+            self.dispatcher.publish([subscriber], EventType.ON_AFTER_STEP, 3)
+            published.set()
+
+        thread = threading.Thread(target=publish)
+        thread.start()
+        self.assertFalse(published.wait(timeout=0.2))
+        subscriber.release.set()
+        self.assertTrue(published.wait(timeout=5))
+        thread.join()
+        self.dispatcher.flush()
+        self.assertEqual([payload for _, payload in subscriber.events],
+                         [0, 1, 2, 3])
+
+    def test_subscriber_error(self):
+        failing = MagicMock()
+        failing.on_event.side_effect = ValueError('bad subscriber')
+        subscriber = RecordingSubscriber()
+        with patch('machine_common_sense.event_dispatcher.logger') as logger:
+            self.dispatcher.publish(
+                [failing, subscriber], EventType.ON_END_SCENE, 'end')
+            self.dispatcher.flush()
+        logger.error.assert_called_once()
+        self.assertEqual(subscriber.events, [(EventType.ON_END_SCENE, 'end')])
+
+    def test_close(self):
+        subscriber = RecordingSubscriber()
+        self.dispatcher.publish([subscriber], EventType.ON_AFTER_STEP, 0)
+        thread = self.dispatcher._workers[id(subscriber)].thread
+        self.dispatcher.close()
+        self.assertFalse(thread.is_alive())
+        self.assertEqual(len(subscriber.events), 1)
+
+        # Publishing after close starts a new thread.
+        self.dispatcher.publish([subscriber], EventType.ON_AFTER_STEP, 1)
+        self.dispatcher.flush()
+        self.assertEqual(len(subscriber.events), 2)
+
+    def test_reused_subscriber_id(self):
+        subscriber_1 = RecordingSubscriber()
+        subscriber_2 = RecordingSubscriber()
+        # As if subscriber_2 had subscriber_1's id after it was collected.
+        with patch('machine_common_sense.event_dispatcher.id', create=True,
+                   return_value=1):
+            self.dispatcher.publish(
+                [subscriber_1], EventType.ON_AFTER_STEP, 0)
+            thread = self.dispatcher._workers[1].thread
+            self.dispatcher.publish(
+                [subscriber_2], EventType.ON_AFTER_STEP, 1)
+            self.assertFalse(thread.is_alive())
+            self.assertIs(self.dispatcher._workers[1].subscriber, subscriber_2)
+            self.dispatcher.flush()
+        self.assertEqual(subscriber_1.events, [(EventType.ON_AFTER_STEP, 0)])
+        self.assertEqual(subscriber_2.events, [(EventType.ON_AFTER_STEP, 1)])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,142 @@
+import functools
+import unittest
+from unittest.mock import MagicMock
+
+import numpy
+import PIL
+
+from machine_common_sense.frame_list import (FrameList,
+                                             depth_frame_to_depth_map,
+                                             frame_to_image)
+
+
+class TestFrameList(unittest.TestCase):
+
+    def setUp(self):
+        self.frame_1 = numpy.array([[[1, 2, 3]]], dtype=numpy.uint8)
+        self.frame_2 = numpy.array([[[4, 5, 6]]], dtype=numpy.uint8)
+
+    def test_empty(self):
+        frame_list = FrameList()
+        self.assertEqual(len(frame_list), 0)
+        self.assertEqual(frame_list, [])
+        self.assertEqual(frame_list.as_arrays(), [])
+
+    def test_convert_on_access(self):
+        convert = MagicMock(side_effect=frame_to_image)
+        frame_list = FrameList([self.frame_1, self.frame_2], convert)
+        self.assertEqual(len(frame_list), 2)
+        convert.assert_not_called()
+
+        image = frame_list[1]
+        self.assertIsInstance(image, PIL.Image.Image)
+        self.assertEqual(numpy.array(image).tolist(), [[[4, 5, 6]]])
+        self.assertEqual(convert.call_count, 1)
+
+        # Converted frames are cached.
+        self.assertIs(frame_list[1], image)
+        self.assertIs(frame_list[-1], image)
+        self.assertEqual(convert.call_count, 1)
+
+        with self.assertRaises(IndexError):
+            frame_list[2]
+
+    def test_iterate_and_slice(self):
+        frame_list = FrameList([self.frame_1, self.frame_2], frame_to_image)
+        images = list(frame_list)
+        self.assertEqual(len(images), 2)
+        self.assertEqual(frame_list[0:1], [images[0]])
+        self.assertEqual(frame_list[::-1], [images[1], images[0]])
+
+    def test_as_arrays_does_not_convert(self):
+        convert = MagicMock(side_effect=frame_to_image)
+        frame_list = FrameList([self.frame_1, self.frame_2], convert)
+        arrays = frame_list.as_arrays()
+        convert.assert_not_called()
+        self.assertEqual(len(arrays), 2)
+        # Zero-copy, read-only views of the raw buffers.
+        self.assertTrue(numpy.shares_memory(arrays[0], self.frame_1))
+        self.assertFalse(arrays[0].flags.writeable)
+        self.assertTrue(self.frame_1.flags.writeable)
+
+    def test_as_arrays_with_convert_arrays(self):
+        depth_frame = numpy.array([[[0.2], [0.4]]], dtype=numpy.float32)
+        frame_list = FrameList(
+            [depth_frame],
+            functools.partial(depth_frame_to_depth_map,
+                              clipping_plane_far=150),
+            convert_arrays=True
+        )
+        arrays = frame_list.as_arrays()
+        self.assertIs(arrays[0], frame_list[0])
+        numpy.testing.assert_almost_equal(arrays[0], [30, 60], 3)
+
+    def test_add(self):
+        convert = MagicMock(side_effect=frame_to_image)
+        first = FrameList([self.frame_1], convert)
+        image = first[0]
+        second = FrameList([self.frame_2], convert)
+
+        combined = first + second
+        self.assertIsInstance(combined, FrameList)
+        self.assertEqual(len(combined), 2)
+        # The cached image is kept and the other frame is still lazy.
+        self.assertIs(combined[0], image)
+        self.assertEqual(convert.call_count, 1)
+        self.assertEqual(numpy.array(combined[1]).tolist(), [[[4, 5, 6]]])
+
+        combined = [] + first + []
+        self.assertIsInstance(combined, FrameList)
+        self.assertEqual(len(combined), 1)
+
+        combined = ['item'] + first
+        self.assertEqual(combined[0], 'item')
+        self.assertIs(combined[1], image)
+
+    def test_concat(self):
+        convert = MagicMock(side_effect=frame_to_image)
+        first = FrameList([self.frame_1], convert)
+        second = FrameList([self.frame_2, self.frame_1], convert)
+        combined = FrameList.concat([first, [], second])
+        self.assertIsInstance(combined, FrameList)
+        self.assertEqual(len(combined), 3)
+        convert.assert_not_called()
+        self.assertEqual(numpy.array(combined[1]).tolist(), [[[4, 5, 6]]])
+
+        self.assertEqual(FrameList.concat([[1], [], [2, 3]]), [1, 2, 3])
+        self.assertIsInstance(FrameList.concat([[1], [2]]), list)
+
+    def test_concat_as_arrays(self):
+        first = FrameList([self.frame_1], frame_to_image)
+        image = frame_to_image(self.frame_2)
+        combined = FrameList.concat([first, [image]])
+        # Images from plain lists are converted to arrays too.
+        arrays = combined.as_arrays()
+        self.assertEqual(len(arrays), 2)
+        for array in arrays:
+            self.assertIsInstance(array, numpy.ndarray)
+        self.assertEqual(arrays[1].tolist(), [[[4, 5, 6]]])
+        self.assertIs(combined[1], image)
+
+    def test_read_only(self):
+        frame_list = FrameList([self.frame_1], frame_to_image)
+        self.assertNotIsInstance(frame_list, list)
+        with self.assertRaises(TypeError):
+            frame_list[0] = None
+        self.assertIsInstance(list(frame_list), list)
+
+    def test_depth_frame_to_depth_map(self):
+        depth_frame = numpy.array(
+            [[[0.2], [0.4]], [[0.6], [0.8]]],
+            dtype=numpy.float32
+        )
+        depth_map = depth_frame_to_depth_map(depth_frame, 150)
+        self.assertEqual(depth_map.dtype, numpy.float32)
+        self.assertEqual(depth_map.shape, (2, 2))
+        numpy.testing.assert_almost_equal(
+            depth_map, [[30, 60], [90, 120]], 3)
+        self.assertFalse(numpy.shares_memory(depth_map, depth_frame))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -289,6 +289,32 @@ class TestGoalMetadata(unittest.TestCase):
         self.assertEqual(str(self.goal_metadata),
                          textwrap.dedent(self.str_output))
 
+    def test_copy(self):
+        goal = mcs.GoalMetadata(
+            action_list=[['Pass']],
+            category='retrieval',
+            last_step=10,
+            metadata={
+                'target': {'id': 'target_1', 'image': [0]},
+                'targets': [{'id': 'target_2'}],
+                'info': 'value'
+            }
+        )
+        goal_copy = goal.copy()
+        self.assertEqual(dict(goal_copy), dict(goal))
+        self.assertIs(goal_copy.action_list, goal.action_list)
+        del goal_copy.metadata['target']['image']
+        goal_copy.metadata['targets'][0]['position'] = {'x': 1}
+        goal_copy.metadata['info'] = None
+        self.assertEqual(goal.metadata, {
+            'target': {'id': 'target_1', 'image': [0]},
+            'targets': [{'id': 'target_2'}],
+            'info': 'value'
+        })
+
+        goal.metadata = None
+        self.assertIsNone(goal.copy().metadata)
+
 
 if __name__ == '__main__':
     unittest.main()
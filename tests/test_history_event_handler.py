@@ -1,3 +1,5 @@
+import json
+import os
 import unittest
 from unittest.mock import MagicMock, patch
 
@@ -12,7 +14,8 @@ from machine_common_sense.controller_events import (AfterStepPayload,
                                                     StartScenePayload)
 from machine_common_sense.goal_metadata import GoalMetadata
 from machine_common_sense.history_writer import (HistoryEventHandler,
-                                                 HistoryWriter, SceneHistory)
+                                                 HistoryWriter, SceneHistory,
+                                                 StreamingHistoryWriter)
 from machine_common_sense.step_metadata import StepMetadata
 
 TEST_FILE_NAME = "test_scene_file.json"
@@ -69,6 +72,46 @@ class TestHistoryEventHandler(unittest.TestCase):
         self.assertIsNone(step['classification'])
         self.assertIsNone(step['confidence'])
 
+    def test_on_start_scene_history_streaming(self):
+        self.config_mngr._config[
+            ConfigManager.CONFIG_DEFAULT_SECTION
+        ][ConfigManager.CONFIG_HISTORY_STREAMING] = 'true'
+        test_payload = {
+            "step_number": 0,
+            "config": self.config_mngr,
+            "scene_config": self.scene_config,
+            "output_folder": None,
+            "timestamp": "20210831-202204",
+            "wrapped_step": {},
+            "step_metadata": Event({'screenWidth': 400, 'screenHeight': 600}),
+            "step_output": StepMetadata(),
+            "restricted_step_output": StepMetadata(),
+            "goal": GoalMetadata()
+        }
+
+        self.histEvents.on_start_scene(StartScenePayload(**test_payload))
+
+        writer = self.histEvents._HistoryEventHandler__history_writer
+        self.assertIsInstance(writer, StreamingHistoryWriter)
+        self.assertEqual(writer.current_steps, [])
+        end_payload = {
+            'step_number': 0,
+            'config': self.config_mngr,
+            'scene_config': self.scene_config,
+            'rating': 'plausible',
+            'score': 0.8,
+            'report': {0: {'rating': 'implausible', 'score': 0.5}}
+        }
+        self.histEvents.on_end_scene(EndScenePayload(**end_payload))
+        self.assertFalse(os.path.exists(writer.stream_file))
+        with open(writer.scene_history_file) as history_file:
+            history = json.load(history_file)
+        os.unlink(writer.scene_history_file)
+        self.assertEqual(len(history['steps']), 1)
+        self.assertEqual(history['steps'][0]['action'], 'Initialize')
+        self.assertEqual(history['steps'][0]['classification'], 'implausible')
+        self.assertEqual(history['score']['classification'], 'plausible')
+
     def test_on_start_scene_hist_not_enabled(self):
         self.config_mngr._config[
             ConfigManager.CONFIG_DEFAULT_SECTION
@@ -140,7 +183,7 @@ class TestHistoryEventHandler(unittest.TestCase):
         hist_writer = self.histEvents._HistoryEventHandler__history_writer
 
         hist_writer.init_timer.assert_not_called()
-        hist_writer.add_step.assert_called_with(hist)
+        hist_writer.add_step.assert_called_with(hist, None)
 
     def test_on_after_step(self):
         test_payload = {
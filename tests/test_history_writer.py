@@ -1,13 +1,17 @@
 import copy
 import glob
+import json
 import os
 import shutil
 import unittest
+from unittest.mock import patch
 
 import numpy as np
 
 import machine_common_sense as mcs
 from machine_common_sense.config_manager import SceneConfiguration
+from machine_common_sense.history_writer import (StreamingHistoryWriter,
+                                                 convert_history_stream)
 
 TEST_FILE_NAME = "test_scene_file.json"
 PREFIX = 'prefix'
@@ -103,6 +107,18 @@ class TestHistoryWriter(unittest.TestCase):
             writer.current_steps[1]["action"],
             mcs.Action.MOVE_LEFT.value)
 
+    def test_add_step_timer_with_time(self):
+        writer = mcs.HistoryWriter(self.config_data)
+        writer.init_timer(1000)
+        writer.add_step(mcs.SceneHistory(
+            step=1, action=mcs.Action.MOVE_AHEAD.value), 1250)
+        writer.add_step(mcs.SceneHistory(
+            step=2, action=mcs.Action.MOVE_LEFT.value), 1400)
+        self.assertEqual(
+            [step["delta_time_millis"] for step in writer.current_steps],
+            [250, 150])
+        self.assertEqual(writer.last_step_time_millis, 1400)
+
     def test_add_step_timer(self):
         writer = mcs.HistoryWriter(self.config_data)
         writer.init_timer()
@@ -317,6 +333,88 @@ class TestHistoryWriter(unittest.TestCase):
 
         self.assertTrue(os.path.exists(writer.scene_history_file))
 
+    def write_steps(self, writer, report=None):
+        writer.add_step(mcs.SceneHistory(
+            step=0,
+            action='Initialize',
+            args={},
+            output=mcs.StepMetadata(
+                goal=mcs.GoalMetadata(category='retrieval', metadata={
+                    'target': {'id': 'target_1'}
+                }),
+                object_list=[mcs.ObjectMetadata(
+                    uuid='target_1',
+                    position={'x': 1.123456, 'y': 0.5, 'z': -2.000049}
+                )]
+            )
+        ))
+        writer.add_step(mcs.SceneHistory(
+            step=1,
+            action=mcs.Action.MOVE_AHEAD.value,
+            args={'amount': 0.333333, 'values': np.array([0.555555, 1.0])}
+        ))
+        if report is not None:
+            writer.add_report(report)
+        writer.write_history_file("Plausible", 0.75)
+
+    def test_streaming_history_file_matches(self):
+        report = {1: {'rating': 'implausible', 'score': 0.123456}}
+        with patch('machine_common_sense.history_writer.perf_counter',
+                   return_value=1.0):
+            writer = mcs.HistoryWriter(self.config_data, {}, 'json')
+            self.write_steps(writer, report)
+            streaming_writer = StreamingHistoryWriter(
+                self.config_data, {}, 'jsonl')
+            self.assertEqual(
+                streaming_writer.stream_file,
+                f'{writer.HISTORY_DIRECTORY}/test_scene_file-jsonl.jsonl')
+            self.write_steps(streaming_writer, report)
+
+        self.assertEqual(streaming_writer.current_steps, [])
+        self.assertFalse(os.path.exists(streaming_writer.stream_file))
+        with open(writer.scene_history_file) as history_file:
+            history = history_file.read()
+        with open(streaming_writer.scene_history_file) as history_file:
+            streaming_history = history_file.read()
+        self.assertEqual(
+            streaming_history,
+            history.replace('"timestamp": "json"', '"timestamp": "jsonl"'))
+        data = json.loads(streaming_history)
+        self.assertEqual(data['steps'][1]['args']['amount'], 0.3333)
+        self.assertEqual(data['steps'][1]['classification'], 'implausible')
+        self.assertEqual(data['steps'][1]['confidence'], 0.1235)
+        self.assertEqual(
+            data['steps'][0]['output']['goal']['metadata']['target'],
+            {'id': 'target_1', 'position': {'x': 1.1235, 'y': 0.5, 'z': -2.0}})
+
+    def test_streaming_history_appends_steps(self):
+        writer = StreamingHistoryWriter(self.prefix_config_data, {}, 'crash')
+        writer.add_step(mcs.SceneHistory(step=1, action='Pass'))
+        writer.add_step(mcs.SceneHistory(step=2, action='Pass'))
+        with open(writer.stream_file) as stream_file:
+            lines = stream_file.readlines()
+        self.assertEqual(len(lines), 3)
+        self.assertEqual(json.loads(lines[0])['info']['timestamp'], 'crash')
+        self.assertEqual(json.loads(lines[2])['step']['step'], 2)
+
+        # Convert the stream file as if the writer crashed mid-write.
+        with open(writer.stream_file, 'a') as stream_file:
+            stream_file.write('{"step": {"step": 3, "act')
+        with patch('machine_common_sense.history_writer.logger') as logger:
+            history_file = convert_history_stream(writer.stream_file)
+        logger.warning.assert_called_once()
+        self.assertEqual(
+            history_file,
+            f'{writer.HISTORY_DIRECTORY}/{PREFIX}/test_scene_file-crash.json')
+        with open(history_file) as history_json:
+            data = json.load(history_json)
+        self.assertEqual(data['info']['name'], 'prefix/test_scene_file')
+        self.assertEqual([step['step'] for step in data['steps']], [1, 2])
+        self.assertEqual(
+            data['score'], {'classification': '', 'confidence': ''})
+        writer._stream.close()
+        os.unlink(writer.stream_file)
+
     def test_is_target_visible_retrieval(self):
         writer = mcs.HistoryWriter(self.prefix_config_data)
 
@@ -0,0 +1,67 @@
+import json
+import subprocess
+import sys
+import unittest
+
+import machine_common_sense as mcs
+
+# Heavy dependencies that importing the package must not load.
+DEFERRED_MODULES = [
+    'ai2thor',
+    'colour',
+    'cv2',
+    'machine_common_sense.controller',
+    'machine_common_sense.plotter',
+    'machine_common_sense.serializer',
+    'machine_common_sense.subscriber',
+    'machine_common_sense.unity_executable_provider',
+    'msgpack',
+    'portalocker',
+    'progressbar',
+    'requests',
+    'shapely',
+    'skimage'
+]
+
+IMPORT_SCRIPT = '''
+import json, sys
+import machine_common_sense
+print(json.dumps(sorted(sys.modules)))
+'''
+
+
+def get_imported_modules():
+    output = subprocess.run(
+        [sys.executable, '-c', IMPORT_SCRIPT],
+        capture_output=True,
+        check=True,
+        text=True
+    ).stdout
+    return json.loads(output.splitlines()[-1])
+
+
+class TestImportTime(unittest.TestCase):
+
+    def test_import_defers_heavy_modules(self):
+        modules = get_imported_modules()
+        loaded = [
+            name for name in DEFERRED_MODULES
+            if any(
+                module == name or module.startswith(name + '.')
+                for module in modules
+            )
+        ]
+        self.assertEqual(loaded, [])
+
+    def test_lazy_attributes(self):
+        from machine_common_sense.controller import Controller
+        from machine_common_sense.serializer import SerializerMsgPack
+        self.assertIs(mcs.Controller, Controller)
+        self.assertIs(mcs.SerializerMsgPack, SerializerMsgPack)
+        self.assertIn('UnityExecutableProvider', dir(mcs))
+        with self.assertRaises(AttributeError):
+            mcs.NotAnAttribute
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -1,6 +1,9 @@
+import pickle
 import textwrap
 import unittest
 
+import numpy as np
+
 import machine_common_sense as mcs
 
 
@@ -123,6 +126,123 @@ class TestObjectMetadata(unittest.TestCase):
         self.assertEqual(str(self.object_metadata),
                          textwrap.dedent(self.str_output))
 
+    def test_slots(self):
+        self.assertFalse(hasattr(self.object_metadata, '__dict__'))
+        with self.assertRaises(AttributeError):
+            self.object_metadata.unknown_property = True
+        unpickled = pickle.loads(pickle.dumps(self.object_metadata))
+        self.assertEqual(dict(unpickled), dict(self.object_metadata))
+
+
+def create_corners(x, z):
+    return [
+        {'x': x + dx, 'y': y, 'z': z + dz}
+        for y in [0, 1]
+        for dx, dz in [(0.5, 0.5), (-0.5, 0.5), (-0.5, -0.5), (0.5, -0.5)]
+    ]
+
+
+class TestObjectList(unittest.TestCase):
+
+    def setUp(self):
+        self.object_list = mcs.ObjectList([
+            mcs.ObjectMetadata(
+                uuid='a', position={'x': 1, 'y': 0, 'z': 0},
+                dimensions=create_corners(1, 0), distance_in_world=1,
+                distance_in_steps=10, visible=True),
+            mcs.ObjectMetadata(
+                uuid='b', position={'x': 0, 'y': 0, 'z': 3},
+                distance_in_world=3, distance_in_steps=30, visible=True),
+            mcs.ObjectMetadata(
+                uuid='c', position={'x': 0, 'y': 0, 'z': -2},
+                distance_in_world=2, distance_in_steps=20, held=True),
+            mcs.ObjectMetadata(uuid='d')
+        ])
+
+    def test_is_list(self):
+        self.assertIsInstance(self.object_list, list)
+        self.assertEqual(self.object_list.uuids, ['a', 'b', 'c', 'd'])
+        self.assertEqual(mcs.ObjectList(), [])
+        self.assertEqual(len(mcs.ObjectList().positions), 0)
+
+    def test_arrays(self):
+        np.testing.assert_array_equal(self.object_list.positions, [
+            [1, 0, 0], [0, 0, 3], [0, 0, -2], [np.nan, np.nan, np.nan]
+        ])
+        self.assertEqual(self.object_list.bounds.shape, (4, 8, 3))
+        np.testing.assert_array_equal(
+            self.object_list.bounds[0, 0], [1.5, 0, 0.5])
+        self.assertTrue(np.isnan(self.object_list.bounds[1]).all())
+        np.testing.assert_array_equal(
+            self.object_list.distances_in_world, [1, 3, 2, -1])
+        np.testing.assert_array_equal(
+            self.object_list.distances_in_steps, [10, 30, 20, -1])
+        np.testing.assert_array_equal(
+            self.object_list.visible, [True, True, False, False])
+        np.testing.assert_array_equal(
+            self.object_list.held, [False, False, True, False])
+
+    def test_arrays_rebuilt_after_list_changes(self):
+        positions = self.object_list.positions
+        self.assertIs(self.object_list.positions, positions)
+        self.object_list.pop(0)
+        self.assertEqual(len(self.object_list.positions), 3)
+        self.assertEqual(self.object_list.get('b').uuid, 'b')
+        self.assertIsNone(self.object_list.get('a'))
+
+    def test_copy(self):
+        copied = self.object_list.copy()
+        self.assertIsInstance(copied, mcs.ObjectList)
+        self.assertIsNot(copied, self.object_list)
+        self.assertEqual(copied, self.object_list)
+        self.assertIs(copied.positions, self.object_list.positions)
+        self.assertFalse(copied.positions.flags.writeable)
+        copied.pop(0)
+        self.assertEqual(len(copied.positions), 3)
+        self.assertEqual(len(self.object_list.positions), 4)
+
+    def test_get(self):
+        self.assertIs(self.object_list.get('c'), self.object_list[2])
+        self.assertIsNone(self.object_list.get('e'))
+        # Without building the arrays.
+        self.assertNotIn('columns', self.object_list._cache)
+
+    def test_get_after_list_changes(self):
+        self.assertEqual(self.object_list.get('c').uuid, 'c')
+        self.object_list.insert(0, self.object_list.pop())
+        self.assertIs(self.object_list.get('c'), self.object_list[3])
+        self.object_list[0] = mcs.ObjectMetadata(uuid='e')
+        self.assertIsNone(self.object_list.get('d'))
+        self.assertIs(self.object_list.get('e'), self.object_list[0])
+
+    def test_select(self):
+        selected = self.object_list.select(self.object_list.held)
+        self.assertIsInstance(selected, mcs.ObjectList)
+        self.assertEqual(selected.uuids, ['c'])
+
+    def test_within(self):
+        self.assertEqual(self.object_list.within(2).uuids, ['a', 'c'])
+        self.assertEqual(
+            self.object_list.within(2, visible_only=True).uuids, ['a'])
+        self.assertEqual(self.object_list.within(0.5).uuids, [])
+        self.assertEqual(self.object_list.within(
+            2.5, position={'x': 0, 'y': 0, 'z': 1}).uuids, ['a', 'b'])
+
+    def test_nearest(self):
+        self.assertEqual(self.object_list.nearest().uuids, ['a'])
+        self.assertEqual(
+            self.object_list.nearest(count=5).uuids, ['a', 'c', 'b'])
+        self.assertEqual(
+            self.object_list.nearest(count=5, visible_only=True).uuids,
+            ['a', 'b'])
+        self.assertEqual(self.object_list.nearest(
+            count=2, position={'x': 0, 'y': 0, 'z': -3}).uuids, ['c', 'a'])
+
+    def test_distances_from(self):
+        np.testing.assert_allclose(
+            self.object_list.distances_from({'x': 0, 'y': 0, 'z': 0})[:3],
+            [1, 3, 2])
+
 
 if __name__ == '__main__':
     unittest.main()
@@ -2,6 +2,7 @@ import os
 import unittest
 
 import ai2thor
+import numpy as np
 from PIL import Image, ImageChops, ImageStat
 
 from machine_common_sense.config_manager import (FloorPartitionConfig,
@@ -180,6 +181,117 @@ class TestTopDownPlotter(unittest.TestCase):
         self.assertIsInstance(img1, Image.Image)
         self.assertIsInstance(img2, Image.Image)
 
+    def create_box(self, object_id, x, z, color='red', visible=True,
+                   height=0.0):
+        return {
+            'objectId': object_id,
+            'colorsFromMaterials': [color],
+            'visibleInCamera': visible,
+            'objectBounds': {'objectBoundsCorners': [
+                {'x': x + dx, 'y': height + dy, 'z': z + dz}
+                for dy, dx, dz in [
+                    (0, 0.5, 0.5), (0, -0.5, 0.5), (0, -0.5, -0.5),
+                    (0, 0.5, -0.5), (1, 0.5, 0.5), (1, -0.5, 0.5),
+                    (1, -0.5, -0.5), (1, 0.5, -0.5)
+                ]
+            ]}
+        }
+
+    def plot_without_cache(self, scene_event, step_number, goal_ids=None):
+        img = self.plotter.base_room_img.copy()
+        img = self.plotter._draw_objects(
+            img,
+            self.plotter._find_plottable_objects(scene_event),
+            goal_ids
+        )
+        img = self.plotter._draw_robot(img, scene_event.metadata['agent'])
+        return self.plotter._draw_step_number(img, step_number)
+
+    def test_plot_array_matches_full_redraw(self):
+        wall = self.create_box('wall_1', -3, 2, color='white')
+        occluder = self.create_box('occluder_1', 2, -2, color='blue')
+        steps = [
+            ([wall, occluder], [self.create_box('ball', 0, 1)], None),
+            # Nothing changes.
+            ([wall, occluder], [self.create_box('ball', 0, 1)], None),
+            # The ball moves and the wall isn't visible.
+            ([dict(wall, visibleInCamera=False), occluder],
+             [self.create_box('ball', 1, 1)], None),
+            # The occluder moves, and the ball is the goal.
+            ([wall, self.create_box('occluder_1', 2, -1, color='blue')],
+             [self.create_box('ball', 1, 1)], ['ball']),
+            # A low object is drawn beneath a higher wall.
+            ([self.create_box('wall_2', -3, 2, height=1)],
+             [self.create_box('ball', -3, 2, color='green')], None)
+        ]
+        for step_number, (structural, objects, goal_ids) in enumerate(steps):
+            scene_event = ai2thor.server.Event(metadata={
+                'screenWidth': 600,
+                'screenHeight': 400,
+                'objects': objects,
+                'structuralObjects': structural,
+                'agent': {
+                    'position': {'x': step_number, 'y': 0, 'z': 0},
+                    'rotation': {'x': 0, 'y': 90 * step_number, 'z': 0}
+                }
+            })
+            img = self.plotter.plot_array(scene_event, step_number, goal_ids)
+            np.testing.assert_array_equal(
+                img, self.plot_without_cache(scene_event, step_number,
+                                             goal_ids))
+        self.assertEqual(self.plotter._moved_ids, {'ball', 'occluder_1'})
+
+    def test_plot_array_rotating_ramp(self):
+        ramp = self.create_box('ramp_1', 2, 0, color='yellow')
+        signatures = []
+        for step_number, (height, rotation_x) in enumerate(
+                [(1, 0), (1, 0), (0.5, -30), (0.5, 30)]):
+            corners = ramp['objectBounds']['objectBoundsCorners']
+            rotating_ramp = dict(
+                ramp,
+                objectBounds={'objectBoundsCorners': [
+                    dict(corner, y=height) if index >= 4 else corner
+                    for index, corner in enumerate(corners)
+                ]},
+                rotation={'x': rotation_x, 'y': 0, 'z': 0}
+            )
+            scene_event = ai2thor.server.Event(metadata={
+                'screenWidth': 600,
+                'screenHeight': 400,
+                'objects': [],
+                'structuralObjects': [rotating_ramp],
+                'agent': {'position': {'x': 0, 'y': 0, 'z': 0},
+                          'rotation': {'x': 0, 'y': 0, 'z': 0}}
+            })
+            img = self.plotter.plot_array(scene_event, step_number)
+            np.testing.assert_array_equal(
+                img, self.plot_without_cache(scene_event, step_number))
+            signatures.append(self.plotter._object_drawings['ramp_1'][0])
+        # Redrawn whenever its height or rotation changes, even if its
+        # footprint doesn't.
+        self.assertEqual(signatures[0], signatures[1])
+        self.assertNotEqual(signatures[1], signatures[2])
+        self.assertNotEqual(signatures[2], signatures[3])
+        self.assertEqual(signatures[2][0], signatures[3][0])
+        self.assertIn('ramp_1', self.plotter._moved_ids)
+
+    def test_plot_array_reuses_static_layer(self):
+        wall = self.create_box('wall_1', -3, 2)
+        for step_number in range(3):
+            scene_event = ai2thor.server.Event(metadata={
+                'screenWidth': 600,
+                'screenHeight': 400,
+                'objects': [self.create_box('ball', step_number, 0)],
+                'structuralObjects': [wall],
+                'agent': {'position': {'x': 0, 'y': 0, 'z': 0},
+                          'rotation': {'x': 0, 'y': 0, 'z': 0}}
+            })
+            self.plotter.plot_array(scene_event, step_number)
+            if step_number == 0:
+                static_layer = self.plotter._static_layer
+            self.assertIs(self.plotter._static_layer, static_layer)
+        self.assertEqual(self.plotter._static_layer_key[0][0], 'wall_1')
+
     def test_calculate_heading_zero_degrees(self):
         heading = self.plotter._calculate_heading(
             0, TopDownPlotter.HEADING_LENGTH)
@@ -1,13 +1,17 @@
 import json
 import pathlib
 import random
+import threading
 import unittest
 from typing import Tuple
+from unittest.mock import MagicMock
 
+import numpy
 import PIL
 
 from machine_common_sense.recorder import (BaseRecorder, ImageRecorder,
-                                           JsonRecorder, VideoRecorder)
+                                           JsonRecorder, QueueFullPolicy,
+                                           VideoRecorder)
 
 
 class ConcreteBaseRecorder(BaseRecorder):
@@ -55,6 +59,111 @@ class TestBaseRecorder(unittest.TestCase):
         self.assertEqual(self.recorder.num_recorded, 0)
 
 
+class BlockingRecorder(BaseRecorder):
+    '''Test recorder whose writes wait until released'''
+
+    def __init__(self, **kwargs):
+        super().__init__(**kwargs)
+        self.started = threading.Event()
+        self.release = threading.Event()
+        self.items = []
+
+    def _write(self, item):
+        self.started.set()
+        self.release.wait(timeout=5)
+        if item == 'error':
+            raise ValueError('bad item')
+        self.items.append(item)
+
+
+class TestBaseRecorderQueue(unittest.TestCase):
+
+    def test_written_without_polling(self):
+        recorder = BlockingRecorder()
+        recorder.release.set()
+        recorder.start()
+        recorder.add('item')
+        # The write thread wakes up as soon as the item is added.
+        self.assertTrue(recorder.started.wait(timeout=0.5))
+        recorder.finish()
+        self.assertEqual(recorder.items, ['item'])
+        self.assertFalse(recorder._thread.is_alive())
+
+    def test_drop_when_full(self):
+        recorder = BlockingRecorder(
+            max_queue_size=1, queue_full_policy=QueueFullPolicy.DROP)
+        recorder.start()
+        recorder.add(1)
+        self.assertTrue(recorder.started.wait(timeout=5))
+        recorder.add(2)
+        recorder.add(3)
+        self.assertEqual(recorder.num_dropped, 1)
+        recorder.release.set()
+        recorder.finish()
+        self.assertEqual(recorder.items, [1, 2])
+        self.assertEqual(recorder.num_recorded, 2)
+
+    def test_block_when_full(self):
+        recorder = BlockingRecorder(max_queue_size=1, timeout=0.1)
+        recorder.start()
+        recorder.add(1)
+        self.assertTrue(recorder.started.wait(timeout=5))
+        recorder.add(2)
+        # Gives up after the timeout.
+        recorder.add(3)
+        self.assertEqual(recorder.num_dropped, 1)
+
+        added = threading.Event()
+
+        def add():
+            recorder.timeout = None
+            recorder.add(4)
+            added.set()
+
+        thread = threading.Thread(target=add)
+        thread.start()
+        self.assertFalse(added.wait(timeout=0.2))
+        recorder.release.set()
+        self.assertTrue(added.wait(timeout=5))
+        thread.join()
+        recorder.finish()
+        self.assertEqual(recorder.items, [1, 2, 4])
+
+    def test_write_error(self):
+        recorder = BlockingRecorder()
+        recorder.release.set()
+        recorder.start()
+        recorder.add('error')
+        recorder.add('item')
+        with self.assertRaises(ValueError):
+            recorder.finish()
+        # Later items are still written.
+        self.assertEqual(recorder.items, ['item'])
+        self.assertEqual(recorder.num_recorded, 1)
+        self.assertEqual(recorder.get_metrics()['num_failed'], 1)
+
+    def test_get_metrics(self):
+        recorder = BlockingRecorder(
+            max_queue_size=1, queue_full_policy='drop')
+        recorder.start()
+        recorder.add(1)
+        self.assertTrue(recorder.started.wait(timeout=5))
+        recorder.add(2)
+        recorder.add(3)
+        metrics = recorder.get_metrics()
+        self.assertEqual(metrics['queue_depth'], 1)
+        self.assertEqual(metrics['max_queue_depth'], 1)
+        self.assertEqual(metrics['num_dropped'], 1)
+        recorder.release.set()
+        recorder.finish()
+        metrics = recorder.get_metrics()
+        self.assertEqual(metrics['queue_depth'], 0)
+        self.assertEqual(metrics['num_recorded'], 2)
+        self.assertGreater(metrics['write_time_average'], 0)
+        self.assertGreaterEqual(metrics['write_time_max'],
+                                metrics['write_time_average'])
+
+
 class TestJsonRecorder(unittest.TestCase):
     json_prefix = "test_json_"
     test_json_file = pathlib.Path("tests/test_json_{:04d}.json")
@@ -111,6 +220,18 @@ class TestJsonRecorder(unittest.TestCase):
             actual = json.load(json_file)
         self.assertEqual(actual, data3)
 
+    def test_write_error_keeps_file_index(self):
+        self.recorder.add({'unserializable': object()})
+        self.recorder.add(self.test_data())
+        with self.assertRaises(TypeError):
+            self.recorder.finish()
+        # The failed item's file name isn't reused.
+        output_file = pathlib.Path("tests/test_json_0001.json")
+        with open(output_file, 'r') as json_file:
+            self.assertEqual(json.load(json_file), self.test_data())
+        self.assertEqual(self.recorder.num_recorded, 1)
+        self.assertEqual(self.recorder.num_failed, 1)
+
     def test_missing_folder(self):
         '''ImageRecorder requires existing path'''
         bad_recorder = JsonRecorder(
@@ -271,8 +392,9 @@ class TestVideoRecorder(unittest.TestCase):
         size = (50, 100)
         img = PIL.Image.new("RGB", size)
         self.recorder.add(img)
-        self.assertFalse(self.recorder._queue.empty())
         self.assertIsNotNone(self.recorder.writer)
+        self.recorder.flush()
+        self.assertEqual(self.recorder.num_recorded, 1)
 
     def test_add_flush(self):
         size = (50, 100)
@@ -280,7 +402,6 @@ class TestVideoRecorder(unittest.TestCase):
         self.recorder.add(img)
         self.recorder.add(img)
         self.recorder.add(img)
-        self.assertFalse(self.recorder._queue.empty())
         self.recorder.flush()
         self.assertEqual(self.recorder.num_recorded, 3)
         self.assertTrue(self.recorder.recording)
@@ -297,6 +418,40 @@ class TestVideoRecorder(unittest.TestCase):
         self.assertTrue(self.recorder._queue.empty())
         self.assertEqual(self.recorder.num_recorded, nframes)
 
+    def test_add_numpy_frames(self):
+        rgb = numpy.zeros((100, 50, 3), dtype=numpy.uint8)
+        rgb[:, :, 0] = 255
+        self.recorder.add(rgb)
+        self.assertEqual((self.recorder.width, self.recorder.height),
+                         (50, 100))
+        self.recorder.writer = MagicMock()
+        bgr = numpy.zeros((100, 50, 3), dtype=numpy.uint8)
+        bgr[:, :, 2] = 255
+        self.recorder.add(bgr, bgr=True)
+        gray = numpy.full((100, 50), 7, dtype=numpy.uint8)
+        self.recorder.add(gray)
+        self.recorder.add(PIL.Image.fromarray(rgb))
+        self.recorder.flush()
+        self.assertEqual(self.recorder.num_recorded, 4)
+
+        written = [call.args[0]
+                   for call in self.recorder.writer.write.call_args_list]
+        # Every frame is written as BGR.
+        for frame in (written[0], written[1], written[3]):
+            self.assertEqual(frame.shape, (100, 50, 3))
+            self.assertTrue((frame[:, :, 2] == 255).all())
+            self.assertTrue((frame[:, :, 0] == 0).all())
+        # BGR frames are written without a copy.
+        self.assertIs(written[1], bgr)
+        self.assertEqual(written[2].shape, (100, 50, 3))
+        self.assertTrue((written[2] == 7).all())
+
+    def test_wrong_size_numpy_frame(self):
+        self.recorder.add(numpy.zeros((100, 50, 3), dtype=numpy.uint8))
+        with self.assertRaises(ValueError):
+            self.recorder.add(numpy.zeros((50, 100, 3), dtype=numpy.uint8))
+        self.recorder.finish()
+
     def test_wrong_size_frame(self):
         # the first frame established the video recorder size
         size = (50, 100)
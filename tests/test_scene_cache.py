@@ -0,0 +1,119 @@
+import json
+import os
+import pickle
+import shutil
+import tempfile
+import unittest
+from unittest.mock import patch
+
+from machine_common_sense.config_manager import SceneConfiguration
+from machine_common_sense.scene_cache import (CachedScene, SceneCache,
+                                              create_scene_pack,
+                                              hash_scene_content)
+
+SCENE_DATA = {
+    'name': 'test_scene',
+    'objects': [{
+        'id': 'ball',
+        'type': 'sphere',
+        'shows': [{'stepBegin': 0, 'position': {'x': 1, 'y': 0, 'z': 2}}]
+    }]
+}
+
+
+class TestSceneCache(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.scene_file = self.write_scene('scene.json', SCENE_DATA)
+        self.cache = SceneCache()
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def write_scene(self, filename, scene_data):
+        scene_file = os.path.join(self.directory, filename)
+        with open(scene_file, 'w') as scene_file_object:
+            json.dump(scene_data, scene_file_object)
+        return scene_file
+
+    def test_get(self):
+        scene = self.cache.get(self.scene_file)
+        self.assertIsInstance(scene, CachedScene)
+        self.assertIsInstance(scene.scene_config, SceneConfiguration)
+        self.assertEqual(scene.scene_config.name, 'test_scene')
+        self.assertEqual(
+            scene.unity_config, scene.scene_config.get_unity_config())
+        self.assertEqual(scene.unity_config['objects'][0]['shows'][0][
+            'stepBegin'], 0)
+        with open(self.scene_file, 'rb') as scene_file_object:
+            self.assertEqual(
+                scene.content_hash,
+                hash_scene_content(scene_file_object.read()))
+        self.assertEqual((self.cache.hits, self.cache.misses), (0, 1))
+
+    def test_get_cached(self):
+        scene = self.cache.get(self.scene_file)
+        with patch('machine_common_sense.scene_cache.open') as mock_open:
+            self.assertIs(self.cache.get(self.scene_file), scene)
+            # Unmodified files aren't read again.
+            mock_open.assert_not_called()
+        # Files with the same content share a cache entry.
+        other_file = self.write_scene('other.json', SCENE_DATA)
+        self.assertIs(self.cache.get(other_file), scene)
+        self.assertEqual((self.cache.hits, self.cache.misses), (2, 1))
+        self.assertEqual(len(self.cache), 1)
+
+    def test_get_modified(self):
+        scene = self.cache.get(self.scene_file)
+        self.write_scene('scene.json', {**SCENE_DATA, 'name': 'modified!'})
+        modified = self.cache.get(self.scene_file)
+        self.assertIsNot(modified, scene)
+        self.assertEqual(modified.scene_config.name, 'modified!')
+
+    def test_max_size(self):
+        cache = SceneCache(max_size=1)
+        scene = cache.get(self.scene_file)
+        other_file = self.write_scene('other.json', {'name': 'other'})
+        cache.get(other_file)
+        self.assertEqual(len(cache), 1)
+        self.assertIsNot(cache.get(self.scene_file), scene)
+        self.assertEqual(cache.misses, 3)
+
+    def test_scene_pack(self):
+        other_file = self.write_scene('other.json', {'name': 'other'})
+        pack_file = os.path.join(self.directory, 'scenes.pack')
+        self.assertEqual(
+            create_scene_pack([self.scene_file, other_file], pack_file), 2)
+
+        self.assertEqual(self.cache.load_pack(pack_file), 2)
+        self.assertEqual(len(self.cache), 2)
+        scene = self.cache.get(self.scene_file)
+        self.assertEqual(scene.scene_config.name, 'test_scene')
+        self.assertEqual(self.cache.misses, 0)
+        # Packed scenes are used even if their files are gone.
+        os.remove(other_file)
+        self.assertEqual(
+            self.cache.get(other_file).scene_config.name, 'other')
+        with self.assertRaises(FileNotFoundError):
+            self.cache.get(os.path.join(self.directory, 'missing.json'))
+
+    def test_scene_pack_modified_file(self):
+        pack_file = os.path.join(self.directory, 'scenes.pack')
+        create_scene_pack([self.scene_file], pack_file)
+        self.write_scene('scene.json', {**SCENE_DATA, 'name': 'modified!'})
+        self.cache.load_pack(pack_file)
+        self.assertEqual(
+            self.cache.get(self.scene_file).scene_config.name, 'modified!')
+
+    def test_scene_pack_wrong_version(self):
+        pack_file = os.path.join(self.directory, 'scenes.pack')
+        with open(pack_file, 'wb') as pack_file_object:
+            pickle.dump({'format': 1, 'version': '0.0.1', 'scenes': []},
+                        pack_file_object)
+        with self.assertRaises(ValueError):
+            self.cache.load_pack(pack_file)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -3,9 +3,11 @@ import unittest
 import numpy as np
 import PIL
 
+from machine_common_sense.frame_list import FrameList, frame_to_image
 from machine_common_sense.goal_metadata import GoalMetadata
 from machine_common_sense.object_metadata import ObjectMetadata
-from machine_common_sense.serializer import ISerializer, SerializerMsgPack
+from machine_common_sense.serializer import (ISerializer, SerializerMsgPack,
+                                             SerializerMsgPackBinary)
 from machine_common_sense.step_metadata import StepMetadata
 
 
@@ -131,6 +133,17 @@ class TestSerializerMsgPack(unittest.TestCase):
         self.assertEqual(np_exttype.code, 6)
         self.assertIsInstance(np_exttype.data, bytes)
 
+    def test_serialize_with_frame_list(self):
+        frame = np.zeros((2, 3, 3), dtype=np.uint8)
+        step_metadata = StepMetadata(
+            image_list=FrameList([frame, frame], frame_to_image))
+        packed_bytes = self.serializer.serialize(step_metadata)
+        unpacked_step_metadata = self.serializer.deserialize(packed_bytes)
+        self.assertEqual(len(unpacked_step_metadata.image_list), 2)
+        self.assertIsInstance(
+            unpacked_step_metadata.image_list[0], PIL.Image.Image)
+        self.assertEqual(unpacked_step_metadata.image_list[0].size, (3, 2))
+
     def test_ext_unpack_with_stepmetadata(self):
         # from default StepMetadata()
         test_data = (
@@ -195,8 +208,8 @@ class TestSerializerMsgPack(unittest.TestCase):
             code=5, data=obj_data)
         self.assertIsInstance(unpacked_objectmetadata, ObjectMetadata)
         self.assertEqual(
-            unpacked_objectmetadata.__dict__,
-            ObjectMetadata().__dict__)
+            dict(unpacked_objectmetadata),
+            dict(ObjectMetadata()))
 
     def test_ext_unpack_with_ndarray(self):
         # from [0. 0. 0. 0. 0. 0. 0. 0. 0. 0.]
@@ -214,5 +227,102 @@ class TestSerializerMsgPack(unittest.TestCase):
         self.assertEqual(unpacked_ndarray.size, 10)
 
 
+class TestSerializerMsgPackBinary(unittest.TestCase):
+
+    def setUp(self):
+        self.serializer = SerializerMsgPackBinary
+        self.image = PIL.Image.fromarray(
+            np.arange(2 * 40 * 30 * 3, dtype=np.uint8).reshape(40, 60, 3))
+        self.depth_map = np.linspace(
+            0, 15, 40 * 60, dtype=np.float32).reshape(40, 60)
+        self.step_metadata = StepMetadata(
+            action_list=[('Pass', {})],
+            depth_map_list=[self.depth_map],
+            goal=GoalMetadata(category='retrieval', metadata={'a': 1}),
+            image_list=[self.image],
+            object_list=[ObjectMetadata(uuid='object_1', visible=True)],
+            object_mask_list=[self.image.convert('L')],
+            step_number=3
+        )
+
+    def assert_step_metadata(self, unpacked):
+        self.assertIsInstance(unpacked, StepMetadata)
+        self.assertEqual(unpacked.action_list, [('Pass', {})])
+        self.assertEqual(unpacked.goal.metadata, {'a': 1})
+        self.assertEqual(unpacked.step_number, 3)
+        self.assertEqual(unpacked.object_list[0].uuid, 'object_1')
+        self.assertTrue(unpacked.object_list[0].visible)
+        np.testing.assert_array_equal(
+            np.asarray(unpacked.image_list[0]), np.asarray(self.image))
+        self.assertEqual(unpacked.object_mask_list[0].mode, 'L')
+        np.testing.assert_array_equal(
+            np.asarray(unpacked.object_mask_list[0]),
+            np.asarray(self.image.convert('L')))
+        np.testing.assert_array_equal(
+            unpacked.depth_map_list[0], self.depth_map)
+
+    def test_version(self):
+        self.assertEqual(SerializerMsgPackBinary.version(), "0.2.0")
+        self.assertEqual(SerializerMsgPack.version(), "0.1.0")
+
+    def test_round_trip(self):
+        packed_bytes = self.serializer.serialize(self.step_metadata)
+        self.assertLess(
+            len(packed_bytes),
+            len(SerializerMsgPack.serialize(self.step_metadata)))
+        unpacked = self.serializer.deserialize(packed_bytes)
+        self.assert_step_metadata(unpacked)
+        depth_map = unpacked.depth_map_list[0]
+        self.assertEqual(depth_map.dtype, np.float32)
+        # Arrays are built on the unpacked buffer without copying it.
+        self.assertFalse(depth_map.flags.writeable)
+        self.assertFalse(depth_map.flags.owndata)
+
+    def test_round_trip_with_compression(self):
+        packed_bytes = SerializerMsgPackBinary.serialize(
+            self.step_metadata, compression='zlib')
+        self.assertLess(
+            len(packed_bytes),
+            len(SerializerMsgPackBinary.serialize(self.step_metadata)))
+        self.assert_step_metadata(
+            SerializerMsgPackBinary.deserialize(packed_bytes))
+
+    def test_static_methods(self):
+        # Like SerializerMsgPack, it works with or without an instance.
+        packed_bytes = SerializerMsgPackBinary.serialize(self.step_metadata)
+        self.assertEqual(
+            SerializerMsgPackBinary().serialize(self.step_metadata),
+            packed_bytes)
+        self.assert_step_metadata(
+            SerializerMsgPackBinary().deserialize(packed_bytes))
+
+    def test_deserialize_version_0_1_0(self):
+        packed_bytes = SerializerMsgPack.serialize(self.step_metadata)
+        self.assert_step_metadata(self.serializer.deserialize(packed_bytes))
+
+    def test_serialize_with_frame_list(self):
+        frame = np.zeros((2, 3, 3), dtype=np.uint8)
+        step_metadata = StepMetadata(
+            image_list=FrameList([frame, frame], frame_to_image))
+        unpacked = self.serializer.deserialize(
+            self.serializer.serialize(step_metadata))
+        self.assertEqual(len(unpacked.image_list), 2)
+        self.assertEqual(unpacked.image_list[0].size, (3, 2))
+
+    def test_ext_pack_with_ndarray(self):
+        np_exttype = self.serializer._ext_pack(np.zeros((2, 5), dtype=int))
+        self.assertEqual(np_exttype.code, 7)
+        array = self.serializer._ext_unpack(np_exttype.code, np_exttype.data)
+        np.testing.assert_array_equal(array, np.zeros((2, 5)))
+        # Object arrays are still serialized as lists.
+        np_exttype = self.serializer._ext_pack(np.array(['a'], dtype=object))
+        self.assertEqual(np_exttype.code, 6)
+
+    def test_unsupported_compression(self):
+        with self.assertRaises(ValueError):
+            SerializerMsgPackBinary.serialize(
+                self.step_metadata, compression='unknown')
+
+
 if __name__ == '__main__':
     unittest.main()
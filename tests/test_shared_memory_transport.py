@@ -0,0 +1,190 @@
+import multiprocessing
+import sys
+import threading
+import unittest
+
+import numpy as np
+import PIL
+
+from machine_common_sense.frame_list import FrameList, frame_to_image
+from machine_common_sense.goal_metadata import GoalMetadata
+from machine_common_sense.step_metadata import StepMetadata
+
+if sys.version_info >= (3, 8):
+    from machine_common_sense.shared_memory_transport import (
+        _READ_INDEX, _WRITE_INDEX, SharedMemoryStepConsumer,
+        SharedMemoryStepPublisher)
+
+
+def create_step(step_number, width=6, height=4):
+    image = np.full((height, width, 3), step_number, dtype=np.uint8)
+    mask = np.full((height, width, 3), 255 - step_number, dtype=np.uint8)
+    depth = np.full((height, width), step_number / 2, dtype=np.float32)
+    return StepMetadata(
+        action_list=[('Pass', {})],
+        goal=GoalMetadata(metadata={'category': 'retrieval'}),
+        image_list=FrameList([image], frame_to_image),
+        depth_map_list=[depth],
+        object_mask_list=FrameList([mask], frame_to_image),
+        return_status='SUCCESSFUL',
+        step_number=step_number
+    )
+
+
+def publish_steps(name, count):
+    # Run in a separate process.
+    publisher = SharedMemoryStepPublisher(name, slot_count=2, slot_size=4096)
+    try:
+        for step_number in range(count):
+            publisher.publish(create_step(step_number), timeout=10)
+        # Wait for the consumer to receive every step before unlinking.
+        publisher._wait(
+            lambda: publisher._get(_READ_INDEX) >= count - 1, 10, 0.001)
+    finally:
+        publisher.close()
+
+
+@unittest.skipIf(sys.version_info < (3, 8), 'Requires python 3.8')
+class TestSharedMemoryTransport(unittest.TestCase):
+
+    def setUp(self):
+        self.publisher = SharedMemoryStepPublisher(
+            slot_count=2, slot_size=4096)
+        self.consumer = SharedMemoryStepConsumer(self.publisher.name)
+
+    def tearDown(self):
+        self.consumer.close()
+        if self.publisher._control is not None:
+            self.publisher.close()
+
+    def test_publish_and_receive(self):
+        self.assertEqual(self.publisher.publish(create_step(3)), 0)
+        output = self.consumer.receive(timeout=1)
+        self.assertIsInstance(output, StepMetadata)
+        self.assertEqual(output.step_number, 3)
+        self.assertEqual(output.return_status, 'SUCCESSFUL')
+        self.assertEqual(output.action_list, [('Pass', {})])
+        self.assertEqual(output.goal.metadata, {'category': 'retrieval'})
+
+        image, = output.image_list.as_arrays()
+        np.testing.assert_array_equal(image, np.full((4, 6, 3), 3))
+        self.assertFalse(image.flags.writeable)
+        # Views of the shared memory, not copies.
+        self.assertFalse(image.flags.owndata)
+        self.assertIsInstance(output.image_list[0], PIL.Image.Image)
+        mask, = output.object_mask_list.as_arrays()
+        np.testing.assert_array_equal(mask, np.full((4, 6, 3), 252))
+        depth = output.depth_map_list[0]
+        self.assertEqual(depth.dtype, np.float32)
+        np.testing.assert_array_equal(depth, np.full((4, 6), 1.5))
+        self.assertFalse(depth.flags.writeable)
+
+    def test_receive_in_order(self):
+        for step_number in range(5):
+            self.publisher.publish(create_step(step_number), timeout=1)
+            output = self.consumer.receive(timeout=1)
+            self.assertEqual(output.step_number, step_number)
+            np.testing.assert_array_equal(
+                output.image_list.as_arrays()[0], step_number)
+
+    def test_receive_timeout(self):
+        with self.assertRaises(TimeoutError):
+            self.consumer.receive(timeout=0.01)
+
+    def test_receive_waits_for_slot_header(self):
+        self.publisher.publish(create_step(0), timeout=1)
+        # As if the write index were seen before the slot's header.
+        self.publisher._set(_WRITE_INDEX, 2)
+        self.assertEqual(self.consumer.receive(timeout=1).step_number, 0)
+        with self.assertRaises(TimeoutError):
+            self.consumer.receive(timeout=0.01)
+
+    def test_publish_backpressure(self):
+        self.publisher.publish(create_step(0), timeout=1)
+        self.publisher.publish(create_step(1), timeout=1)
+        # Both slots are unreceived.
+        with self.assertRaises(TimeoutError):
+            self.publisher.publish(create_step(2), timeout=0.01)
+        # The first received step's slot is released on the next receive.
+        self.assertEqual(self.consumer.receive(timeout=1).step_number, 0)
+        with self.assertRaises(TimeoutError):
+            self.publisher.publish(create_step(2), timeout=0.01)
+
+        published = threading.Event()
+
+        def publish():
+            self.publisher.publish(create_step(2), timeout=5)
+            published.set()
+
+        thread = threading.Thread(target=publish)
+        thread.start()
+        self.assertFalse(published.wait(timeout=0.05))
+        self.assertEqual(self.consumer.receive(timeout=1).step_number, 1)
+        self.assertTrue(published.wait(timeout=5))
+        thread.join()
+        self.assertEqual(self.consumer.receive(timeout=1).step_number, 2)
+
+    def test_publish_too_large(self):
+        with self.assertRaises(ValueError):
+            self.publisher.publish(create_step(0, width=60, height=40))
+
+    def test_close(self):
+        self.publisher.publish(create_step(0))
+        self.publisher.close(unlink=False)
+        self.assertEqual(self.consumer.receive(timeout=1).step_number, 0)
+        self.assertIsNone(self.consumer.receive(timeout=1))
+        self.consumer._memory.unlink()
+
+    def test_close_with_frames_in_use(self):
+        self.publisher.publish(create_step(5))
+        output = self.consumer.receive(timeout=1)
+        image, = output.image_list.as_arrays()
+        with self.assertRaises(BufferError):
+            self.consumer.close()
+        # The frames are still readable after the failed close.
+        np.testing.assert_array_equal(image, np.full((4, 6, 3), 5))
+        self.assertIsInstance(output.image_list[0], PIL.Image.Image)
+        del image, output
+        self.consumer.close()
+
+    def test_consumer_wrong_memory(self):
+        memory = multiprocessing.shared_memory.SharedMemory(
+            create=True, size=128)
+        try:
+            with self.assertRaises(ValueError):
+                SharedMemoryStepConsumer(memory.name)
+        finally:
+            memory.close()
+            memory.unlink()
+
+    def test_separate_process(self):
+        self.consumer.close()
+        self.publisher.close()
+        name = self.publisher.name
+        process = multiprocessing.get_context('spawn').Process(
+            target=publish_steps, args=(name, 4))
+        process.start()
+        try:
+            consumer = None
+            for _ in range(500):
+                try:
+                    consumer = SharedMemoryStepConsumer(name)
+                    break
+                except (FileNotFoundError, ValueError):
+                    process.join(timeout=0.01)
+            self.assertIsNotNone(consumer)
+            self.consumer = consumer
+            step_numbers = []
+            for _ in range(4):
+                output = consumer.receive(timeout=10)
+                step_numbers.append(output.step_number)
+                np.testing.assert_array_equal(
+                    output.image_list.as_arrays()[0], output.step_number)
+            self.assertEqual(step_numbers, [0, 1, 2, 3])
+        finally:
+            process.join(timeout=10)
+        self.assertEqual(process.exitcode, 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
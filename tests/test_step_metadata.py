@@ -257,6 +257,17 @@ class TestStepMetadata(unittest.TestCase):
         self.assertIsInstance(
             self.step_metadata.triggered_by_sequence_incorrect, bool)
 
+    def test_iter(self):
+        data = mcs.StepMetadata(holes=[(1, 2)], lava=[(0, 0, 1, 1)])
+        output = dict(data)
+        self.assertEqual(
+            list(output), list(mcs.StepMetadata.COPIED_PROPERTIES))
+        for key in mcs.StepMetadata.FRAME_PROPERTIES:
+            self.assertNotIn(key, output)
+        self.assertEqual(output['holes'], [(1, 2)])
+        self.assertEqual(output['lava'], [(0, 0, 1, 1)])
+        self.assertEqual(output['goal'], dict(data.goal))
+
     def test_copy_without_depth_or_images(self):
         data = mcs.StepMetadata(
             action_list=['action_1', 'action_2'],
@@ -337,11 +348,20 @@ class TestStepMetadata(unittest.TestCase):
         self.assertEqual(copy.object_mask_list, [])
         # Assert are not the same instances
         self.assertNotEqual(data.goal, copy.goal)
-        self.assertNotEqual(data.object_list, copy.object_list)
-        self.assertNotEqual(
+        self.assertIsNot(data.goal.metadata, copy.goal.metadata)
+        self.assertIsNot(data.object_list, copy.object_list)
+        self.assertIsNot(
             data.structural_object_list,
             copy.structural_object_list
         )
+        self.assertIsNot(data.position, copy.position)
+        self.assertIsInstance(copy.object_list, mcs.ObjectList)
+        # Assert the list items are shared rather than deep copied
+        self.assertIs(data.object_list[0], copy.object_list[0])
+        copy.object_list.append(mcs.ObjectMetadata(uuid='object_3'))
+        copy.position['x'] = 5
+        self.assertEqual(len(data.object_list), 2)
+        self.assertEqual(data.position, {'x': 1, 'z': 2})
         self.assertEqual(
             data.triggered_by_sequence_incorrect,
             copy.triggered_by_sequence_incorrect
@@ -1,10 +1,18 @@
+import hashlib
+import io
+import os
 import shutil
+import tarfile
 import unittest
 from pathlib import Path
+from unittest.mock import MagicMock, patch
 from zipfile import ZIP_DEFLATED, ZipFile
 
+import requests
+
 from machine_common_sense.unity_executable_provider import (
-    AbstractExecutionCache, Downloader, UnityExecutableProvider)
+    MIRROR_ENV_VAR, AbstractExecutionCache, Downloader,
+    UnityExecutableProvider)
 
 TEST_TMP = "./tmp"
 TEST_CACHE_LOCATION = "./tmp/.mcs-test"
@@ -87,6 +95,134 @@ class TestUnityExecutableProvider(unittest.TestCase):
         self.assertFalse(result1.exists())
         self.assertFalse(result1.parent.exists())
 
+    def test_add_zip_to_cache_with_gz_files(self):
+        self.cache.GZ_FILES = ["data.tar.gz"]
+        tar_gz = Path(TEST_TMP) / "data.tar.gz"
+        with tarfile.open(tar_gz, "w:gz") as tar:
+            for index in range(3):
+                data = f"data {index}".encode()
+                info = tarfile.TarInfo(f"data/file_{index}.txt")
+                info.size = len(data)
+                tar.addfile(info, io.BytesIO(data))
+        with ZipFile(TEST_ZIP, 'w', ZIP_DEFLATED) as zip:
+            zip.write(Path(TEST_TMP) / self.cache.EXECUTABLE_FILE,
+                      self.cache.EXECUTABLE_FILE)
+            zip.write(tar_gz, "data.tar.gz")
+            for index in range(20):
+                zip.writestr(f"nested/dir_{index % 3}/file_{index}.txt",
+                             f"file {index}" * index)
+
+        result = self.provider.get_executable("test")
+        ver_dir = result.parent
+        self.assertTrue(result.exists())
+        for index in range(20):
+            self.assertEqual(
+                (ver_dir / f"nested/dir_{index % 3}/file_{index}.txt")
+                .read_text(), f"file {index}" * index)
+        for index in range(3):
+            self.assertEqual(
+                (ver_dir / f"data/file_{index}.txt").read_text(),
+                f"data {index}")
+        self.assertFalse((ver_dir / "data.tar.gz").exists())
+        self.assertTrue((ver_dir / self.cache.TIMESTAMP_FILE).exists())
+
+    def test_mirror(self):
+        with patch.dict(os.environ, {MIRROR_ENV_VAR: "file:///mirror/"}):
+            provider = UnityExecutableProvider()
+        self.assertEqual(
+            provider._downloader.get_url("1.0"),
+            "file:///mirror/" + Downloader().get_url("1.0").split("/")[-1])
+
+
+class TestDownloader(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = Path(TEST_TMP)
+        self.source = self.tmp / "source" / "release.zip"
+        self.source.parent.mkdir(parents=True)
+        self.data = os.urandom(3 * 1024 * 1024 + 17)
+        self.source.write_bytes(self.data)
+        self.dest = self.tmp / "dest"
+        self.dest.mkdir()
+        self.downloader = Downloader()
+
+    def tearDown(self):
+        shutil.rmtree(TEST_TMP)
+
+    def test_download_local_path(self):
+        file = self.downloader.download(
+            self.source.as_posix(), "release.zip", self.dest)
+        self.assertEqual(file, self.dest / "release.zip")
+        self.assertEqual(file.read_bytes(), self.data)
+        self.assertEqual(os.listdir(self.dest), ["release.zip"])
+
+    def test_download_file_url(self):
+        file = self.downloader.download(
+            self.source.resolve().as_uri(), "release.zip", self.dest)
+        self.assertEqual(file.read_bytes(), self.data)
+
+    def test_download_resume(self):
+        part_file = self.dest / "release.zip.part"
+        part_file.write_bytes(self.data[:1000])
+        file = self.downloader.download(
+            self.source.as_posix(), "release.zip", self.dest)
+        self.assertEqual(file.read_bytes(), self.data)
+        self.assertFalse(part_file.exists())
+
+    def test_download_checksum(self):
+        checksum = hashlib.sha256(self.data).hexdigest()
+        Path(self.source.as_posix() + ".sha256").write_text(
+            f"{checksum}  release.zip\n")
+        self.assertEqual(
+            self.downloader.get_checksum(self.source.as_posix()), checksum)
+        file = self.downloader.download(
+            self.source.as_posix(), "release.zip", self.dest)
+        self.assertEqual(file.read_bytes(), self.data)
+
+        with self.assertRaises(Exception):
+            self.downloader.download(
+                self.source.as_posix(), "other.zip", self.dest,
+                checksum="0" * 64)
+        self.assertFalse((self.dest / "other.zip").exists())
+        self.assertFalse((self.dest / "other.zip.part").exists())
+
+    def test_download_http_resume(self):
+        def response(status_code, data, headers):
+            r = MagicMock(status_code=status_code, headers=headers)
+            r.__enter__.return_value = r
+            r.iter_content.return_value = [data[:100], data[100:]]
+            return r
+
+        first = response(200, self.data[:2000], {
+            "Content-Length": str(len(self.data)),
+            "ETag": '"v1"'
+        })
+        second = response(206, self.data[2000:], {
+            "Content-Length": str(len(self.data) - 2000)
+        })
+        url = "https://example.com/release.zip"
+        with patch("requests.get", side_effect=[
+            MagicMock(status_code=404), first, second
+        ]) as get:
+            file = self.downloader.download(url, "release.zip", self.dest)
+        self.assertEqual(file.read_bytes(), self.data)
+        # The checksum, then the interrupted download, then the rest.
+        self.assertEqual(get.call_args_list[0].args[0], url + ".sha256")
+        self.assertEqual(get.call_args_list[1].kwargs["headers"], {})
+        self.assertEqual(get.call_args_list[2].kwargs["headers"], {
+            "Range": "bytes=2000-",
+            "If-Range": '"v1"'
+        })
+
+    def test_download_http_failure(self):
+        with patch("requests.get",
+                   side_effect=requests.ConnectionError("down")):
+            with self.assertRaises(requests.ConnectionError):
+                self.downloader.download(
+                    "https://example.com/release.zip", "release.zip",
+                    self.dest)
+        self.assertFalse((self.dest / "release.zip").exists())
+
 
 if __name__ == '__main__':
     unittest.main()
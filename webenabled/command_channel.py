@@ -0,0 +1,130 @@
+#
+# Request/response channel between the web interface (MCSInterface) and the
+# MCS controller subprocess (run_scene_with_dir), so each command is sent
+# directly to the controller and its output comes straight back, rather
+# than both sides polling files in shared directories.
+#
+# The channel is a Unix domain socket (a named pipe on Windows) with a
+# random auth key.  MCSInterface is pickled into the Flask session, so it
+# only keeps the channel's address and key, and connects once per command.
+#
+import logging
+import os
+import sys
+import tempfile
+import time
+from multiprocessing import AuthenticationError
+from multiprocessing.connection import Client, Listener
+from typing import Callable, Dict
+
+# Passed to the controller subprocess in its environment, rather than on its
+# command line, so it isn't visible to other users.
+AUTHKEY_ENV_VAR = 'MCS_COMMAND_CHANNEL_AUTHKEY'
+CONNECT_RETRY_INTERVAL = 0.05
+# Blank lines are ignored in command files, so a blank command does nothing
+# except wait for the controller subprocess to be ready.
+PING_COMMAND = ''
+# Ends the current scene and removes its output, so the controller can be
+# reused by another session (see subprocess_pool).
+RESET_COMMAND = '__reset__'
+# Returns the last command handled and its response, once it's finished,
+# for a client that timed out waiting for that response.
+LAST_OUTPUT_COMMAND = '__last_output__'
+
+logger = logging.getLogger('command_channel')
+
+
+class CommandChannelError(Exception):
+    pass
+
+
+class CommandTimeoutError(CommandChannelError):
+    '''The command was sent, but its response didn't arrive in time.'''
+    pass
+
+
+def create_address(suffix: str) -> str:
+    '''Return a new channel address for the given session suffix.'''
+    if sys.platform == 'win32':
+        return rf'\\.\pipe\mcs_{suffix}'
+    # Use the temp directory, since socket paths have a short max length.
+    return os.path.join(tempfile.gettempdir(), f'mcs_{suffix}.sock')
+
+
+def create_authkey() -> str:
+    return os.urandom(16).hex()
+
+
+def remove_address(address: str) -> None:
+    '''Remove the socket file at the given address, if any.'''
+    if sys.platform != 'win32' and os.path.exists(address):
+        os.unlink(address)
+
+
+def get_authkey_from_env() -> str:
+    return os.environ.get(AUTHKEY_ENV_VAR, '')
+
+
+def send_command(address: str, authkey: str, command: str, timeout: float):
+    '''Send the given command (a scene filename or an action, as in a
+    command file) to the controller subprocess listening at the given
+    address, and return its response.  Waits for the subprocess to start
+    listening, if needed.  Raises a CommandChannelError if it can't be
+    reached or doesn't respond within the timeout (in seconds).'''
+    deadline = time.monotonic() + timeout
+    try:
+        while True:
+            try:
+                connection = Client(address, authkey=bytes.fromhex(authkey))
+                break
+            except (FileNotFoundError, ConnectionRefusedError):
+                # The subprocess is still starting up.
+                if time.monotonic() >= deadline:
+                    raise CommandChannelError(
+                        f'Timed out connecting to {address}')
+                time.sleep(CONNECT_RETRY_INTERVAL)
+        with connection:
+            connection.send(command)
+            if not connection.poll(max(0, deadline - time.monotonic())):
+                raise CommandTimeoutError(
+                    f'Timed out waiting for a response to {command}')
+            return connection.recv()
+    except (AuthenticationError, OSError, EOFError) as error:
+        raise CommandChannelError(str(error)) from error
+
+
+def serve_commands(
+    address: str,
+    authkey: str,
+    handle_command: Callable[[str], Dict]
+) -> None:
+    '''Listen at the given address and respond to each command with the
+    output of handle_command, one at a time, until interrupted.  Responds
+    to LAST_OUTPUT_COMMAND with the last other command and its response
+    (or None, if there wasn't one), so a client that timed out can still
+    get it.'''
+    remove_address(address)
+    last_output = None
+    with Listener(address, authkey=bytes.fromhex(authkey)) as listener:
+        logger.debug(f"Listening for commands at {address}")
+        while True:
+            try:
+                connection = listener.accept()
+            except (AuthenticationError, OSError):
+                # Like a client with the wrong auth key; ignore it.
+                logger.exception("Error accepting command connection")
+                continue
+            with connection:
+                try:
+                    command = connection.recv()
+                    if command == LAST_OUTPUT_COMMAND:
+                        connection.send(last_output)
+                        continue
+                    response = handle_command(command)
+                    if command != PING_COMMAND:
+                        # Saved before sending, in case the client has
+                        # given up waiting for it.
+                        last_output = (command, response)
+                    connection.send(response)
+                except (OSError, EOFError):
+                    logger.exception("Error in command connection")
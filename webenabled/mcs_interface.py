@@ -1,17 +1,18 @@
 import datetime
-import glob
 import json
 import logging
 import os
 import sys
-import time
-from os.path import exists, getctime, relpath
+from os.path import exists, relpath
 
+from command_channel import (LAST_OUTPUT_COMMAND, PING_COMMAND,
+                             CommandChannelError, CommandTimeoutError,
+                             create_address, create_authkey, send_command)
 from flask import current_app
 from mcs_task_desc import TaskDescription
 from PIL import Image
-from subprocess_runner import (is_file_open, is_process_running,
-                               start_subprocess)
+from subprocess_pool import get_pool
+from subprocess_runner import is_process_running, start_subprocess
 
 import machine_common_sense as mcs
 from machine_common_sense import GoalMetadata
@@ -64,10 +65,11 @@ class MCSInterface:
 
         time_str = datetime.datetime.now().strftime("%y%m%d_%H%M%S")
         suffix = f"{time_str}_{user}"
-        self.command_out_dir = f"{TMP_DIR_FULL_PATH}cmd_{suffix}"
+        # Commands are sent to the unity controller program, and its output
+        # returned, through a socket; only the images are saved to files.
+        self.command_socket = create_address(suffix)
+        self.command_authkey = create_authkey()
         self.step_output_dir = f"{TMP_DIR_FULL_PATH}output_{suffix}"
-        if not exists(self.command_out_dir):
-            os.mkdir(self.command_out_dir)
         if not exists(self.step_output_dir):
             os.mkdir(self.step_output_dir)
 
@@ -79,6 +81,8 @@ class MCSInterface:
 
         # Default to the blank image
         self.img_name = self.blank_path
+        # The latest images in the current scene, newest first
+        self.image_list = []
 
         # Process id of the unity contoller program
         self.pid = None
@@ -92,15 +96,35 @@ class MCSInterface:
     def start_mcs(self):
         # Start the unity controller.  (the function is in a different
         # file so we can pickle / store MCSInterface in the session)
-        self.pid = start_subprocess(
-            self.command_out_dir,
-            self.step_output_dir,
-            self.logger.isEnabledFor(logging.DEBUG)
-        )
-
-        # Read in the image
-        images, _ = self.get_images_and_step_output(startup=True)
-        return images
+        pool = get_pool()
+        pooled_controller = pool.acquire() if pool else None
+        if pooled_controller:
+            # Use the pre-launched controller's socket and output directory.
+            os.rmdir(self.step_output_dir)
+            self.pid = pooled_controller.pid
+            self.command_socket = pooled_controller.command_socket
+            self.command_authkey = pooled_controller.authkey
+            self.step_output_dir = pooled_controller.output_dir
+        else:
+            self.pid = start_subprocess(
+                self.step_output_dir,
+                self.command_socket,
+                self.command_authkey,
+                self.logger.isEnabledFor(logging.DEBUG)
+            )
+
+        # Wait for the controller to start up
+        try:
+            send_command(
+                self.command_socket,
+                self.command_authkey,
+                PING_COMMAND,
+                UNITY_STARTUP_WAIT_TIMEOUT
+            )
+        except CommandChannelError:
+            self.logger.debug(
+                "Display blank image on default when starting up.")
+        return [self.blank_path]
 
     def is_controller_alive(self):
         # When we re-attach, we need to make sure that the controller
@@ -146,12 +170,6 @@ class MCSInterface:
                                "TorqueObject", "RotateObject", "MoveObject",
                                "InteractWithAgent"]
 
-        command_file_name = (
-            f'{self.command_out_dir}/command_{self.scene_id}_step_'
-            f'{self.step_number}.txt'
-        )
-        f = open(command_file_name, "a")
-
         if (action in image_coord_actions and params is not None):
             x_coord = params["objectImageCoordsX"]
             y_coord = params["objectImageCoordsY"]
@@ -187,11 +205,6 @@ class MCSInterface:
                     straight = params["straight"]
                     full_action_str += (",straight=" + str(straight))
 
-        f.write(full_action_str)
-        f.close()
-        # wait for action to process
-        time.sleep(0.5)
-
         action_to_return = full_action_str
 
         is_initialize = action_to_return.endswith("json")
@@ -200,123 +213,83 @@ class MCSInterface:
             action_to_return = self.scene_id
 
         images, step_output = self.get_images_and_step_output(
-            init_scene=is_initialize)
+            full_action_str, init_scene=is_initialize)
 
         return action_to_return, images, step_output
 
-    def check_for_error(self, elapsed):
-        # Shouldn't need to wait very long for errors like "invalid action"
-        secs_to_check = 1.0
-        if (elapsed > secs_to_check):
-            error_file_list = glob.glob(
-                self.step_output_dir + "/error_*.json")
-
-            return len(error_file_list) > 0
-
-    def get_images_and_step_output(self, startup=False, init_scene=False):
-        """Watch the output directory and return the latest images and step
-        output that appears. If it does not appear in <timeout> seconds, then
-        give up and return a blank image."""
-        timestart = time.time()
-
-        while True:
-            timenow = time.time()
-            elapsed = (timenow - timestart)
-            if (startup and elapsed > UNITY_STARTUP_WAIT_TIMEOUT):
-                self.logger.debug(
-                    "Display blank image on default when starting up.")
-                self.img_name = self.blank_path
-                return [self.img_name], self.step_output
-
-            quick_error_check = self.check_for_error(elapsed)
-
-            if elapsed > IMAGE_WAIT_TIMEOUT or quick_error_check:
-                log_message = "Timeout waiting for image"
-                if (quick_error_check):
-                    log_message = "Error returned from MCS controller."
-
-                self.logger.warn(log_message)
-
-                list_of_error_files = glob.glob(
-                    self.step_output_dir + "/error_*.json")
-
-                if len(list_of_error_files) > 0:
-                    latest_error_file = max(
-                        list_of_error_files, key=getctime
-                    )
-                    if latest_error_file.endswith(
-                            f"step_{self.step_number}.json") or init_scene:
-                        opened_error_file = open(latest_error_file, "r")
-                        new_error_output = json.load(opened_error_file)
-                        opened_error_file.close()
-                        if (self.img_name is None):
-                            self.img_name = self.blank_path
-                        if (self.step_output is None):
-                            self.step_output = {}
-
-                        self.step_output['error_output'] = {
-                            'step_number': new_error_output["step_number"],
-                            'error': new_error_output["error"]
-                        }
-
-                return [self.img_name], self.step_output
-
-            # Sort descending by date/time modified (newest first)
-            list_of_output_files = list(reversed(sorted(
-                glob.glob(self.step_output_dir + "/step_output_*.json"),
-                key=getctime
-            )))
-            list_of_img_files = list(reversed(sorted(
-                glob.glob(self.step_output_dir + "/rgb_*.png"),
-                key=getctime
-            )))
-
-            # Image file logic
-            if len(list_of_img_files) > 0 and len(list_of_output_files) > 0:
-                latest_json_file = list_of_output_files[0]
-
-                # Keep only the latest output file.
-                for file in list_of_output_files[1:]:
-                    os.unlink(file)
-
-                latest_image_file = list_of_img_files[0]
-
-                # Keep only the latest image files. Use step_number if less
-                # than IMAGE_COUNT to remove images from previous scenes.
-                image_count = min(IMAGE_COUNT, self.step_number + 2)
-                for file in list_of_img_files[image_count:]:
-                    os.unlink(file)
-
-                # wait to make sure we've finished loading the new image
-                # (not sure why the is_file_open check below didn't
-                # do the trick?)
-                time.sleep(0.1)
-
-                # Check to see if the unity controller still has the file open
-                for x in range(0, 100):
-                    if (is_file_open(self.pid, latest_image_file) or
-                            is_file_open(self.pid, latest_json_file)):
-                        time.sleep(0.03)
-                    else:
-                        break
-
-                opened_json_file = open(latest_json_file, "r")
-                new_step_output = json.load(opened_json_file)
-                opened_json_file.close()
-
-                has_new_step_output = (("step_number" in new_step_output and
-                                        (self.step_output is None or
-                                         self.step_number == 0)) or
-                                       ("step_number" in self.step_output and
-                                       new_step_output["step_number"] >
-                                       self.step_output["step_number"]))
-
-                if latest_image_file != self.img_name and has_new_step_output:
-                    self.step_output = new_step_output
-                    self.img_name = latest_image_file
-                    return list_of_img_files[:image_count], self.step_output
-
-            time.sleep(0.05)
+    def get_images_and_step_output(self, command: str, init_scene=False):
+        """Send the given command to the MCS controller, and return the
+        latest images and step output in its response. If it does not
+        respond in <timeout> seconds, then ask again for its last response,
+        and if that fails too, give up and return the previous image with an
+        error in the step output."""
+        try:
+            response = send_command(
+                self.command_socket,
+                self.command_authkey,
+                command,
+                IMAGE_WAIT_TIMEOUT
+            )
+        except CommandTimeoutError:
+            self.logger.warn("Timeout waiting for image; trying again")
+            response = self.get_last_response(command)
+        except CommandChannelError:
+            response = None
+        if response is None:
+            self.logger.warn("Timeout waiting for image")
+            self.step_output = dict(self.step_output or {})
+            self.step_output['error_output'] = {
+                'step_number': self.step_number,
+                'error': f"No output from MCS controller for {command}"
+            }
+            return [self.img_name], self.step_output
+
+        if 'error_output' in response:
+            self.logger.warn("Error returned from MCS controller.")
+            if (self.step_output is None):
+                self.step_output = {}
+            self.step_output['error_output'] = response['error_output']
+            return [self.img_name], self.step_output
+
+        if 'step_output' not in response:
+            return [self.img_name], self.step_output
+
+        if init_scene:
+            # Remove images from previous scenes.
+            self.remove_images(self.image_list)
+            self.image_list = []
+        self.step_output = response['step_output']
+        if response.get('image'):
+            self.img_name = response['image']
+            self.image_list.insert(0, self.img_name)
+            # Keep only the latest image files.
+            self.remove_images(self.image_list[IMAGE_COUNT:])
+            del self.image_list[IMAGE_COUNT:]
+        return list(self.image_list) or [self.img_name], self.step_output
+
+    def get_last_response(self, command: str):
+        """Return the MCS controller's response to the given command, once
+        it has finished, if it was the last command the controller handled,
+        or None otherwise."""
+        try:
+            last_output = send_command(
+                self.command_socket,
+                self.command_authkey,
+                LAST_OUTPUT_COMMAND,
+                IMAGE_WAIT_TIMEOUT
+            )
+        except CommandChannelError:
+            return None
+        if last_output is None or last_output[0] != command:
+            return None
+        return last_output[1]
+
+    def remove_images(self, image_list):
+        for image in image_list:
+            try:
+                os.unlink(image)
+            except OSError:
+                self.logger.exception(f"Failed to remove image {image}")
 
     def get_scene_list(self):
         '''Look in scenes/ and get a list of all the scenes'''
@@ -4,7 +4,6 @@ import os
 import random
 import string
 
-import psutil
 import typeguard
 import waitress
 
@@ -19,11 +18,15 @@ def mock_decorator(func):
 
 typeguard.typechecked = mock_decorator
 
+from command_channel import remove_address
 from flask import (Flask, jsonify, make_response, render_template, request,
                    session)
 # See: https://www.geeksforgeeks.org/how-to-use-flask-session-in-python-flask/
 from flask_session import Session
-from mcs_interface import MCS_INTERFACE_TMP_DIR, MCSInterface
+from mcs_interface import (MCS_INTERFACE_TMP_DIR, TMP_DIR_FULL_PATH,
+                           MCSInterface)
+from subprocess_pool import HEALTH_CHECK_INTERVAL, get_pool, start_pool
+from subprocess_runner import kill_process_tree
 from webenabled_common import LOG_CONFIG
 
 # Configure logging _before_ creating the app oject
@@ -194,18 +197,11 @@ def exit_unity():
     app.logger.debug(
         "Attempting to clean up processes after browser has been closed.")
 
-    for p in psutil.process_iter(['pid']):
-        if p.info['pid'] == controller_pid:
-            children = p.children(recursive=True)
-            for c_process in children:
-                app.logger.debug(
-                    f"Found child process of controller: {c_process}, "
-                    f"will attempt to end.")
-                c_process.kill()
-
-            app.logger.debug(
-                f"Found controller process: {p}, will attempt to end.")
-            p.kill()
+    # Return a pooled controller to the pool, or end the controller process.
+    pool = get_pool()
+    if not (pool and pool.release(controller_pid)):
+        kill_process_tree(controller_pid, app.logger)
+        remove_address(mcs_interface.command_socket)
 
     if (unique_id is None):
         unique_id = request.cookies.get("uniq_id")
@@ -285,12 +281,37 @@ if __name__ == "__main__":
         action='store_true',
         help='Debug logging'
     )
+    parser.add_argument(
+        '--pool_size',
+        type=int,
+        default=2,
+        help='Number of idle MCS controllers to keep running, ready for new '
+             'users (0 to start a new controller for each user)'
+    )
+    parser.add_argument(
+        '--pool_health_check_interval',
+        type=float,
+        default=HEALTH_CHECK_INTERVAL,
+        help='Seconds between health checks of the idle MCS controllers'
+    )
     args = parser.parse_args()
     app.logger.info(
         f'Starting MCS web interface: host={args.host} port={args.port} '
-        f'dev={args.dev} debug={args.debug}'
+        f'dev={args.dev} debug={args.debug} pool_size={args.pool_size}'
     )
 
+    # With --dev, the reloader runs this script again in a child process,
+    # which is the one that serves requests.
+    if args.pool_size > 0 and (
+        not args.dev or os.environ.get('WERKZEUG_RUN_MAIN') == 'true'
+    ):
+        start_pool(
+            args.pool_size,
+            TMP_DIR_FULL_PATH,
+            args.debug,
+            args.pool_health_check_interval
+        )
+
     if args.dev:
         app.run(host=args.host, port=args.port, debug=True)
     else:
@@ -11,6 +11,14 @@
 # files. When they appear, the commands are read in and executed.  The
 # resulting images from MCS are written out and put into the 'outdir'.
 #
+# With --mcs_command_socket address, commands are instead received from the
+# web interface through a socket (see command_channel), and each command's
+# step output and image path are sent straight back in response.
+#
+# With --mcs_shared_memory_name name, each step's output is published to
+# shared memory with that name (see mcs.SharedMemoryStepConsumer) instead
+# of being written out to the 'outdir'.
+#
 import argparse
 import glob
 import json
@@ -19,6 +27,8 @@ import os
 import time
 from os.path import exists, relpath
 
+from command_channel import (PING_COMMAND, RESET_COMMAND, get_authkey_from_env,
+                             serve_commands)
 from watchdog.events import PatternMatchingEventHandler
 from watchdog.observers import Observer
 from webenabled_common import LOG_CONFIG
@@ -29,27 +39,68 @@ from machine_common_sense import StepMetadata
 logging.config.dictConfig(LOG_CONFIG)
 logger = logging.getLogger('run_scene_with_dir')
 
+CONFIG_FILE = './config_level1.ini'
+
+# Seconds to wait for the shared memory consumer to free a slot before
+# dropping a step's output, so a stalled consumer can't hang the controller.
+PUBLISH_TIMEOUT = 10
+
 
 class RunSceneWithDir:
 
-    def __init__(self, command_in_dir, output_dir):
+    def __init__(
+        self,
+        command_in_dir,
+        output_dir,
+        shared_memory_name=None,
+        command_socket=None
+    ):
         self.scene_file = None
         self.controller = None
         self.command_in_dir = command_in_dir
+        self.command_socket = command_socket
         self.output_dir = output_dir
         self.step_number = 0
+        self.publisher = (
+            mcs.SharedMemoryStepPublisher(shared_memory_name)
+            if shared_memory_name else None
+        )
 
     def run_loop(self):
-        logger.debug(
-            f"Starting controller: watching command directory "
+        commands_from = (
+            f"listening at {self.command_socket}" if self.command_socket
+            else f"watching command directory "
             f"{self.command_in_dir[(self.command_in_dir.rfind('/') + 1):]}"
+        )
+        logger.debug(
+            f"Starting controller: {commands_from}"
             f", writing to output directory "
             f"{self.output_dir[(self.output_dir.rfind('/') + 1):]}"
         )
 
-        self.controller = mcs.create_controller(
-            config_file_or_dict='./config_level1.ini')
+        try:
+            self.controller = mcs.create_controller(
+                config_file_or_dict=CONFIG_FILE)
+
+            if self.command_socket:
+                try:
+                    serve_commands(
+                        self.command_socket,
+                        get_authkey_from_env(),
+                        self.run_command
+                    )
+                except Exception:
+                    logger.exception("Command channel interrupted")
+            else:
+                self.watch_command_dir()
+
+            self.controller.end_scene()
+        finally:
+            # Always free the shared memory, even if the controller fails.
+            if self.publisher:
+                self.publisher.close()
 
+    def watch_command_dir(self):
         patterns = ["command_*.txt"]
         ignore_patterns = None
         ignore_directories = False
@@ -73,8 +124,6 @@ class RunSceneWithDir:
 
         observer.join()
 
-        self.controller.end_scene()
-
     def create_command_file(self, command_text_file):
         try:
             file = open(command_text_file, 'x')
@@ -95,47 +144,71 @@ class RunSceneWithDir:
             return
 
         for command in commands:
-            # Ignore blank lines
-            if command == "":
-                continue
-
-            # Handle file names (new scene file) by loading
-            if command.endswith(".json"):
-                self.scene_file = command
-                self.step_number = 0
-                self.load_scene()
-            else:
-                # Otherwise, assume that it is a valid action
-                self.step_and_save(command)
+            self.run_command(command)
+
+    def run_command(self, command):
+        '''Run the given command, and return its output: a dict with either
+        the step output and image path, or the error, or neither (if there
+        was no new output).'''
+        command = command.strip()
+        # Ignore blank lines
+        if command == PING_COMMAND:
+            return {}
+        if command == RESET_COMMAND:
+            return self.reset()
+
+        # Handle file names (new scene file) by loading
+        if command.endswith(".json"):
+            self.scene_file = command
+            self.step_number = 0
+            return self.load_scene()
+        # Otherwise, assume that it is a valid action
+        return self.step_and_save(command)
+
+    def reset(self):
+        '''End the current scene, reset the config, and remove all the
+        output, so this controller can be reused by a new web session.'''
+        logger.debug("Resetting controller")
+        try:
+            self.controller.end_scene()
+        except Exception:
+            logger.exception("Error ending scene on reset")
+        mcs.change_config(self.controller, config_file_or_dict=CONFIG_FILE)
+        self.scene_file = None
+        self.step_number = 0
+        for file in glob.glob(self.output_dir + "/*"):
+            os.unlink(file)
+        return {}
 
     def load_scene(self):
         logger.debug(f"Loading file {self.scene_file}")
 
         if not exists(self.scene_file):
             logger.warn(f"Missing file {self.scene_file}")
-            return
+            return self.log_error(f"Missing file {self.scene_file}")
 
         try:
             scene_data = mcs.load_scene_json_file(self.scene_file)
             self.controller.end_scene()
             output: StepMetadata = self.controller.start_scene(scene_data)
-            self.save_output_info(output)
-            self.save_output_image(output)
-        except Exception:
+            return self.save_output(output)
+        except Exception as error:
             logger.exception(f"Error loading file {self.scene_file}")
+            return self.log_error(error)
 
     def step_and_save(self, command):
         logger.debug(f"Executing command {command}")
         try:
             output: StepMetadata = self.controller.step(command)
-            if output is not None:
-                self.save_output_info(output)
-                self.save_output_image(output)
-                self.step_number = output.step_number
-                self.delete_old_error_files()
+            if output is None:
+                return {}
+            saved_output = self.save_output(output)
+            self.step_number = output.step_number
+            self.delete_old_error_files()
+            return saved_output
         except Exception as error:
             logger.exception(f"Error executing command {command}")
-            self.log_error(error)
+            return self.log_error(error)
 
     def delete_old_error_files(self):
         # Delete outdated error files
@@ -147,6 +220,14 @@ class RunSceneWithDir:
                 os.unlink(file)
 
     def log_error(self, error):
+        output_to_save_dict = {
+            'step_number': self.step_number,
+            'error': str(error)
+        }
+        # The command channel sends the error back in its response.
+        if self.command_socket:
+            return {'error_output': output_to_save_dict}
+
         # Save error output to a separate file
         scene_id = self.scene_file[
             (self.scene_file.rfind('/') + 1):(self.scene_file.rfind('.'))
@@ -155,11 +236,6 @@ class RunSceneWithDir:
 
         try:
             f = open(error_output_file, "w")
-            output_to_save_dict = {
-                'step_number': self.step_number,
-                'error': str(error)
-            }
-
             output_to_save_json = json.dumps(output_to_save_dict, indent=4)
 
             f.write(output_to_save_json)
@@ -167,17 +243,42 @@ class RunSceneWithDir:
         except Exception:
             logger.exception(
                 f"Error saving error output to file {error_output_file}")
+        return {'error_output': output_to_save_dict}
+
+    def save_output(self, output: StepMetadata):
+        if self.publisher:
+            logger.debug(f"Publishing output at step {output.step_number}")
+            try:
+                self.publisher.publish(output, timeout=PUBLISH_TIMEOUT)
+            except TimeoutError:
+                logger.warning(
+                    f"Dropped output at step {output.step_number}: the "
+                    f"shared memory consumer didn't free a slot within "
+                    f"{PUBLISH_TIMEOUT} seconds")
+            return {'step_output': self.get_output_info(output)}
+        # The command channel sends the output info back in its response,
+        # but the web page still needs the image file.
+        if self.command_socket:
+            step_output = self.get_output_info(output)
+        else:
+            step_output = self.save_output_info(output)
+        return {
+            'step_output': step_output,
+            'image': self.save_output_image(output)
+        }
 
-    def save_output_info(self, output: StepMetadata):
-        logger.debug(f"Saving output info at step {output.step_number}")
-
-        output_to_save_dict = {
+    def get_output_info(self, output: StepMetadata):
+        return {
             'step_number': output.step_number,
             'return_status': output.return_status,
             'reward': round(output.reward, 3),
             'steps_on_lava': output.steps_on_lava
         }
 
+    def save_output_info(self, output: StepMetadata):
+        logger.debug(f"Saving output info at step {output.step_number}")
+
+        output_to_save_dict = self.get_output_info(output)
         output_to_save_json = json.dumps(output_to_save_dict, indent=4)
 
         scene_id = self.scene_file[
@@ -198,6 +299,7 @@ class RunSceneWithDir:
         except Exception:
             logger.exception(
                 f"Error saving output info on step {output.step_number}")
+        return output_to_save_dict
 
     def save_output_image(self, output: StepMetadata):
         logger.debug(f"Saving output image at step {output.step_number}")
@@ -264,6 +366,17 @@ def parse_args():
     parser.add_argument(
         '--mcs_output_dir',
         help='MCS directory that images will appear in')
+    parser.add_argument(
+        '--mcs_command_socket',
+        default=None,
+        help='Receive commands through a socket at this address instead of '
+             'watching the command directory (with its auth key in the '
+             'MCS_COMMAND_CHANNEL_AUTHKEY environment variable)')
+    parser.add_argument(
+        '--mcs_shared_memory_name',
+        default=None,
+        help='Publish output to shared memory with this name instead of '
+             'writing it to the output directory')
     parser.add_argument(
         '--debug',
         default=False,
@@ -279,5 +392,10 @@ if __name__ == "__main__":
     output_dir = args.mcs_output_dir
     logger.setLevel(logging.DEBUG if args.debug else logging.INFO)
 
-    run_scene = RunSceneWithDir(command_in_dir, output_dir)
+    run_scene = RunSceneWithDir(
+        command_in_dir,
+        output_dir,
+        args.mcs_shared_memory_name,
+        args.mcs_command_socket
+    )
     run_scene.run_loop()
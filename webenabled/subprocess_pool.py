@@ -0,0 +1,265 @@
+#
+# Pool of pre-launched MCS controller subprocesses (each running
+# run_scene_with_dir.py, with its own command socket and output directory),
+# so a new web session can be given a controller that has already started
+# Unity, rather than waiting for a cold start.  When a session ends, its
+# controller is reset and returned to the pool.
+#
+# The pool lives in the web server process, not in the session: sessions
+# only keep the fields of their PooledController, and return it to the pool
+# by its pid.
+#
+import atexit
+import datetime
+import logging
+import os
+import shutil
+import subprocess
+import threading
+import time
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional
+
+from command_channel import (PING_COMMAND, RESET_COMMAND, CommandChannelError,
+                             create_address, create_authkey, remove_address,
+                             send_command)
+from subprocess_runner import kill_process_tree, launch_subprocess
+
+logger = logging.getLogger('subprocess_pool')
+
+# Pool output directories don't start with "output_", so they aren't
+# deleted with those of finished sessions.
+POOL_DIR_PREFIX = 'pool_'
+HEALTH_CHECK_INTERVAL = 30.0
+HEALTH_CHECK_TIMEOUT = 5.0
+# Short, because an idle controller that isn't listening yet is still
+# starting up, rather than broken.
+READY_CHECK_TIMEOUT = 0.1
+RESET_TIMEOUT = 30.0
+# Seconds a controller may take to start up (like the default MCS
+# controller_timeout) before it's considered stuck and replaced.
+STARTUP_TIMEOUT = 600.0
+
+
+@dataclass
+class PooledController:
+    output_dir: str
+    command_socket: str
+    authkey: str
+    process: subprocess.Popen = field(repr=False)
+    # Whether the controller has started up and responded to a command.
+    ready: bool = False
+    # The time.monotonic() seconds when the controller was launched.
+    launched: float = field(default_factory=time.monotonic)
+
+    @property
+    def pid(self) -> int:
+        return self.process.pid
+
+    def is_alive(self) -> bool:
+        return self.process.poll() is None
+
+
+class ControllerSubprocessPool:
+    '''
+    Keeps size idle controller subprocesses running, ready to be assigned
+    to new web sessions, and checks the health of each idle one every
+    health_check_interval seconds, replacing any that have died, stopped
+    responding, or not started up within startup_timeout seconds.
+    '''
+
+    def __init__(
+        self,
+        size: int,
+        output_root: str,
+        debug: bool = False,
+        health_check_interval: float = HEALTH_CHECK_INTERVAL,
+        startup_timeout: float = STARTUP_TIMEOUT
+    ):
+        self.size = size
+        self.output_root = output_root
+        self.debug = debug
+        self.health_check_interval = health_check_interval
+        self.startup_timeout = startup_timeout
+        self._idle: List[PooledController] = []
+        self._in_use: Dict[int, PooledController] = {}
+        # Idle controllers being health checked.
+        self._checking: List[PooledController] = []
+        self._launch_count = 0
+        self._lock = threading.Lock()
+        self._stopped = threading.Event()
+        self._health_thread = None
+
+    def start(self) -> None:
+        '''Launch the idle controllers and start the health checks.'''
+        with self._lock:
+            self._fill()
+        self._health_thread = threading.Thread(
+            target=self._run_health_checks,
+            name='mcs-subprocess-pool',
+            daemon=True
+        )
+        self._health_thread.start()
+
+    def acquire(self) -> Optional[PooledController]:
+        '''Return an idle controller for a new session (preferring one that
+        has finished starting up), and launch another to replace it, or
+        return None if none are available.'''
+        with self._lock:
+            self._remove_dead()
+            if not self._idle:
+                return None
+            ready = [worker for worker in self._idle if worker.ready]
+            worker = (ready or self._idle)[0]
+            self._idle.remove(worker)
+            self._in_use[worker.pid] = worker
+            self._fill()
+        logger.debug(f"Assigned pooled controller {worker}")
+        return worker
+
+    def release(self, pid: int) -> bool:
+        '''Reset the in-use controller with the given pid, and return it to
+        the pool if the pool isn't full, or stop it otherwise.  Returns
+        whether the pid belonged to a pooled controller.'''
+        with self._lock:
+            worker = self._in_use.pop(pid, None)
+        if worker is None:
+            return False
+        try:
+            send_command(
+                worker.command_socket,
+                worker.authkey,
+                RESET_COMMAND,
+                RESET_TIMEOUT
+            )
+        except CommandChannelError:
+            logger.exception(f"Failed to reset pooled controller {worker}")
+            self._stop(worker)
+            return True
+        with self._lock:
+            self._remove_dead()
+            if self._idle_count() < self.size and not self._stopped.is_set():
+                worker.ready = True
+                self._idle.append(worker)
+                logger.debug(f"Returned controller {worker} to the pool")
+                return True
+        self._stop(worker)
+        return True
+
+    def check_health(self) -> None:
+        '''Check each idle controller, one at a time, replacing any that
+        have died, stopped responding, or are taking too long to start
+        up.'''
+        with self._lock:
+            workers = list(self._idle)
+        for worker in workers:
+            with self._lock:
+                if worker not in self._idle:
+                    continue
+                # Don't let the controller be assigned while it's checked.
+                self._idle.remove(worker)
+                self._checking.append(worker)
+            healthy = worker.is_alive()
+            if healthy:
+                try:
+                    send_command(
+                        worker.command_socket,
+                        worker.authkey,
+                        PING_COMMAND,
+                        HEALTH_CHECK_TIMEOUT if worker.ready
+                        else READY_CHECK_TIMEOUT
+                    )
+                    worker.ready = True
+                except CommandChannelError:
+                    # Still starting up, unless it was ready before or it's
+                    # taking too long.
+                    healthy = not worker.ready and (
+                        time.monotonic() - worker.launched <
+                        self.startup_timeout)
+            with self._lock:
+                self._checking.remove(worker)
+                if healthy and not self._stopped.is_set():
+                    self._idle.append(worker)
+                    continue
+            logger.warning(f"Replacing unhealthy pooled controller {worker}")
+            self._stop(worker)
+        with self._lock:
+            self._fill()
+
+    def close(self) -> None:
+        '''Stop the health checks and every controller in the pool.'''
+        self._stopped.set()
+        with self._lock:
+            workers = (
+                self._idle + self._checking + list(self._in_use.values()))
+            self._idle = []
+            self._in_use = {}
+        for worker in workers:
+            self._stop(worker)
+
+    def _idle_count(self) -> int:
+        # Call with the lock held.
+        return len(self._idle) + len(self._checking)
+
+    def _fill(self) -> None:
+        # Call with the lock held.
+        while self._idle_count() < self.size and not self._stopped.is_set():
+            self._idle.append(self._launch())
+
+    def _remove_dead(self) -> None:
+        # Call with the lock held.
+        for worker in [w for w in self._idle if not w.is_alive()]:
+            logger.warning(f"Pooled controller {worker} died")
+            self._idle.remove(worker)
+            self._stop(worker)
+
+    def _launch(self) -> PooledController:
+        self._launch_count += 1
+        time_str = datetime.datetime.now().strftime("%y%m%d_%H%M%S")
+        suffix = f"{time_str}_{os.getpid()}_{self._launch_count}"
+        output_dir = f"{self.output_root}{POOL_DIR_PREFIX}{suffix}"
+        os.makedirs(output_dir, exist_ok=True)
+        command_socket = create_address(suffix)
+        authkey = create_authkey()
+        process = launch_subprocess(
+            output_dir, command_socket, authkey, self.debug)
+        worker = PooledController(output_dir, command_socket, authkey, process)
+        logger.debug(f"Launched pooled controller {worker}")
+        return worker
+
+    def _stop(self, worker: PooledController) -> None:
+        if worker.is_alive():
+            kill_process_tree(worker.pid, logger)
+        worker.process.wait()
+        remove_address(worker.command_socket)
+        shutil.rmtree(worker.output_dir, ignore_errors=True)
+
+    def _run_health_checks(self) -> None:
+        while not self._stopped.wait(self.health_check_interval):
+            try:
+                self.check_health()
+            except Exception:
+                logger.exception("Error checking pooled controllers")
+
+
+# The web server's pool, if it has one.
+_pool: Optional[ControllerSubprocessPool] = None
+
+
+def start_pool(
+    size: int,
+    output_root: str,
+    debug: bool = False,
+    health_check_interval: float = HEALTH_CHECK_INTERVAL
+) -> ControllerSubprocessPool:
+    '''Start the web server's pool, which is closed on exit.'''
+    global _pool
+    _pool = ControllerSubprocessPool(
+        size, output_root, debug, health_check_interval)
+    _pool.start()
+    atexit.register(_pool.close)
+    return _pool
+
+
+def get_pool() -> Optional[ControllerSubprocessPool]:
+    return _pool
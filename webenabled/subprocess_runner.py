@@ -5,23 +5,31 @@
 # TODO: Figure out why you can't pickle an object that does the below
 
 import os
-import re
 import subprocess
 
+import psutil
+from command_channel import AUTHKEY_ENV_VAR
 from flask import current_app
 
 
-def start_subprocess(command_dir, output_dir, debug):
-    logger = current_app.logger
-    proc = subprocess.Popen([
+def launch_subprocess(output_dir, command_socket, authkey, debug):
+    return subprocess.Popen([
         "python3", "run_scene_with_dir.py",
-        "--mcs_command_in_dir", command_dir,
+        "--mcs_command_socket", command_socket,
         "--mcs_output_dir", output_dir
-    ] + (["--debug"] if debug else []))
+    ] + (["--debug"] if debug else []), env={
+        **os.environ,
+        AUTHKEY_ENV_VAR: authkey
+    })
+
+
+def start_subprocess(output_dir, command_socket, authkey, debug):
+    logger = current_app.logger
+    proc = launch_subprocess(output_dir, command_socket, authkey, debug)
     pid_str = str(proc.pid)
     logger.debug(
-        f"Running script to start the MCS Controller with command directory "
-        f"{command_dir[(command_dir.rfind('/') + 1):]}"
+        f"Running script to start the MCS Controller with command socket "
+        f"{command_socket}"
         f" and output directory "
         f"{output_dir[(output_dir.rfind('/') + 1):]}"
         f": PID={pid_str}"
@@ -41,36 +49,20 @@ def is_process_running(pid):
         return True
 
 
-def is_file_open(pid, file_to_check_on):
-    """We can see that image filename on disk before unity controller
-    is finished writing writing to it, in which case might be read
-    and shown in the UI before it's done.  To see if it is
-    still being written to, check to see if the controller process is
-    accessing it.
-
-    return true if the file is still open; false if it is closed
-    """
-    dir = '/proc/' + str(pid) + '/fd'
-
-    # Check to see if it is a live process, if not return
-    if not os.access(dir, os.R_OK | os.X_OK):
-        return False
-
-    for fds in os.listdir(dir):
-        for fd in fds:
-            full_name = os.path.join(dir, fd)
-            try:
-                file = os.readlink(full_name)
-                if file == '/dev/null' or \
-                        re.match(r'pipe:\[\d+\]', file) or \
-                        re.match(r'socket:\[\d+\]', file):
-                    continue
-
-                if file.endswith(file_to_check_on):
-                    return True
-
-            except OSError:
-                # TODO:  Do something more intelligent here???
-                return False
+def kill_process_tree(pid, logger):
+    '''Kill the process with the given pid, and its child processes (like
+    the unity controller).  Returns whether the process was found.'''
+    for p in psutil.process_iter(['pid']):
+        if p.info['pid'] == pid:
+            children = p.children(recursive=True)
+            for c_process in children:
+                logger.debug(
+                    f"Found child process of controller: {c_process}, "
+                    f"will attempt to end.")
+                c_process.kill()
 
+            logger.debug(
+                f"Found controller process: {p}, will attempt to end.")
+            p.kill()
+            return True
     return False
@@ -0,0 +1,64 @@
+import threading
+import time
+
+import pytest
+from command_channel import (LAST_OUTPUT_COMMAND, PING_COMMAND,
+                             CommandChannelError, CommandTimeoutError,
+                             create_address, create_authkey, send_command,
+                             serve_commands)
+
+
+def start_server(address, authkey, commands):
+    def handle_command(command):
+        commands.append(command)
+        if command == 'Slow':
+            time.sleep(0.5)
+        return {} if command == PING_COMMAND else {'step_output': command}
+
+    thread = threading.Thread(
+        target=serve_commands,
+        args=(address, authkey, handle_command),
+        daemon=True
+    )
+    thread.start()
+
+
+def test_send_command():
+    address = create_address('test_send_command')
+    authkey = create_authkey()
+    commands = []
+    start_server(address, authkey, commands)
+    assert send_command(address, authkey, PING_COMMAND, 5) == {}
+    assert send_command(address, authkey, 'Pass', 5) == {'step_output': 'Pass'}
+    assert send_command(address, authkey, 'MoveAhead', 5) == {
+        'step_output': 'MoveAhead'
+    }
+    assert commands == [PING_COMMAND, 'Pass', 'MoveAhead']
+
+
+def test_last_output_after_timeout():
+    address = create_address('test_last_output_after_timeout')
+    authkey = create_authkey()
+    start_server(address, authkey, [])
+    assert send_command(address, authkey, LAST_OUTPUT_COMMAND, 5) is None
+    with pytest.raises(CommandTimeoutError):
+        send_command(address, authkey, 'Slow', 0.1)
+    # Waits for the slow command to finish, then returns its response.
+    assert send_command(address, authkey, LAST_OUTPUT_COMMAND, 5) == (
+        'Slow', {'step_output': 'Slow'})
+    # Pings don't replace the last output.
+    send_command(address, authkey, PING_COMMAND, 5)
+    assert send_command(address, authkey, LAST_OUTPUT_COMMAND, 5)[0] == 'Slow'
+
+
+def test_send_command_wrong_authkey():
+    address = create_address('test_send_command_wrong_authkey')
+    start_server(address, create_authkey(), [])
+    with pytest.raises(CommandChannelError):
+        send_command(address, create_authkey(), 'Pass', 5)
+
+
+def test_send_command_timeout():
+    with pytest.raises(CommandChannelError):
+        send_command(create_address('test_send_command_timeout'),
+                     create_authkey(), 'Pass', 0.1)
@@ -5,7 +5,7 @@ from mcs_interface import MCSInterface
 
 def test_mcsinterface():
     mcsif = MCSInterface()
-    print(f"command dir:  {mcsif.command_out_dir}")
+    print(f"command socket:  {mcsif.command_socket}")
     print(f"image   dir:  {mcsif.step_output_dir}")
 
 
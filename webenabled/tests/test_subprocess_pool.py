@@ -0,0 +1,118 @@
+import os
+import subprocess
+import sys
+from unittest.mock import patch
+
+import pytest
+import subprocess_pool
+from command_channel import AUTHKEY_ENV_VAR, send_command
+from subprocess_pool import ControllerSubprocessPool
+
+# Stands in for run_scene_with_dir.py: responds to every command, and
+# removes its output on reset.
+FAKE_CONTROLLER = '''
+import glob, os, sys
+from command_channel import (RESET_COMMAND, get_authkey_from_env,
+                             serve_commands)
+
+def run_command(command):
+    if command == RESET_COMMAND:
+        for file in glob.glob(sys.argv[2] + '/*'):
+            os.unlink(file)
+    return {'command': command}
+
+serve_commands(sys.argv[1], get_authkey_from_env(), run_command)
+'''
+
+
+def launch_fake_controller(output_dir, command_socket, authkey, debug):
+    return subprocess.Popen(
+        [sys.executable, '-c', FAKE_CONTROLLER, command_socket, output_dir],
+        env={**os.environ, AUTHKEY_ENV_VAR: authkey},
+        cwd=os.path.dirname(subprocess_pool.__file__)
+    )
+
+
+@pytest.fixture
+def pool(tmp_path):
+    with patch('subprocess_pool.launch_subprocess', launch_fake_controller):
+        pool = ControllerSubprocessPool(
+            2, f'{tmp_path}/', health_check_interval=60)
+        pool.start()
+        yield pool
+        pool.close()
+
+
+def test_acquire_and_release(pool):
+    worker = pool.acquire()
+    assert worker.is_alive()
+    # The acquired controller is replaced.
+    assert len(pool._idle) == 2
+    assert send_command(
+        worker.command_socket, worker.authkey, 'Pass', 10
+    ) == {'command': 'Pass'}
+
+    image = os.path.join(worker.output_dir, 'rgb_scene_step_1.png')
+    open(image, 'w').close()
+    # The pool is full, so the released controller is stopped.
+    assert pool.release(worker.pid)
+    assert not os.path.exists(image)
+    assert not worker.is_alive()
+    assert not pool.release(worker.pid)
+
+    other = pool.acquire()
+    pool._idle[0].process.kill()
+    pool._idle[0].process.wait()
+    # Returned to the pool in place of the dead controller.
+    assert pool.release(other.pid)
+    assert other in pool._idle
+    assert other.ready
+
+
+def test_check_health(pool):
+    pool.check_health()
+    workers = list(pool._idle)
+    assert len(workers) == 2
+    assert all(worker.is_alive() for worker in workers)
+
+    workers[0].process.kill()
+    workers[0].process.wait()
+    pool.check_health()
+    assert workers[0] not in pool._idle
+    assert workers[1] in pool._idle
+    assert len(pool._idle) == 2
+    assert not os.path.exists(workers[0].output_dir)
+
+
+def launch_stuck_controller(output_dir, command_socket, authkey, debug):
+    # Never starts listening for commands.
+    return subprocess.Popen(
+        [sys.executable, '-c', 'import time; time.sleep(60)'])
+
+
+def test_check_health_startup_timeout(tmp_path):
+    with patch('subprocess_pool.launch_subprocess', launch_stuck_controller):
+        pool = ControllerSubprocessPool(
+            1, f'{tmp_path}/', health_check_interval=60)
+        pool.start()
+        try:
+            worker = pool._idle[0]
+            # Still starting up.
+            pool.check_health()
+            assert pool._idle == [worker]
+
+            pool.startup_timeout = 0
+            pool.check_health()
+            assert worker not in pool._idle
+            assert not worker.is_alive()
+            assert len(pool._idle) == 1
+        finally:
+            pool.close()
+
+
+def test_close(pool):
+    worker = pool.acquire()
+    workers = list(pool._idle)
+    pool.close()
+    assert pool.acquire() is None
+    assert not any(w.is_alive() for w in workers + [worker])